@@ -0,0 +1,53 @@
+"""Tiled DRC of a 5 mm x 5 mm chip of ``all_cells`` replicas on 1, 2, 4, ... cores.
+
+The chip is an array of ``all_cells`` references that fills 5 mm x 5 mm. Each
+run checks the TECH rules with :func:`ihp.drc.check_tiled` and prints the time
+and the speedup over one process.
+
+    python benchmarks/drc_tiled.py
+"""
+
+import math
+import os
+import time
+
+import gdsfactory as gf
+
+from ihp import PDK, drc
+from ihp.samples.all_cells import all_cells
+
+chip_size = 5000.0
+tile_size = 250.0
+
+
+@gf.cell
+def chip() -> gf.Component:
+    c = gf.Component()
+    block = all_cells()
+    columns = max(math.floor(chip_size / block.xsize), 1)
+    rows = max(math.floor(chip_size / block.ysize), 1)
+    c.add_ref(
+        block,
+        columns=columns,
+        rows=rows,
+        column_pitch=block.xsize,
+        row_pitch=block.ysize,
+    )
+    return c
+
+
+if __name__ == "__main__":
+    PDK.activate()
+    c = chip()
+    cores = os.cpu_count() or 1
+    counts = sorted({min(2**i, cores) for i in range(cores.bit_length() + 1)})
+    print(f"chip {c.xsize:.0f} x {c.ysize:.0f} um, tiles of {tile_size:.0f} um")
+
+    print(f"{'processes':>9} {'time [s]':>9} {'speedup':>8} {'violations':>11}")
+    t1 = None
+    for processes in counts:
+        t0 = time.perf_counter()
+        violations = drc.check_tiled(c, tile_size=tile_size, processes=processes)
+        t = time.perf_counter() - t0
+        t1 = t1 or t
+        print(f"{processes:>9} {t:>9.2f} {t1 / t:>7.1f}x {len(violations):>11}")
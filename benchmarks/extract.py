@@ -0,0 +1,49 @@
+"""Net extraction of a synthetic layout with 1M+ shapes.
+
+Metal1 rows and Metal2 columns are cut into short segments, with a Via1 at
+every other crossing. The whole layout is one array-free flat cell, to show
+that extraction time grows linearly with the number of shapes.
+
+    python benchmarks/extract.py
+"""
+
+import time
+
+import gdsfactory as gf
+from kfactory import kdb
+
+from ihp import extract
+
+connectivity = [("Metal1drawing", "Via1drawing", "Metal2drawing")]
+
+
+def layout(n: int) -> gf.Component:
+    """Returns n x n segments on Metal1 and Metal2 and the Via1 between them."""
+    c = gf.Component()
+    m1 = c.kcl.layout.layer(8, 0)
+    v1 = c.kcl.layout.layer(19, 0)
+    m2 = c.kcl.layout.layer(10, 0)
+    pitch, w = 1000, 300  # dbu
+    shapes = c.kdb_cell.shapes
+    for i in range(n):
+        for j in range(n):
+            x, y = i * pitch, j * pitch
+            shapes(m1).insert(kdb.Box(x, y, x + pitch - 2 * w, y + w))
+            shapes(m2).insert(
+                kdb.Box(x, y, x + w, y + pitch + w)
+            )  # reaches the next row
+            if (i + j) % 2:
+                shapes(v1).insert(kdb.Box(x + 50, y + 50, x + w - 50, y + w - 50))
+    return c
+
+
+if __name__ == "__main__":
+    print(f"{'shapes':>9} {'nets':>9} {'time [s]':>9}")
+    for n in (100, 300, 700):
+        c = layout(n)
+        shapes = sum(
+            c.kdb_cell.shapes(li).size() for li in c.kcl.layout.layer_indexes()
+        )
+        t0 = time.perf_counter()
+        nets = extract.extract(c, connectivity)
+        print(f"{shapes:>9} {nets.num_nets:>9} {time.perf_counter() - t0:>9.2f}")
@@ -0,0 +1,66 @@
+"""Wall time of ``import ihp`` in a fresh interpreter.
+
+Before the build step, every import regenerated ``ihp/layer_map_ihp.py`` from
+``sg13g2.lyp``. The second column measures that regeneration alone, which is
+what the pre-generated module saves on each import. The last two columns
+compare parsing techParams and LAYER_VIEWS with loading the tech snapshot.
+
+    python benchmarks/import_time.py
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from gdsfactory.technology import lyp_to_dataclass
+
+from ihp import snapshot
+from ihp.build import layer_map_source
+
+
+def import_time(module: str) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
+    return time.perf_counter() - t0
+
+
+def regenerate_time() -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        lyp_to_dataclass(
+            layer_map_source(),
+            output_filepath=f"{tmp}/layer_map_ihp.py",
+            map_name="LayerMapIHP",
+        )
+        return time.perf_counter() - t0
+
+
+def snapshot_time(parse: bool) -> float:
+    t0 = time.perf_counter()
+    for name in snapshot.names:
+        if parse:
+            snapshot._parse(name)
+        else:
+            snapshot._snapshots.pop(name, None)
+            snapshot._load(name)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    repeat = 10
+    baseline = statistics.median(import_time("gdsfactory") for _ in range(repeat))
+    ihp = statistics.median(import_time("ihp") for _ in range(repeat))
+    regenerate = statistics.median(regenerate_time() for _ in range(repeat))
+    parse = statistics.median(snapshot_time(parse=True) for _ in range(repeat))
+    load = statistics.median(snapshot_time(parse=False) for _ in range(repeat))
+
+    print(
+        f"{'gdsfactory [s]':>15} {'ihp [s]':>8} {'lyp regeneration [ms]':>22}"
+        f" {'tech parse [ms]':>16} {'snapshot [ms]':>14}"
+    )
+    print(
+        f"{baseline:>15.3f} {ihp:>8.3f} {regenerate * 1e3:>22.1f}"
+        f" {parse * 1e3:>16.1f} {load * 1e3:>14.1f}"
+    )
@@ -0,0 +1,98 @@
+"""Maze routing of a 200 net fan-out from a core to a ring of bondpads.
+
+A 1 mm core has 50 pins on each side on TopMetal2. A ring of 200 ``bondpad``
+cells at 100 um pitch surrounds it, and each pin routes to the inner edge of
+its pad on TopMetal1 and TopMetal2 with :func:`ihp.routing.route_bundle_maze`.
+The same nets then route as 40 bundles of 5 with
+:func:`ihp.routing.route_bundles_maze` on 1, 2, 4, ... processes.
+
+    python benchmarks/maze_router.py
+"""
+
+import os
+import time
+
+import gdsfactory as gf
+
+from ihp import PDK, routing
+from ihp.cells.bondpads import bondpad
+from ihp.tech import LAYER
+
+pads_per_side = 50
+pad_pitch = 100.0
+pad_size = 80.0
+core_size = 1000.0
+
+
+def fan_out() -> tuple[gf.Component, list[gf.Port], list[gf.Port]]:
+    """Returns the core and pad ring, and the core pins and pad ports to connect."""
+    c = gf.Component()
+    h = core_size / 2
+    core = c.add_ref(
+        gf.components.rectangle(
+            size=(core_size, core_size), layer=LAYER.TopMetal2drawing
+        )
+    )
+    core.dmove((-h, -h))
+    pad = bondpad(diameter=pad_size)
+    ring = pads_per_side * pad_pitch / 2
+    pin_pitch = core_size / pads_per_side
+
+    pins, ports = [], []
+    for side, (orientation, dx, dy) in enumerate(
+        ((270, 0, -1), (0, 1, 0), (90, 0, 1), (180, -1, 0))
+    ):
+        for i in range(pads_per_side):
+            t = -ring + pad_pitch / 2 + i * pad_pitch
+            u = -h + pin_pitch / 2 + i * pin_pitch
+            pin = (u, dy * h) if dx == 0 else (dx * h, u)
+            center = (t, dy * ring) if dx == 0 else (dx * ring, t)
+            c.add_ref(pad).dmove(center)
+            edge = (center[0] - dx * pad_size / 2, center[1] - dy * pad_size / 2)
+            pins.append(
+                c.add_port(
+                    f"core{side}_{i}",
+                    center=pin,
+                    width=2,
+                    orientation=orientation,
+                    layer=LAYER.TopMetal2drawing,
+                    port_type="electrical",
+                )
+            )
+            ports.append(
+                c.add_port(
+                    f"pad{side}_{i}",
+                    center=edge,
+                    width=2,
+                    orientation=(orientation + 180) % 360,
+                    layer=LAYER.TopMetal2drawing,
+                    port_type="electrical",
+                )
+            )
+    return c, pins, ports
+
+
+if __name__ == "__main__":
+    PDK.activate()
+    c, pins, ports = fan_out()
+    layers = routing.routing_layers(("TopMetal1", "TopMetal2"))
+    t0 = time.perf_counter()
+    routes = routing.route_bundle_maze(c, pins, ports, layers=layers)
+    t = time.perf_counter() - t0
+    length = sum(route.length for route in routes)
+    vias = sum(route.vias for route in routes)
+    print(f"{'nets':>5} {'time [s]':>9} {'length [mm]':>12} {'vias':>6}")
+    print(f"{len(routes):>5} {t:>9.2f} {length / 1000:>12.1f} {vias:>6}")
+
+    cores = os.cpu_count() or 1
+    counts = sorted({min(2**i, cores) for i in range(cores.bit_length() + 1)})
+    print(f"{'processes':>9} {'time [s]':>9} {'speedup':>8}")
+    t1 = None
+    for processes in counts:
+        c, pins, ports = fan_out()
+        bundles = [(pins[i : i + 5], ports[i : i + 5]) for i in range(0, len(pins), 5)]
+        t0 = time.perf_counter()
+        routing.route_bundles_maze(c, bundles, layers=layers, processes=processes)
+        t = time.perf_counter() - t0
+        t1 = t1 or t
+        print(f"{processes:>9} {t:>9.2f} {t1 / t:>7.1f}x")
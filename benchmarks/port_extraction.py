@@ -0,0 +1,47 @@
+"""Port extraction of multi-finger PyCell devices, NumPy engine against gdsfactory.
+
+Adds the DS_ (Metal1) and G_ (GatPoly) ports of ``mos_transistors._add_ports``
+to ng=64 devices with both ``add_ports_from_boxes`` implementations. The
+PyCell devices add these ports with the NumPy engine when they are built.
+
+    python benchmarks/port_extraction.py
+"""
+
+import time
+
+import gdsfactory as gf
+
+from ihp import PDK
+from ihp.cells import mos_transistors
+from ihp.cells.cache import use_cache
+
+devices = ["nmos", "pmos", "rfnmos", "rfpmos"]
+
+
+def bench(c: gf.Component, add_ports, repeat: int) -> tuple[float, int]:
+    total = 0.0
+    for _ in range(repeat):
+        dup = c.dup()
+        dup.ports.clear()
+        t0 = time.perf_counter()
+        for post_process in mos_transistors._add_ports:
+            add_ports(dup, **post_process.keywords)
+        total += time.perf_counter() - t0
+    return total / repeat, len(dup.ports)
+
+
+if __name__ == "__main__":
+    PDK.activate()
+    repeat = 20
+
+    print(
+        f"{'device':>10} {'ports':>6} {'gdsfactory [ms]':>16} {'numpy [ms]':>11} {'speedup':>8}"
+    )
+    with use_cache(None):
+        for device in devices:
+            c = getattr(mos_transistors, device).__wrapped__(w=64.0, ng=64)
+            t_gf, n = bench(c, gf.add_ports.add_ports_from_boxes, repeat)
+            t_np, _ = bench(c, mos_transistors.add_ports_from_boxes, repeat)
+            print(
+                f"{device:>10} {n:>6} {t_gf * 1e3:>16.2f} {t_np * 1e3:>11.2f} {t_gf / t_np:>7.1f}x"
+            )
@@ -0,0 +1,67 @@
+"""Per-cell cost of bringing a PyCell layout into gdsfactory.
+
+Compares the old ``layout.write("temp.gds")`` + ``gf.read.import_gds`` +
+``os.remove`` round trip with the in-memory ``copy_tree`` bridge used by
+``ihp.cells.utils.generate_gf_from_ihp``.
+
+    python benchmarks/pycell_bridge.py
+"""
+
+import os
+import tempfile
+import time
+
+import gdsfactory as gf
+
+from ihp import PDK
+from ihp.cells.utils import PCellWrapper, Tech, _layout_to_component, pya
+
+# isort: split
+# importable once ihp.cells.utils has put the PDK PyCell library on sys.path
+from sg13g2_pycell_lib.ihp.nmos_code import nmos as nmosIHP
+
+
+def produce_nmos(ng: int) -> tuple[pya.Layout, pya.Cell]:
+    """Returns the raw PyCell layout of an nmos with ng fingers."""
+    device = PCellWrapper(impl=nmosIHP(), tech=Tech.get("SG13_dev"))
+    params = {p.name: p.default for p in device.param_decls}
+    params.update(w=0.15e-6 * ng, ng=ng)
+
+    layout = pya.Layout()
+    cell = layout.create_cell("nmos")
+    device.produce(
+        layout=layout,
+        layers={},
+        parameters=[params[p.name] for p in device.param_decls],
+        cell=cell,
+    )
+    return layout, cell
+
+
+def gds_round_trip(layout: pya.Layout) -> gf.Component:
+    gdspath = os.path.join(tempfile.gettempdir(), "temp.gds")
+    layout.write(gdspath)
+    c = gf.read.import_gds(gdspath=gdspath)
+    os.remove(gdspath)
+    return c
+
+
+def bench(func, arg, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func(arg)
+    return (time.perf_counter() - t0) / repeat
+
+
+if __name__ == "__main__":
+    PDK.activate()
+    repeat = 200
+
+    print(f"{'ng':>4} {'gds [ms]':>10} {'memory [ms]':>12} {'speedup':>8}")
+    for ng in (1, 8, 64):
+        layout, cell = produce_nmos(ng)
+        t_gds = bench(gds_round_trip, layout, repeat)
+        t_mem = bench(_layout_to_component, cell, repeat)
+        print(
+            f"{ng:>4} {t_gds * 1e3:>10.3f} {t_mem * 1e3:>12.3f} {t_gds / t_mem:>7.1f}x"
+        )
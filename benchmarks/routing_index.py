@@ -0,0 +1,77 @@
+"""Routing many bundles in a large layout with and without an obstacle index.
+
+The layout has a field of about 1M small Metal2 and Metal3 blocks in 2 mm x
+2 mm with free channels every 50 um. Bundles of 4 nets route across the
+channels one call at a time with :func:`ihp.routing.route_bundle_maze`. Each
+call either rasterizes the whole layout, or queries an
+:class:`ihp.routing.ObstacleIndex` built once and updated with the routes.
+
+    python benchmarks/routing_index.py
+"""
+
+import time
+
+import gdsfactory as gf
+from kfactory import kdb
+
+from ihp import PDK, routing
+from ihp.tech import LAYER
+
+size = 2000.0
+channel = 50.0
+
+
+def layout() -> gf.Component:
+    """Returns the field of blocks with a horizontal and a vertical channel every 50 um."""
+    c = gf.Component()
+    dbu = c.kcl.dbu
+    block, pitch = round(0.5 / dbu), round(2.0 / dbu)
+    period = round(channel / dbu)
+    for name in ("Metal2drawing", "Metal3drawing"):
+        layer = getattr(LAYER, name)
+        shapes = c.kdb_cell.shapes(c.kcl.layout.layer(layer.layer, layer.datatype))
+        for x in range(0, round(size / dbu), pitch):
+            for y in range(0, round(size / dbu), pitch):
+                if x % period > 4 * pitch and y % period > 4 * pitch:
+                    shapes.insert(kdb.Box(x, y, x + block, y + block))
+    return c
+
+
+def bundles(c: gf.Component, n: int) -> list[tuple[list[gf.Port], list[gf.Port]]]:
+    """Returns n bundles of 4 nets along the horizontal channels."""
+    result = []
+    for i in range(n):
+        y = channel * (i % round(size / channel)) + 1.0
+        x = 200.0 * (i // round(size / channel))
+        ports1, ports2 = [], []
+        for j in range(4):
+            for ports, px, orientation in ((ports1, x, 0), (ports2, x + 150, 180)):
+                ports.append(
+                    c.add_port(
+                        f"{px}_{y}_{j}",
+                        center=(px, y + 1.5 * j),
+                        width=0.4,
+                        orientation=orientation,
+                        layer=LAYER.Metal3drawing,
+                        port_type="electrical",
+                    )
+                )
+        result.append((ports1, ports2))
+    return result
+
+
+if __name__ == "__main__":
+    PDK.activate()
+    layers = routing.routing_layers(("Metal2", "Metal3"))
+    print(f"{'bundles':>7} {'index':>6} {'time [s]':>9}")
+    for n in (5, 10):
+        for indexed in (False, True):
+            c = layout()
+            t0 = time.perf_counter()
+            obstacles = routing.ObstacleIndex.from_component(c) if indexed else None
+            for ports1, ports2 in bundles(c, n):
+                routing.route_bundle_maze(
+                    c, ports1, ports2, layers=layers, obstacles=obstacles
+                )
+            t = time.perf_counter() - t0
+            print(f"{n:>7} {str(indexed):>6} {t:>9.2f}")
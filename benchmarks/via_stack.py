@@ -0,0 +1,41 @@
+"""Latency of the native via_stack against the IHP via_stack PyCell.
+
+Both run without the ``@gf.cell`` memoization and without the PyCell disk
+cache, so every call builds the layout.
+
+    python benchmarks/via_stack.py
+"""
+
+import time
+
+from ihp import PDK
+from ihp.cells.cache import use_cache
+from ihp.cells.via_stacks import _via_stack_native, via_stack
+
+params = [
+    dict(bottom_layer="Metal1", top_layer="Metal2"),
+    dict(bottom_layer="Metal1", top_layer="Metal5", vn_columns=4, vn_rows=4),
+    dict(bottom_layer="Activ", top_layer="TopMetal2", vn_columns=8, vn_rows=8),
+]
+
+
+def bench(func, kwargs, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func.__wrapped__(**kwargs)
+    return (time.perf_counter() - t0) / repeat
+
+
+if __name__ == "__main__":
+    PDK.activate()
+    repeat = 100
+
+    print(f"{'stack':>28} {'pycell [ms]':>12} {'native [ms]':>12} {'speedup':>8}")
+    with use_cache(None):
+        for kwargs in params:
+            t_pycell = bench(via_stack, kwargs, repeat)
+            t_native = bench(_via_stack_native, kwargs, repeat)
+            name = f"{kwargs['bottom_layer']}-{kwargs['top_layer']}"
+            print(
+                f"{name:>28} {t_pycell * 1e3:>12.3f} {t_native * 1e3:>12.3f} {t_pycell / t_native:>7.1f}x"
+            )
@@ -1,26 +1,22 @@
-"""IHP PDK."""
+"""IHP PDK.
 
-from typing import cast
+``import ihp`` is cheap: the technology, the cells and the PDK are loaded on
+first attribute access (PEP 562). ``ihp.LAYER`` only imports ``ihp.tech``,
+``ihp.PDK`` builds the PDK without importing any cell module and each cell
+module is imported when one of its cells is first used.
+"""
 
-from gdsfactory.get_factories import get_cells
-from gdsfactory.pdk import Pdk
-from gdsfactory.typings import (
-    ConnectivitySpec,
-)
+from __future__ import annotations
 
-from ihp import cells, tech
-from ihp.config import PATH
+import importlib
+import threading
+from typing import TYPE_CHECKING, Any
 
-# from ihp.models import get_models
-from ihp.tech import (
-    LAYER,
-    LAYER_STACK,
-    LAYER_VIEWS,
-    cross_sections,
-    #routing_strategies,
-)
+from ihp.config import PATH
 
-components = cells
+if TYPE_CHECKING:
+    from gdsfactory.pdk import Pdk
+    from gdsfactory.typings import ConnectivitySpec
 
 __version__ = "0.0.6"
 __all__ = [
@@ -34,27 +30,55 @@ __all__ = [
     "__version__",
 ]
 
-connectivity = cast(
-    list[ConnectivitySpec],
-    [
-        ("METAL1", "VIA1", "METAL2"),
-        ("METAL2", "VIA2", "METAL3"),
-        ("METAL3", "VIA3", "METAL4"),
-        ("METAL4", "VIA4", "METAL5"),
-        ("METAL5", "TOPVIA1", "TOPMETAL1"),
-        ("TOPMETAL1", "TOPVIA2", "TOPMETAL2"),
-    ],
-)
-
-_cells = get_cells(cells)
-PDK = Pdk(
-    name="IHP",
-    cells=_cells,
-    cross_sections=cross_sections,
-    # models=get_models(),
-    layers=LAYER,
-    layer_stack=LAYER_STACK,
-    layer_views=LAYER_VIEWS,
-    connectivity=connectivity,
-    #routing_strategies=routing_strategies,
-)
+connectivity: list[ConnectivitySpec] = [
+    ("METAL1", "VIA1", "METAL2"),
+    ("METAL2", "VIA2", "METAL3"),
+    ("METAL3", "VIA3", "METAL4"),
+    ("METAL4", "VIA4", "METAL5"),
+    ("METAL5", "TOPVIA1", "TOPMETAL1"),
+    ("TOPMETAL1", "TOPVIA2", "TOPMETAL2"),
+]
+
+_tech_names = {"LAYER", "LAYER_STACK", "LAYER_VIEWS", "cross_sections"}
+_lock = threading.RLock()
+
+
+def _get_pdk() -> Pdk:
+    from gdsfactory.pdk import Pdk
+
+    from ihp import cells, tech
+    from ihp.models import get_models
+
+    return Pdk(
+        name="IHP",
+        cells=cells.get_lazy_cells(),
+        cross_sections=tech.cross_sections,
+        models=get_models(),
+        layers=tech.LAYER,
+        layer_stack=tech.LAYER_STACK,
+        layer_views=tech.LAYER_VIEWS,
+        connectivity=connectivity,
+        routing_strategies=tech.routing_strategies,
+    )
+
+
+def __getattr__(name: str) -> Any:
+    with _lock:
+        if name in globals():
+            return globals()[name]
+        if name in {"cells", "components"}:
+            value = importlib.import_module("ihp.cells")
+        elif name == "tech":
+            value = importlib.import_module("ihp.tech")
+        elif name in _tech_names:
+            value = getattr(importlib.import_module("ihp.tech"), name)
+        elif name == "PDK":
+            value = _get_pdk()
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        globals()[name] = value
+        return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__, *_tech_names, "connectivity"})
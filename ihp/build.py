@@ -0,0 +1,134 @@
+"""Build step for the files generated from the IHP PDK.
+
+``ihp/layer_map_ihp.py`` is generated from the KLayout layer properties file
+``sg13g2.lyp`` and committed, so ``import ihp`` only imports it. Regenerate it
+after a PDK update with::
+
+    python -m ihp.build
+
+The generated module records the .lyp it was built from and its sha256.
+:func:`check_layer_map` hashes that same .lyp on import and warns when the
+module is stale. A map built from the shipped ``layers.lyp`` is not compared
+against the ``sg13g2.lyp`` of an installed PDK.
+
+The build step also refreshes the tech snapshots in the user cache, see
+:mod:`ihp.snapshot`, and the port sidecar of the fixed GDS cells, see
+:func:`write_fixed_ports`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pathlib
+import tempfile
+import warnings
+
+from ihp.config import PATH
+
+__all__ = [
+    "check_layer_map",
+    "layer_map_source",
+    "write_fixed_ports",
+    "write_layer_map",
+]
+
+map_name = "LayerMapIHP"
+
+
+def layer_map_source() -> pathlib.Path:
+    """Returns the .lyp of the installed PDK, or the copy shipped with the package."""
+    return PATH.pdk_lyp if PATH.pdk_lyp.is_file() else PATH.lyp
+
+
+def _sha256(path: pathlib.Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _source_name(lyp: pathlib.Path) -> str:
+    """Returns lyp relative to the package if it is inside it, else absolute."""
+    lyp = lyp.resolve()
+    try:
+        return lyp.relative_to(PATH.module).as_posix()
+    except ValueError:
+        return str(lyp)
+
+
+def _recorded_source() -> pathlib.Path | None:
+    """Returns the .lyp ``ihp.layer_map_ihp`` was generated from."""
+    from ihp import layer_map_ihp
+
+    source = getattr(layer_map_ihp, "LYP_SOURCE", None)
+    return None if source is None else PATH.module / source
+
+
+def write_layer_map(
+    lyp: pathlib.Path | None = None, output: pathlib.Path = PATH.layer_map
+) -> pathlib.Path:
+    """Writes the LayerMap module for lyp and returns its path.
+
+    Args:
+        lyp: KLayout layer properties file, defaults to :func:`layer_map_source`.
+        output: generated python module.
+    """
+    from gdsfactory.technology import lyp_to_dataclass
+
+    lyp = pathlib.Path(lyp or layer_map_source())
+    output = pathlib.Path(output)
+
+    fd, tmp = tempfile.mkstemp(
+        dir=output.parent, prefix=f".{output.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        script = lyp_to_dataclass(
+            lyp, overwrite=True, output_filepath=tmp, map_name=map_name
+        )
+        header = f"# Generated by `python -m ihp.build` from {lyp.name}, do not edit.\n"
+        footer = f'LYP_SOURCE = "{_source_name(lyp)}"\nLYP_SHA256 = "{_sha256(lyp)}"\n'
+        pathlib.Path(tmp).write_text(header + script + footer)
+        os.replace(tmp, output)  # atomic, concurrent imports never see a partial file
+    except BaseException:
+        pathlib.Path(tmp).unlink(missing_ok=True)
+        raise
+    return output
+
+
+def check_layer_map(lyp: pathlib.Path | None = None) -> bool:
+    """Returns True if ``ihp.layer_map_ihp`` matches lyp, warns otherwise.
+
+    Args:
+        lyp: to compare with, defaults to the .lyp the module was generated from.
+    """
+    from ihp import layer_map_ihp
+
+    lyp = pathlib.Path(lyp) if lyp is not None else _recorded_source()
+    try:
+        sha256 = _sha256(lyp)
+    except (OSError, TypeError):
+        return True  # nothing to compare against, use the committed module
+
+    if sha256 == getattr(layer_map_ihp, "LYP_SHA256", None):
+        return True
+
+    warnings.warn(
+        f"{PATH.layer_map.name} is out of date with {lyp}, "
+        "run `python -m ihp.build` to regenerate it.",
+        stacklevel=2,
+    )
+    return False
+
+
+def write_fixed_ports() -> pathlib.Path:
+    """Scans the pin shapes of every fixed GDS cell once and writes ``ports.json``."""
+    from ihp.cells.fixed import _scan_ports, library
+
+    return library.write_ports(_scan_ports)
+
+
+if __name__ == "__main__":
+    from ihp import snapshot
+
+    print(f"wrote {write_layer_map()}")
+    print(f"wrote {snapshot.refresh()}")
+    print(f"wrote {write_fixed_ports()}")
@@ -1,15 +1,133 @@
-"""Cells."""
+"""Cells.
+
+The cell modules are imported on first attribute access (PEP 562), so
+``import ihp.cells`` does not load ``cni``, ``pya`` or the ``sg13g2_pycell_lib``
+devices until a cell is used. ``ihp.cells.nmos`` and ``from ihp.cells import
+nmos`` work as before.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from typing import Any
 
-from .bondpads import *
-from .capacitors import *
-from .containers import *
 # from .fixed import *
-from .passives import *
-from .text import *
-from .via_stacks import *
-from .waveguides import *
-from .mos_transistors import *
-from .bjt_transistors import *
-from .inductors import *
-from .resistors import *
-from .antennas import *
+_modules = (
+    "bondpads",
+    "capacitors",
+    "containers",
+    "passives",
+    "text",
+    "via_stacks",
+    "waveguides",
+    "mos_transistors",
+    "bjt_transistors",
+    "inductors",
+    "resistors",
+    "antennas",
+)
+
+# cell name -> module, tests/test_import.py checks it against the modules
+_cells = {
+    "bondpad": "bondpads",
+    "bondpad_array": "bondpads",
+    "cmim": "capacitors",
+    "rfcmim": "capacitors",
+    "svaricap": "capacitors",
+    "add_pads_top": "containers",
+    "pack_doe": "containers",
+    "pack_doe_grid": "containers",
+    "esd": "passives",
+    "ptap1": "passives",
+    "ntap1": "passives",
+    "sealring": "passives",
+    "text_rectangular": "text",
+    "text_rectangular_multi_layer": "text",
+    "via_stack": "via_stacks",
+    "no_filler_stack": "via_stacks",
+    "straight": "waveguides",
+    "bend_euler": "waveguides",
+    "bend_s": "waveguides",
+    "wire_corner": "waveguides",
+    "wire_corner45": "waveguides",
+    "straight_metal": "waveguides",
+    "bend_metal": "waveguides",
+    "bend_s_metal": "waveguides",
+    "nmos": "mos_transistors",
+    "nmosHV": "mos_transistors",
+    "pmos": "mos_transistors",
+    "pmosHV": "mos_transistors",
+    "rfnmos": "mos_transistors",
+    "rfnmosHV": "mos_transistors",
+    "rfpmos": "mos_transistors",
+    "rfpmosHV": "mos_transistors",
+    "mos": "mos_transistors",
+    "npn13G2": "bjt_transistors",
+    "npn13G2L": "bjt_transistors",
+    "npn13G2V": "bjt_transistors",
+    "pnpMPA": "bjt_transistors",
+    "inductor2": "inductors",
+    "inductor3": "inductors",
+    "rhigh": "resistors",
+    "rppd": "resistors",
+    "rsil": "resistors",
+    "dantenna": "antennas",
+    "dpantenna": "antennas",
+}
+_other = {"generate_many": "batch"}
+
+
+def _import(module: str) -> Any:
+    return importlib.import_module(f"{__name__}.{module}")
+
+
+class _LazyCell:
+    """Stands in for a cell function in ``PDK.cells`` until it is used.
+
+    Calling it, or reading any attribute other than its name, imports the
+    cell module.
+    """
+
+    def __init__(self, name: str, module: str) -> None:
+        self.__name__ = self.__qualname__ = name
+        self.__module__ = f"{__name__}.{module}"
+
+    def _resolve(self) -> Any:
+        return getattr(importlib.import_module(self.__module__), self.__name__)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        if name in {"__name__", "__qualname__"}:  # not set yet, e.g. while copying
+            raise AttributeError(name)
+        return getattr(self._resolve(), name)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _LazyCell, (self.__name__, self.__module__.rpartition(".")[2])
+
+    def __repr__(self) -> str:
+        return f"<lazy cell {self.__module__}.{self.__name__}>"
+
+
+def get_lazy_cells() -> dict[str, Any]:
+    """Returns the cell functions by name, each module is imported on first use."""
+    return {name: _LazyCell(name, module) for name, module in _cells.items()}
+
+
+def __getattr__(name: str) -> Any:
+    module = _cells.get(name) or _other.get(name)
+    if module is not None:
+        value = getattr(_import(module), name)
+    elif not name.startswith("_") and importlib.util.find_spec(f"{__name__}.{name}"):
+        return _import(name)  # submodules such as utils, cache or batch
+    else:
+        # no cell module is imported for a typo or a hasattr() probe
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_cells, *_other})
@@ -0,0 +1,184 @@
+"""Batch generation of PyCell devices on a process pool.
+
+The PyCell ``produce`` calls are pure CPU work in the KLayout Python API, so
+sweeps with hundreds of devices scale with the number of cores when they run
+in worker processes. Workers send the produced layouts back as OASIS bytes.
+The parent then calls the regular cell functions, which pick the layouts up
+through the PyCell cache hook of ``generate_gf_from_ihp``. Cell names and the
+``@gf.cell`` cache end up exactly as in a serial run.
+
+Specs that reach no PyCell, or only cached ones, are drawn in the parent
+first. The pool only starts for the specs left, if any.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import gdsfactory as gf
+import pya
+
+from . import cache as _cache
+
+__all__ = ["generate_many"]
+
+Blobs = dict[str, tuple[bytes, list[dict[str, Any]]]]
+Spec = str | dict[str, Any] | tuple[Any, dict[str, Any]] | Callable[..., gf.Component]
+
+
+def _to_bytes(cell: pya.Cell) -> bytes:
+    options = pya.SaveLayoutOptions()
+    options.format = "OASIS"
+    options.select_cell(cell.cell_index())
+    return cell.layout().write_bytes(options)
+
+
+class _BlobCache:
+    """Keeps serialized PyCell layouts in memory, in front of another cache."""
+
+    def __init__(self, blobs: Blobs | None = None, inner: Any = None) -> None:
+        self.blobs: Blobs = dict(blobs or {})
+        self.inner = inner
+
+    def get(self, key: str) -> tuple[pya.Layout, list[dict[str, Any]]] | None:
+        if key not in self.blobs and isinstance(self.inner, _BlobCache):
+            if key in self.inner.blobs:
+                self.blobs[key] = self.inner.blobs[key]
+        if key in self.blobs:
+            data, ports = self.blobs[key]
+            layout = pya.Layout()
+            layout.read_bytes(data)
+            return layout, ports
+        hit = self.inner.get(key) if self.inner is not None else None
+        if hit is not None:
+            self.blobs[key] = (_to_bytes(hit[0].top_cell()), hit[1])
+        return hit
+
+    def put(self, key: str, cell: pya.Cell, ports: list[dict[str, Any]]) -> None:
+        self.blobs[key] = (_to_bytes(cell), ports)
+        if self.inner is not None:
+            self.inner.put(key, cell, ports)
+
+
+class _PyCellMiss(Exception):
+    """Raised by :class:`_Probe` on a PyCell layout that is not cached."""
+
+
+class _Probe:
+    """Serves the cached PyCell layouts and stops a cell at the first other one."""
+
+    def __init__(self, inner: Any = None) -> None:
+        self.inner = inner
+
+    def get(self, key: str) -> tuple[pya.Layout, list[dict[str, Any]]] | None:
+        hit = self.inner.get(key) if self.inner is not None else None
+        if hit is None:
+            raise _PyCellMiss(key)
+        return hit
+
+    def put(self, key: str, cell: pya.Cell, ports: list[dict[str, Any]]) -> None:
+        raise AssertionError("get raises before a PyCell runs")
+
+
+def _resolve(spec: Spec) -> tuple[Callable[..., gf.Component], dict[str, Any]]:
+    """Returns the cell function and settings of a spec."""
+    if isinstance(spec, dict):
+        factory, settings = spec["component"], dict(spec.get("settings", {}))
+    elif isinstance(spec, tuple):
+        factory, settings = spec[0], dict(spec[1])
+    else:
+        factory, settings = spec, {}
+
+    if isinstance(factory, str):
+        from ihp import PDK
+
+        factory = PDK.cells[factory]
+    return factory, settings
+
+
+def _spec_id(factory: Callable[..., Any], settings: dict[str, Any]) -> str:
+    name = f"{getattr(factory, '__module__', '')}.{getattr(factory, '__qualname__', repr(factory))}"
+    return json.dumps([name, _cache.normalize(settings)], sort_keys=True)
+
+
+_worker_blobs: _BlobCache | None = None
+
+
+def _init_worker() -> None:
+    global _worker_blobs
+    from ihp import PDK
+
+    PDK.activate()
+    _worker_blobs = _BlobCache(inner=_cache.get_cache())
+
+
+def _produce(factory: Callable[..., gf.Component], settings: dict[str, Any]) -> Blobs:
+    """Runs factory in a worker and returns every PyCell layout it uses.
+
+    ``@gf.cell`` would return sub-cells built by an earlier spec of this
+    worker without calling their PyCell, so their layouts would be missing
+    from this spec's blobs. The worker's cells are cleared first instead, and
+    the layouts of earlier specs come from ``_worker_blobs`` without running
+    the PyCells again.
+    """
+    gf.clear_cache()
+    recorder = _BlobCache(inner=_worker_blobs)
+    with _cache.use_cache(recorder):
+        factory(**settings)
+    return recorder.blobs
+
+
+def generate_many(
+    specs: Iterable[Spec], workers: int | None = None
+) -> list[gf.Component]:
+    """Returns the components for specs, running the PyCells on a process pool.
+
+    Specs that need no PyCell layout that is not cached yet are drawn in this
+    process, and no pool is started if that covers all of them.
+
+    Args:
+        specs: cell name, ``{"component": name, "settings": {...}}`` dict,
+            ``(cell, settings)`` tuple or cell function, one per component.
+        workers: number of worker processes. Defaults to the number of CPUs.
+
+    .. code::
+
+        import ihp
+
+        specs = [("rsil", dict(length=x, width=w)) for x in lengths for w in widths]
+        components = ihp.cells.generate_many(specs, workers=8)
+    """
+    resolved = [_resolve(spec) for spec in specs]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(resolved) < 2:
+        return [factory(**settings) for factory, settings in resolved]
+
+    components: list[gf.Component | None] = [None] * len(resolved)
+    pending = []
+    with _cache.use_cache(_Probe(_cache.get_cache())):
+        for i, (factory, settings) in enumerate(resolved):
+            try:
+                components[i] = factory(**settings)
+            except _PyCellMiss:
+                pending.append(i)
+    if not pending:
+        return components
+
+    unique = list({_spec_id(*resolved[i]): resolved[i] for i in pending}.values())
+    factories, arguments = zip(*unique)
+    chunksize = max(1, len(unique) // (4 * workers))
+
+    blobs: Blobs = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for produced in pool.map(_produce, factories, arguments, chunksize=chunksize):
+            blobs.update(produced)
+
+    with _cache.use_cache(_BlobCache(blobs, inner=_cache.get_cache())):
+        for i in pending:
+            factory, settings = resolved[i]
+            components[i] = factory(**settings)
+    return components
@@ -0,0 +1,305 @@
+"""Persistent on-disk cache for PyCell generated devices.
+
+``@gf.cell`` only memoizes inside one process. This cache keeps the layouts
+produced by the IHP PyCells across processes, so CI jobs and notebook
+restarts do not regenerate ``nmos``, ``inductor2``, ``bondpad``, ... again.
+
+Entries are content addressed. The key hashes the PyCell class, the top cell
+name, the normalized parameters, the ``add_ports`` callback that post-processes
+the cell and the ``techParams`` CDFVersion. Entries
+live in a directory named after a hash of the ``sg13g2_pycell_lib`` sources,
+so a PDK update starts from an empty directory and :meth:`PyCellCache.prune`
+drops the old ones.
+
+Each entry is an OASIS file with the produced cell plus a JSON file with the
+port metadata. The least recently used entries are evicted once the cache
+grows past ``max_bytes``.
+
+Set ``IHP_PYCELL_CACHE=0`` to disable the cache and ``IHP_CACHE_DIR`` to move it.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pya
+
+from ihp import tech
+from ihp.config import PATH
+
+PortsData = list[dict[str, Any]]
+
+# Entries of older formats are never read, bump when their contents change.
+# 2: ports are stored after the cell function added them.
+# 3: the MOS PyCells add their DS_/G_ ports.
+_FORMAT = 3
+
+
+@functools.cache
+def pdk_fingerprint(pycell_lib: pathlib.Path = PATH.pycell_lib) -> str:
+    """Returns a short hash of the PyCell library sources and tech files."""
+    h = hashlib.sha256()
+    for path in sorted(pycell_lib.rglob("*")):
+        if path.suffix in {".py", ".json"} and path.is_file():
+            h.update(path.relative_to(pycell_lib).as_posix().encode())
+            h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def normalize(value: Any) -> Any:
+    """Returns a JSON serializable version of value that is stable across runs.
+
+    Floats are rounded to 12 significant digits so that ``0.15 * 1e-6`` and
+    ``1.5e-07`` map to the same key.
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, int | str):
+        return value
+    if isinstance(value, float):
+        return float(f"{value:.12g}")
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, list | tuple):
+        return [normalize(v) for v in value]
+    return repr(value)
+
+
+def callback_name(fn: Callable[..., Any] | None) -> str | None:
+    """Returns the qualified name of fn with its ``version`` attribute, if any.
+
+    Give a callback a ``version`` attribute and bump it when its output
+    changes, so the entries it post-processed are not read again.
+    """
+    if fn is None:
+        return None
+    if isinstance(fn, functools.partial):
+        args = json.dumps(normalize([fn.args, fn.keywords]), sort_keys=True)
+        return f"{callback_name(fn.func)}{args}"
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    version = getattr(fn, "version", None)
+    return name if version is None else f"{name}:{version}"
+
+
+def cache_key(
+    impl: type,
+    cell_name: str,
+    cell_params: dict[str, Any],
+    add_ports: Callable[..., Any] | None = None,
+) -> str:
+    """Returns the content address of a PyCell call post-processed by add_ports."""
+    data = {
+        "format": _FORMAT,
+        "pycell": f"{impl.__module__}.{impl.__qualname__}",
+        "cell_name": cell_name,
+        "params": normalize(cell_params),
+        "add_ports": callback_name(add_ports),
+        "cdf_version": normalize(tech.techParams.get("CDFVersion")),
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+
+class PyCellCache:
+    """On-disk LRU cache of PyCell layouts and their port metadata.
+
+    Args:
+        root: cache directory, one sub directory per PDK fingerprint.
+        max_bytes: size cap, least recently used entries are evicted above it.
+        fingerprint: PDK fingerprint, defaults to a hash of ``PATH.pycell_lib``.
+    """
+
+    def __init__(
+        self,
+        root: pathlib.Path | str = PATH.cache / "pycells",
+        max_bytes: int = 512 * 2**20,
+        fingerprint: str | None = None,
+    ) -> None:
+        self.root = pathlib.Path(root)
+        self.max_bytes = max_bytes
+        self._fingerprint = fingerprint
+        self._size: int | None = None
+        self._stats = CacheStats()
+
+    @property
+    def fingerprint(self) -> str:
+        return self._fingerprint or pdk_fingerprint()
+
+    @property
+    def directory(self) -> pathlib.Path:
+        return self.root / self.fingerprint
+
+    def _paths(self, key: str) -> tuple[pathlib.Path, pathlib.Path]:
+        return self.directory / f"{key}.oas", self.directory / f"{key}.json"
+
+    def get(self, key: str) -> tuple[pya.Layout, PortsData] | None:
+        """Returns the cached layout and ports for key, or None on a miss."""
+        oas, meta = self._paths(key)
+        try:
+            ports = json.loads(meta.read_text())["ports"]
+            layout = pya.Layout()
+            layout.read(str(oas))
+            os.utime(oas)
+        except (OSError, RuntimeError, ValueError, KeyError):
+            self._stats.misses += 1
+            return None
+        self._stats.hits += 1
+        return layout, ports
+
+    def put(self, key: str, cell: pya.Cell, ports: PortsData) -> None:
+        """Stores cell and its ports under key.
+
+        Files are written under a temporary name and renamed into place, so
+        concurrent readers never see a partial entry. The cache is best effort,
+        a cache directory that cannot be written to is ignored.
+        """
+        oas, meta = self._paths(key)
+
+        options = pya.SaveLayoutOptions()
+        options.format = "OASIS"
+        options.oasis_compression_level = 10
+        options.select_cell(cell.cell_index())
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._atomic_write(
+                meta, lambda path: path.write_text(json.dumps({"ports": ports}))
+            )
+            self._atomic_write(
+                oas, lambda path: cell.layout().write(str(path), options)
+            )
+        except OSError:
+            return
+        self._stats.writes += 1
+
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += oas.stat().st_size + meta.stat().st_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def _atomic_write(self, path: pathlib.Path, write) -> None:
+        fd, tmp = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        os.close(fd)
+        try:
+            write(pathlib.Path(tmp))
+            os.replace(tmp, path)
+        except BaseException:
+            pathlib.Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _entries(self) -> list[tuple[float, int, pathlib.Path]]:
+        """Returns (mtime, size, oas path) of every entry, oldest first."""
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for oas in self.directory.glob("*.oas"):
+            try:
+                st = oas.stat()
+                size = st.st_size + oas.with_suffix(".json").stat().st_size
+            except OSError:
+                continue
+            entries.append((st.st_mtime, size, oas))
+        return sorted(entries)
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_bytes: int | None = None) -> int:
+        """Removes least recently used entries until the cache fits max_bytes.
+
+        Returns the number of evicted entries.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self._entries()
+        size = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, entry_size, oas in entries:
+            if size <= max_bytes:
+                break
+            oas.unlink(missing_ok=True)
+            oas.with_suffix(".json").unlink(missing_ok=True)
+            size -= entry_size
+            evicted += 1
+        self._size = size
+        self._stats.evictions += evicted
+        return evicted
+
+    def stats(self) -> CacheStats:
+        """Returns hit/miss counters of this process and the current disk usage."""
+        entries = self._entries()
+        self._size = sum(size for _, size, _ in entries)
+        return dataclasses.replace(
+            self._stats, entries=len(entries), size_bytes=self._size
+        )
+
+    def prune(self) -> int:
+        """Removes the entries of other PDK installs. Returns the number of removed directories."""
+        removed = 0
+        if self.root.is_dir():
+            for directory in self.root.iterdir():
+                if directory.is_dir() and directory.name != self.fingerprint:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Removes every entry, for all PDK installs."""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._size = 0
+
+
+_default = object()
+_cache: Any = _default
+
+
+def get_cache() -> PyCellCache | None:
+    """Returns the default cache, None if disabled with ``IHP_PYCELL_CACHE=0``."""
+    global _cache
+    if _cache is not _default:
+        return _cache
+    if os.environ.get("IHP_PYCELL_CACHE", "1").lower() in {"0", "false", "no", "off"}:
+        return None
+    _cache = PyCellCache()
+    return _cache
+
+
+def set_cache(cache: PyCellCache | None) -> None:
+    """Replaces the default cache, None disables caching in this process."""
+    global _cache
+    _cache = cache
+
+
+@contextlib.contextmanager
+def use_cache(cache: Any) -> Iterator[None]:
+    """Temporarily replaces the cache used by ``generate_gf_from_ihp``.
+
+    Any object with the ``get`` and ``put`` methods of :class:`PyCellCache` works.
+    """
+    global _cache
+    previous = _cache
+    _cache = cache
+    try:
+        yield
+    finally:
+        _cache = previous
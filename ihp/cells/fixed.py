@@ -4,6 +4,7 @@ from functools import partial
 
 import gdsfactory as gf
 
+from ihp.cells.fixed_library import add_ports, library
 from ihp.config import PATH
 
 _add_ports_metal1 = partial(
@@ -14,7 +15,26 @@ _add_ports_metal2 = partial(
 )
 _add_ports = (_add_ports_metal1, _add_ports_metal2)
 gdsdir = PATH.gds
-import_gds = partial(gf.import_gds, post_process=_add_ports)
+
+
+def _scan_ports(c: gf.Component) -> None:
+    for post_process in _add_ports:
+        post_process(c)
+
+
+def import_gds(gdspath) -> gf.Component:
+    """Loads a fixed cell through the shared library and adds its pin ports.
+
+    The ports come from ``ports.json`` written by ``python -m ihp.build``, the
+    pin shapes are only scanned when the GDS file changed since.
+    """
+    c = library.component(gdspath)
+    ports = library.ports(gdspath)
+    if ports is None:
+        _scan_ports(c)
+    else:
+        add_ports(c, ports)
+    return c
 
 
 @gf.cell
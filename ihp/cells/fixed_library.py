@@ -0,0 +1,276 @@
+"""Shared, on-demand loading of the fixed GDS cells under ``ihp/gds``.
+
+``gf.import_gds`` parses its file on every call and copies the whole cell tree
+into the gdsfactory layout. Sub-cells that several files contain, such as the
+``M2_M1_CDNS_*`` vias or ``npn13G2_base_*``, end up parsed and stored once per
+file. :class:`FixedLibrary` reads each file at most once, identifies every cell
+by a hash of its content (shapes per layer and child instances) and copies a
+cell into the gdsfactory layout only the first time that content is seen.
+
+Ports of the fixed cells come from a scan of their pin shapes. The build step
+(``python -m ihp.build``) runs that scan once and stores the ports with the
+sha256 of each GDS file in ``ports.json`` next to the files.
+:meth:`FixedLibrary.ports` returns them while the file hash still matches.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import gdsfactory as gf
+from kfactory import kdb
+
+from ihp.config import PATH
+
+__all__ = ["FixedLibrary", "add_ports", "content_hashes", "library", "ports_data"]
+
+PortsData = list[dict[str, Any]]
+
+
+def content_hashes(
+    layout: kdb.Layout,
+    top: kdb.Cell | None = None,
+    layer_indexes: Iterable[int] | None = None,
+    known: dict[int, str] | None = None,
+) -> dict[int, str]:
+    """Returns the content hash of every cell of layout by cell index.
+
+    Cells with the same shapes and the same child instances get the same hash,
+    whatever their name.
+
+    Args:
+        layout: to hash.
+        top: only hash this cell and the cells it calls.
+        layer_indexes: only hash the shapes of these layers.
+        known: hashes computed before by cell index, returned as is.
+    """
+    cells = None if top is None else {top.cell_index(), *top.called_cells()}
+    layer_indexes = list(
+        layout.layer_indexes() if layer_indexes is None else layer_indexes
+    )
+    hashes: dict[int, str] = {}
+    for ci in layout.each_cell_bottom_up():
+        if cells is not None and ci not in cells:
+            continue
+        if known is not None and ci in known:
+            hashes[ci] = known[ci]
+            continue
+        cell = layout.cell(ci)
+        h = hashlib.sha256()
+        for li in layer_indexes:
+            shapes = cell.shapes(li)
+            if shapes.is_empty():
+                continue
+            info = layout.get_info(li)
+            h.update(f"L{info.layer}/{info.datatype}".encode())
+            for shape in sorted(str(s) for s in shapes.each()):
+                h.update(shape.encode())
+        instances = sorted(
+            f"{hashes[inst.cell_index]} {inst.cplx_trans} {inst.a} {inst.b} {inst.na} {inst.nb}"
+            for inst in cell.each_inst()
+        )
+        for inst in instances:
+            h.update(f"I{inst}".encode())
+        h.update(f"dbu{layout.dbu}".encode())
+        hashes[ci] = h.hexdigest()
+    return hashes
+
+
+def ports_data(c: gf.Component) -> PortsData:
+    """Returns the ports of c as plain data."""
+    return [
+        dict(
+            name=port.name,
+            center=list(port.dcenter),
+            width=port.dwidth,
+            orientation=port.orientation,
+            layer=[port.layer_info.layer, port.layer_info.datatype],
+            port_type=port.port_type,
+        )
+        for port in c.ports
+    ]
+
+
+def add_ports(c: gf.Component, ports: PortsData) -> None:
+    """Adds ports stored by :func:`ports_data` to c."""
+    for port in ports:
+        c.add_port(
+            **{**port, "center": tuple(port["center"]), "layer": tuple(port["layer"])}
+        )
+
+
+class FixedLibrary:
+    """Fixed GDS cells of a directory, loaded on demand with shared sub-cells.
+
+    Args:
+        gdsdir: directory with one GDS file per fixed cell.
+
+    .. code::
+
+        from ihp.cells.fixed_library import library
+
+        c = library.component("npn13G2")
+    """
+
+    def __init__(self, gdsdir: pathlib.Path | str = PATH.gds) -> None:
+        self.gdsdir = pathlib.Path(gdsdir)
+        self.sidecar = self.gdsdir / "ports.json"
+        self._sidecar: dict[str, Any] | None = None
+        self._sha256: dict[pathlib.Path, str] = {}
+        self._files: dict[pathlib.Path, tuple[kdb.Layout, dict[int, str]]] = {}
+        self._loaded: dict[str, tuple[int, str]] = {}  # hash -> (cell index, name)
+        self._lock = threading.RLock()
+
+    def paths(self) -> dict[str, pathlib.Path]:
+        """Returns the GDS files of the library by name."""
+        return {path.stem: path for path in sorted(self.gdsdir.glob("*.gds"))}
+
+    def _path(self, name: str | pathlib.Path) -> pathlib.Path:
+        path = pathlib.Path(name)
+        if path.suffix.lower() != ".gds":
+            path = self.gdsdir / f"{name}.gds"
+        return path.resolve()
+
+    def _read(self, path: pathlib.Path) -> tuple[kdb.Layout, dict[int, str]]:
+        if path not in self._files:
+            layout = kdb.Layout()
+            layout.read(str(path))
+            dbu = gf.kcl.layout.dbu
+            if layout.dbu != dbu:
+                layout.transform(kdb.ICplxTrans(layout.dbu / dbu))
+                layout.dbu = dbu
+            self._files[path] = (layout, content_hashes(layout))
+        return self._files[path]
+
+    def index(self) -> dict[str, str]:
+        """Reads every GDS file once and returns the top cell content hashes by name."""
+        with self._lock:
+            index = {}
+            for name, path in self.paths().items():
+                layout, hashes = self._read(path.resolve())
+                index[name] = hashes[layout.top_cell().cell_index()]
+            return index
+
+    def _copy(
+        self,
+        layout: kdb.Layout,
+        cell: kdb.Cell,
+        hashes: dict[int, str],
+        target: kdb.Cell,
+    ) -> None:
+        """Copies the shapes of cell into target and instantiates shared children."""
+        target_layout = target.layout()
+        for li in layout.layer_indexes():
+            shapes = cell.shapes(li)
+            if not shapes.is_empty():
+                target.shapes(target_layout.layer(layout.get_info(li))).insert(shapes)
+        for inst in cell.each_inst():
+            array = inst.cell_inst.dup()
+            array.cell_index = self._shared(
+                layout, inst.cell_index, hashes, target_layout
+            )
+            target.insert(array)
+
+    def _shared(
+        self,
+        layout: kdb.Layout,
+        ci: int,
+        hashes: dict[int, str],
+        target_layout: kdb.Layout,
+    ) -> int:
+        """Returns the index of the gdsfactory cell with the content of cell ci."""
+        key = hashes[ci]
+        loaded = self._loaded.get(key)
+        if loaded is not None:
+            index, name = loaded
+            if (
+                target_layout.is_valid_cell_index(index)
+                and target_layout.cell(index).name == name
+            ):
+                return index
+
+        cell = layout.cell(ci)
+        c = gf.Component()
+        if target_layout.cell(cell.name) is None:
+            c.name = cell.name
+        else:
+            c.name = f"{cell.name}_{key[:8]}"
+        self._copy(layout, cell, hashes, c.kdb_cell)
+        c.lock()
+        self._loaded[key] = (c.kdb_cell.cell_index(), c.name)
+        return c.kdb_cell.cell_index()
+
+    def component(self, name: str | pathlib.Path) -> gf.Component:
+        """Returns a new Component with the top cell of a fixed GDS file.
+
+        The top cell is copied on every call, its sub-cells are shared with
+        every Component loaded before. It keeps the GDS name unless a cell
+        with that name already exists.
+
+        Args:
+            name: cell name in the library or path to a GDS file.
+        """
+        with self._lock:
+            layout, hashes = self._read(self._path(name))
+            top = layout.top_cell()
+            c = gf.Component()
+            if c.kcl.layout.cell(top.name) is None:
+                c.name = top.name
+            self._copy(layout, top, hashes, c.kdb_cell)
+            return c
+
+    def sha256(self, name: str | pathlib.Path) -> str:
+        """Returns the sha256 of a GDS file of the library."""
+        path = self._path(name)
+        with self._lock:
+            if path not in self._sha256:
+                self._sha256[path] = hashlib.sha256(path.read_bytes()).hexdigest()
+            return self._sha256[path]
+
+    def ports(self, name: str | pathlib.Path) -> PortsData | None:
+        """Returns the stored ports of a fixed cell, None if missing or out of date."""
+        with self._lock:
+            if self._sidecar is None:
+                try:
+                    self._sidecar = json.loads(self.sidecar.read_text())
+                except (OSError, ValueError):
+                    self._sidecar = {}
+            entry = self._sidecar.get(self._path(name).name)
+        if entry is None or entry.get("sha256") != self.sha256(name):
+            return None
+        return entry["ports"]
+
+    def write_ports(self, scan: Callable[[gf.Component], None]) -> pathlib.Path:
+        """Scans the ports of every fixed cell once and writes them to the sidecar.
+
+        Args:
+            scan: adds the ports of a fixed cell found from its pin shapes.
+        """
+        entries = {}
+        for path in self.paths().values():
+            c = self.component(path)
+            scan(c)
+            entries[path.name] = {"sha256": self.sha256(path), "ports": ports_data(c)}
+
+        fd, tmp = tempfile.mkstemp(dir=self.gdsdir, prefix=".ports.", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.sidecar)
+        with self._lock:
+            self._sidecar = entries
+        return self.sidecar
+
+    def loaded_cells(self) -> int:
+        """Returns how many distinct sub-cells were copied into gdsfactory."""
+        return len(self._loaded)
+
+
+library = FixedLibrary()
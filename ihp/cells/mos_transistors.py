@@ -1,9 +1,13 @@
 import sys
+
 sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python")
-sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/")
+sys.path.append(
+    "/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/"
+)
 
-from sg13g2_pycell_lib.ihp.utility_functions import eng_string_to_float
+from functools import partial
 
+import gdsfactory as gf
 from sg13g2_pycell_lib.ihp.nmos_code import nmos as nmosIHP
 from sg13g2_pycell_lib.ihp.nmosHV_code import nmosHV as nmosHVIHP
 from sg13g2_pycell_lib.ihp.pmos_code import pmos as pmosIHP
@@ -12,103 +16,137 @@ from sg13g2_pycell_lib.ihp.rfnmos_code import rfnmos as rfnmosIHP
 from sg13g2_pycell_lib.ihp.rfnmosHV_code import rfnmosHV as rfnmosHVIHP
 from sg13g2_pycell_lib.ihp.rfpmos_code import rfpmos as rfpmosIHP
 from sg13g2_pycell_lib.ihp.rfpmosHV_code import rfpmosHV as rfpmosHVIHP
+from sg13g2_pycell_lib.ihp.utility_functions import eng_string_to_float
 
-
-import gdsfactory as gf
-
-from .utils import *
-from functools import partial
 from .. import tech
-
-
+from .ports import add_ports_from_boxes
+from .utils import generate_gf_from_ihp
 
 _add_ports_metal1 = partial(
-    gf.add_ports.add_ports_from_boxes, pin_layer=(tech.LAYER.Metal1drawing), port_type="electrical", port_name_prefix='DS_', ports_on_short_side=True, auto_rename_ports=False
+    add_ports_from_boxes,
+    pin_layer=(tech.LAYER.Metal1drawing),
+    port_type="electrical",
+    port_name_prefix="DS_",
+    ports_on_short_side=True,
+    auto_rename_ports=False,
 )
 _add_ports_poly = partial(
-    gf.add_ports.add_ports_from_boxes, pin_layer=(tech.LAYER.GatPolydrawing), port_type="electrical", port_name_prefix="G_", ports_on_short_side=True, auto_rename_ports=False
+    add_ports_from_boxes,
+    pin_layer=(tech.LAYER.GatPolydrawing),
+    port_type="electrical",
+    port_name_prefix="G_",
+    ports_on_short_side=True,
+    auto_rename_ports=False,
 )
 _add_ports = (_add_ports_metal1, _add_ports_poly)
 
+
+def _add_pycell_ports(c: gf.Component) -> None:
+    """Adds the DS_ ports on the Metal1 and the G_ ports on the GatPoly boxes."""
+    for add_ports in _add_ports:
+        add_ports(c)
+
+
 @gf.cell
 def nmos(
-    w = 0.15, 
-    l = 0.13, 
-    ng = 1,
-    guardRingType = "none",
-    guardRingDistance = 1,
-    ) -> gf.Component:
-    """Create an NMOS transistor.
+    w=0.15,
+    l=0.13,
+    ng=1,
+    guardRingType="none",
+    guardRingDistance=1,
+) -> gf.Component:
+    """Create an NMOS transistor with the IHP ``nmos`` PyCell.
+
+    :func:`mos` draws the same device natively, this cell moves over to it
+    once tests/test_mos.py passes against the PyCell.
 
     Args:
         w: Total width of the transistor in micrometers.
         l: Length of the transistor in micrometers.
         ng: Number of gates/fingers.
+        guardRingType: none, psub or nwell.
+        guardRingDistance: Distance from the guard ring to Activ in micrometers.
 
     Returns:
         Component with NMOS transistor layout.
     """
-   
+
     params = {
-        'cdf_version': tech.techParams['CDFVersion'],
-        'model': tech.techParams['nmos_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['nmos_defW'])/eng_string_to_float(tech.techParams['nmos_defNG']),   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'm': 1,      # Multiplier
-        'Wmin': eng_string_to_float(tech.techParams['nmos_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['nmos_minL']),
-        'trise': '',
-        'Display': 'Selected',
-        'guardRingType': guardRingType,
-        'guardRingDistance': guardRingDistance*1e-6,
+        "cdf_version": tech.techParams["CDFVersion"],
+        "model": tech.techParams["nmos_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["nmos_defW"])
+        / eng_string_to_float(tech.techParams["nmos_defNG"]),  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "m": 1,  # Multiplier
+        "Wmin": eng_string_to_float(tech.techParams["nmos_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["nmos_minL"]),
+        "trise": "",
+        "Display": "Selected",
+        "guardRingType": guardRingType,
+        "guardRingDistance": guardRingDistance * 1e-6,
     }
 
-    c = generate_gf_from_ihp(cell_name="nmos", cell_params=params, function_name=nmosIHP())
+    c = generate_gf_from_ihp(
+        cell_name="nmos",
+        cell_params=params,
+        function_name=nmosIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
     return c
 
+
 @gf.cell
 def nmosHV(
-    w = 0.60, 
-    l = 0.45, 
-    ng = 1, 
-    guardRingType = "none",
-    guardRingDistance = 1,
-    ) -> gf.Component:
-    """Create an PMOS transistor.
+    w=0.60,
+    l=0.45,
+    ng=1,
+    guardRingType="none",
+    guardRingDistance=1,
+) -> gf.Component:
+    """Create an NMOS HV transistor with the IHP ``nmosHV`` PyCell.
+
+    :func:`mos` draws the same device natively, this cell moves over to it
+    once tests/test_mos.py passes against the PyCell.
 
     Args:
         w: Total width of the transistor in micrometers.
         l: Length of the transistor in micrometers.
         ng: Number of gates/fingers.
-        guardRingType: Type of guard ring ("none", "psub").
-        #TODO
+        guardRingType: none, psub or nwell.
+        guardRingDistance: Distance from the guard ring to Activ in micrometers.
+
     Returns:
-        Component with PMOS transistor layout.
+        Component with NMOS HV transistor layout.
     """
-    
-    
+
     params = {
-        'cdf_version': tech.techParams['CDFVersion'],
-        'model': tech.techParams['nmosHV_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['nmosHV_defW'])/eng_string_to_float(tech.techParams['nmosHV_defNG']),   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'm': 1,      # Multiplier
-        'Wmin': eng_string_to_float(tech.techParams['nmosHV_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['nmosHV_minL']),
-        'trise': '',
-        'Display': 'Selected',
-        'guardRingType': guardRingType,
-        'guardRingDistance': guardRingDistance*1e-6,
+        "cdf_version": tech.techParams["CDFVersion"],
+        "model": tech.techParams["nmosHV_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["nmosHV_defW"])
+        / eng_string_to_float(tech.techParams["nmosHV_defNG"]),  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "m": 1,  # Multiplier
+        "Wmin": eng_string_to_float(tech.techParams["nmosHV_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["nmosHV_minL"]),
+        "trise": "",
+        "Display": "Selected",
+        "guardRingType": guardRingType,
+        "guardRingDistance": guardRingDistance * 1e-6,
     }
 
-    c = generate_gf_from_ihp(cell_name="nmosHV", cell_params=params, function_name=nmosHVIHP())
+    c = generate_gf_from_ihp(
+        cell_name="nmosHV",
+        cell_params=params,
+        function_name=nmosHVIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -117,47 +155,51 @@ def nmosHV(
 
 @gf.cell
 def pmos(
-    w = 0.15, 
-    l = 0.13, 
-    ng = 1,
-    guardRingType = "none",
-    guardRingDistance = 1,
-    ) -> gf.Component:
-    """Create an PMOS transistor.
+    w=0.15,
+    l=0.13,
+    ng=1,
+    guardRingType="none",
+    guardRingDistance=1,
+) -> gf.Component:
+    """Create a PMOS transistor with the IHP ``pmos`` PyCell.
+
+    :func:`mos` draws the same device natively, this cell moves over to it
+    once tests/test_mos.py passes against the PyCell.
 
     Args:
-        cdf_version: CDF version.
-        model: Device model name.
         w: Total width of the transistor in micrometers.
-        ws: Single width in nanometers.
         l: Length of the transistor in micrometers.
-        Wmin: Minimum width in micrometers.
-        Lmin: Minimum length in micrometers.
         ng: Number of gates/fingers.
-        m: Multiplier (number of parallel devices).
-        trise: Temp rise from ambient
+        guardRingType: none, psub or nwell.
+        guardRingDistance: Distance from the guard ring to Activ in micrometers.
 
     Returns:
         Component with PMOS transistor layout.
     """
-    
+
     params = {
-        'cdf_version': tech.techParams['CDFVersion'],
-        'model': tech.techParams['pmos_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['pmos_defW'])/eng_string_to_float(tech.techParams['pmos_defNG']),   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'm': 1,      # Multiplier
-        'Wmin': eng_string_to_float(tech.techParams['pmos_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['pmos_minL']),
-        'trise': '',
-        'Display': 'Selected',
-        'guardRingType': guardRingType,
-        'guardRingDistance': guardRingDistance*1e-6,
+        "cdf_version": tech.techParams["CDFVersion"],
+        "model": tech.techParams["pmos_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["pmos_defW"])
+        / eng_string_to_float(tech.techParams["pmos_defNG"]),  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "m": 1,  # Multiplier
+        "Wmin": eng_string_to_float(tech.techParams["pmos_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["pmos_minL"]),
+        "trise": "",
+        "Display": "Selected",
+        "guardRingType": guardRingType,
+        "guardRingDistance": guardRingDistance * 1e-6,
     }
 
-    c = generate_gf_from_ihp(cell_name="pmos", cell_params=params, function_name=pmosIHP())
+    c = generate_gf_from_ihp(
+        cell_name="pmos",
+        cell_params=params,
+        function_name=pmosIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -166,47 +208,51 @@ def pmos(
 
 @gf.cell
 def pmosHV(
-    w = 0.30, 
-    l = 0.40, 
-    ng = 1,
-    guardRingType = "none",
-    guardRingDistance = 1,
-    ) -> gf.Component:
-    """Create an PMOSHV transistor.
+    w=0.30,
+    l=0.40,
+    ng=1,
+    guardRingType="none",
+    guardRingDistance=1,
+) -> gf.Component:
+    """Create a PMOS HV transistor with the IHP ``pmosHV`` PyCell.
+
+    :func:`mos` draws the same device natively, this cell moves over to it
+    once tests/test_mos.py passes against the PyCell.
 
     Args:
-        cdf_version: CDF version.
-        model: Device model name.
         w: Total width of the transistor in micrometers.
-        ws: Single width in nanometers.
         l: Length of the transistor in micrometers.
-        Wmin: Minimum width in micrometers.
-        Lmin: Minimum length in micrometers.
         ng: Number of gates/fingers.
-        m: Multiplier (number of parallel devices).
-        trise: Temp rise from ambient
-        #TODO
+        guardRingType: none, psub or nwell.
+        guardRingDistance: Distance from the guard ring to Activ in micrometers.
+
     Returns:
-        Component with PMOS transistor layout.
+        Component with PMOS HV transistor layout.
     """
-    
+
     params = {
-        'cdf_version': tech.techParams['CDFVersion'],
-        'model': tech.techParams['pmosHV_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['pmosHV_defW'])/eng_string_to_float(tech.techParams['pmosHV_defNG']),   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'm': 1,      # Multiplier
-        'Wmin': eng_string_to_float(tech.techParams['pmosHV_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['pmosHV_minL']),
-        'trise': '',
-        'Display': 'Selected',
-        'guardRingType': guardRingType,
-        'guardRingDistance': guardRingDistance*1e-6,
+        "cdf_version": tech.techParams["CDFVersion"],
+        "model": tech.techParams["pmosHV_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["pmosHV_defW"])
+        / eng_string_to_float(tech.techParams["pmosHV_defNG"]),  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "m": 1,  # Multiplier
+        "Wmin": eng_string_to_float(tech.techParams["pmosHV_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["pmosHV_minL"]),
+        "trise": "",
+        "Display": "Selected",
+        "guardRingType": guardRingType,
+        "guardRingDistance": guardRingDistance * 1e-6,
     }
 
-    c = generate_gf_from_ihp(cell_name="pmosHV", cell_params=params, function_name=pmosHVIHP())
+    c = generate_gf_from_ihp(
+        cell_name="pmosHV",
+        cell_params=params,
+        function_name=pmosHVIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -222,7 +268,7 @@ def rfnmos(
     Met2Cont="Yes",
     gat_ring="Yes",
     guard_ring="Yes",
-    ) -> gf.Component:
+) -> gf.Component:
     """Create an RF NMOS transistor.
 
     Args:
@@ -241,28 +287,35 @@ def rfnmos(
     Returns:
         Component with PMOS transistor layout.
     """
-    
-    params = {       
-        'cdf_version': tech.techParams['CDFVersion'], 
-        'rfmode': 1,
-        'model': tech.techParams['rfnmos_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['rfnmos_defW'])/eng_string_to_float(tech.techParams['rfnmos_defNG'])*1e-6,   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'calculate': True,
-        'cnt_rows': cnt_rows,
-        'Met2Cont': Met2Cont,
-        'gat_ring': gat_ring,
-        'guard_ring': guard_ring,
-        'Wmin': eng_string_to_float(tech.techParams['rfnmos_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['rfnmos_minL']),
-        'm': 1,
-        'trise': '',
-        'Display': 'Selected'
+
+    params = {
+        "cdf_version": tech.techParams["CDFVersion"],
+        "rfmode": 1,
+        "model": tech.techParams["rfnmos_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["rfnmos_defW"])
+        / eng_string_to_float(tech.techParams["rfnmos_defNG"])
+        * 1e-6,  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "calculate": True,
+        "cnt_rows": cnt_rows,
+        "Met2Cont": Met2Cont,
+        "gat_ring": gat_ring,
+        "guard_ring": guard_ring,
+        "Wmin": eng_string_to_float(tech.techParams["rfnmos_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["rfnmos_minL"]),
+        "m": 1,
+        "trise": "",
+        "Display": "Selected",
     }
 
-    c = generate_gf_from_ihp(cell_name="rfnmos", cell_params=params, function_name=rfnmosIHP())
+    c = generate_gf_from_ihp(
+        cell_name="rfnmos",
+        cell_params=params,
+        function_name=rfnmosIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -278,7 +331,7 @@ def rfnmosHV(
     Met2Cont="Yes",
     gat_ring="Yes",
     guard_ring="Yes",
-    ) -> gf.Component:
+) -> gf.Component:
     """Create an RF NMOS transistor.
 
     Args:
@@ -297,28 +350,35 @@ def rfnmosHV(
     Returns:
         Component with PMOS transistor layout.
     """
-    
-    params = {       
-        'cdf_version': tech.techParams['CDFVersion'], 
-        'rfmode': 1,
-        'model': tech.techParams['rfnmosHV_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['rfnmosHV_defW'])/eng_string_to_float(tech.techParams['rfnmosHV_defNG'])*1e-6,   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'calculate': True,
-        'cnt_rows': cnt_rows,
-        'Met2Cont': Met2Cont,
-        'gat_ring': gat_ring,
-        'guard_ring': guard_ring,
-        'Wmin': eng_string_to_float(tech.techParams['rfnmosHV_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['rfnmosHV_minL']),
-        'm': 1,
-        'trise': '',
-        'Display': 'Selected'
+
+    params = {
+        "cdf_version": tech.techParams["CDFVersion"],
+        "rfmode": 1,
+        "model": tech.techParams["rfnmosHV_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["rfnmosHV_defW"])
+        / eng_string_to_float(tech.techParams["rfnmosHV_defNG"])
+        * 1e-6,  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "calculate": True,
+        "cnt_rows": cnt_rows,
+        "Met2Cont": Met2Cont,
+        "gat_ring": gat_ring,
+        "guard_ring": guard_ring,
+        "Wmin": eng_string_to_float(tech.techParams["rfnmosHV_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["rfnmosHV_minL"]),
+        "m": 1,
+        "trise": "",
+        "Display": "Selected",
     }
 
-    c = generate_gf_from_ihp(cell_name="rfnmosHV", cell_params=params, function_name=rfnmosHVIHP())
+    c = generate_gf_from_ihp(
+        cell_name="rfnmosHV",
+        cell_params=params,
+        function_name=rfnmosHVIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -334,7 +394,7 @@ def rfpmos(
     Met2Cont="Yes",
     gat_ring="Yes",
     guard_ring="Yes",
-    ) -> gf.Component:
+) -> gf.Component:
     """Create an RF NMOS transistor.
 
     Args:
@@ -353,33 +413,41 @@ def rfpmos(
     Returns:
         Component with PMOS transistor layout.
     """
-    
-    params = {       
-        'cdf_version': tech.techParams['CDFVersion'], 
-        'rfmode': 1,
-        'model': tech.techParams['rfpmos_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['rfpmos_defW'])/eng_string_to_float(tech.techParams['rfpmos_defNG'])*1e-6,   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'calculate': True,
-        'cnt_rows': cnt_rows,
-        'Met2Cont': Met2Cont,
-        'gat_ring': gat_ring,
-        'guard_ring': guard_ring,
-        'Wmin': eng_string_to_float(tech.techParams['rfpmos_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['rfpmos_minL']),
-        'm': 1,
-        'trise': '',
-        'Display': 'Selected'
+
+    params = {
+        "cdf_version": tech.techParams["CDFVersion"],
+        "rfmode": 1,
+        "model": tech.techParams["rfpmos_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["rfpmos_defW"])
+        / eng_string_to_float(tech.techParams["rfpmos_defNG"])
+        * 1e-6,  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "calculate": True,
+        "cnt_rows": cnt_rows,
+        "Met2Cont": Met2Cont,
+        "gat_ring": gat_ring,
+        "guard_ring": guard_ring,
+        "Wmin": eng_string_to_float(tech.techParams["rfpmos_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["rfpmos_minL"]),
+        "m": 1,
+        "trise": "",
+        "Display": "Selected",
     }
 
-    c = generate_gf_from_ihp(cell_name="rfpmos", cell_params=params, function_name=rfpmosIHP())
+    c = generate_gf_from_ihp(
+        cell_name="rfpmos",
+        cell_params=params,
+        function_name=rfpmosIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
     return c
 
+
 @gf.cell
 def rfpmosHV(
     w=1.0,
@@ -389,7 +457,7 @@ def rfpmosHV(
     Met2Cont="Yes",
     gat_ring="Yes",
     guard_ring="Yes",
-    ) -> gf.Component:
+) -> gf.Component:
     """Create an RF NMOS transistor.
 
     Args:
@@ -408,29 +476,274 @@ def rfpmosHV(
     Returns:
         Component with PMOS transistor layout.
     """
-    
-    params = {       
-        'cdf_version': tech.techParams['CDFVersion'], 
-        'rfmode': 1,
-        'model': tech.techParams['rfpmosHV_model'],
-        'w': w*1e-6,    # Width in μm
-        'ws': eng_string_to_float(tech.techParams['rfpmosHV_defW'])/eng_string_to_float(tech.techParams['rfpmosHV_defNG'])*1e-6,   # Single Width in nm
-        'l': l*1e-6,   # Length in μm
-        'ng': ng,     # Number of gates
-        'calculate': True,
-        'cnt_rows': cnt_rows,
-        'Met2Cont': Met2Cont,
-        'gat_ring': gat_ring,
-        'guard_ring': guard_ring,
-        'Wmin': eng_string_to_float(tech.techParams['rfpmosHV_minW']),
-        'Lmin': eng_string_to_float(tech.techParams['rfpmosHV_minL']),
-        'm': 1,
-        'trise': '',
-        'Display': 'Selected'
+
+    params = {
+        "cdf_version": tech.techParams["CDFVersion"],
+        "rfmode": 1,
+        "model": tech.techParams["rfpmosHV_model"],
+        "w": w * 1e-6,  # Width in μm
+        "ws": eng_string_to_float(tech.techParams["rfpmosHV_defW"])
+        / eng_string_to_float(tech.techParams["rfpmosHV_defNG"])
+        * 1e-6,  # Single Width in nm
+        "l": l * 1e-6,  # Length in μm
+        "ng": ng,  # Number of gates
+        "calculate": True,
+        "cnt_rows": cnt_rows,
+        "Met2Cont": Met2Cont,
+        "gat_ring": gat_ring,
+        "guard_ring": guard_ring,
+        "Wmin": eng_string_to_float(tech.techParams["rfpmosHV_minW"]),
+        "Lmin": eng_string_to_float(tech.techParams["rfpmosHV_minL"]),
+        "m": 1,
+        "trise": "",
+        "Display": "Selected",
     }
 
-    c = generate_gf_from_ihp(cell_name="rfpmosHV", cell_params=params, function_name=rfpmosHVIHP())
+    c = generate_gf_from_ihp(
+        cell_name="rfpmosHV",
+        cell_params=params,
+        function_name=rfpmosHVIHP,
+        add_ports=_add_pycell_ports,
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
-    return c
\ No newline at end of file
+    return c
+
+
+def _rect(c: gf.Component, x0: float, y0: float, x1: float, y1: float, layer) -> None:
+    c.add_polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], layer=layer)
+
+
+def _contact_rows(length: float, enc: float) -> tuple[int, float]:
+    """Returns how many contacts fit in length and the offset of the first one."""
+    t = tech.TECH
+    pitch = t.cont_size + t.cont_spacing
+    n = max(1, int((length - 2 * enc + t.cont_spacing) / pitch + 1e-6))
+    span = n * t.cont_size + (n - 1) * t.cont_spacing
+    offset = round(round((length - span) / 2 / t.grid) * t.grid, 6)
+    return n, offset
+
+
+def _contact_array(
+    c: gf.Component, x0: float, y0: float, columns: int, rows: int
+) -> None:
+    """Adds an arrayed reference of contacts with its lower left corner at (x0, y0)."""
+    t = tech.TECH
+    cont = gf.components.rectangle(
+        size=(t.cont_size, t.cont_size), layer=tech.LAYER.Contdrawing, port_type=None
+    )
+    pitch = t.cont_size + t.cont_spacing
+    ref = c.add_ref(
+        cont, columns=columns, rows=rows, column_pitch=pitch, row_pitch=pitch
+    )
+    ref.dmove((x0, y0))
+
+
+def _diffusion(ws: float) -> tuple[float, float, int, float]:
+    """Returns Activ height and bottom, contact rows and first contact of a source/drain strip."""
+    t = tech.TECH
+    pad = max(ws, t.cont_size + 2 * t.cont_enc_active)
+    y0 = (ws - pad) / 2
+    rows, offset = _contact_rows(pad, t.cont_enc_active)
+    return pad, y0, rows, y0 + offset
+
+
+def _metal1_strip(ws: float) -> tuple[float, float]:
+    """Returns bottom and top of the Metal1 strip over the contacts of a source/drain strip."""
+    t = tech.TECH
+    _, _, rows, y = _diffusion(ws)
+    top = y + rows * t.cont_size + (rows - 1) * t.cont_spacing
+    return y - t.cont_enc_metal, top + t.cont_enc_metal
+
+
+@gf.cell
+def _mos_diffusion(ws: float) -> gf.Component:
+    """Source/drain strip of one finger: contacts and Metal1, centered on x=0."""
+    t = tech.TECH
+    c = gf.Component()
+    half = t.cont_size / 2
+    pad, y0, rows, y = _diffusion(ws)
+    if pad > ws:  # narrow fingers get an Activ pad around the contact (dog bone)
+        enc = t.cont_enc_active
+        _rect(c, -half - enc, y0, half + enc, y0 + pad, tech.LAYER.Activdrawing)
+
+    _contact_array(c, -half, y, 1, rows)
+    bottom, top = _metal1_strip(ws)
+    _rect(c, -half, bottom, half, top, tech.LAYER.Metal1drawing)
+    return c
+
+
+def _ring(
+    c: gf.Component, box: tuple[float, float, float, float], width: float, layer
+) -> None:
+    """Adds a rectangular ring of width around box."""
+    x0, y0, x1, y1 = box
+    _rect(c, x0 - width, y0 - width, x1 + width, y0, layer)
+    _rect(c, x0 - width, y1, x1 + width, y1 + width, layer)
+    _rect(c, x0 - width, y0, x0, y1, layer)
+    _rect(c, x1, y0, x1 + width, y1, layer)
+
+
+def _guard_ring(
+    c: gf.Component,
+    box: tuple[float, float, float, float],
+    distance: float,
+    ring_type: str,
+) -> None:
+    """Adds a contacted Activ/Metal1 guard ring at distance from box."""
+    t = tech.TECH
+    g = t.grid
+    x0, y0, x1, y1 = (round(round(v / g) * g, 6) for v in box)
+    inner = (x0 - distance, y0 - distance, x1 + distance, y1 + distance)
+    width = t.cont_size + 2 * t.cont_enc_active
+    for layer in (tech.LAYER.Activdrawing, tech.LAYER.Metal1drawing):
+        _ring(c, inner, width, layer)
+
+    ix0, iy0, ix1, iy1 = inner
+    columns, xoff = _contact_rows(ix1 - ix0 + 2 * width, t.cont_enc_active)
+    rows, yoff = _contact_rows(iy1 - iy0, 0)
+    enc = t.cont_enc_active
+    _contact_array(c, ix0 - width + xoff, iy0 - width + enc, columns, 1)
+    _contact_array(c, ix0 - width + xoff, iy1 + enc, columns, 1)
+    _contact_array(c, ix0 - width + enc, iy0 + yoff, 1, rows)
+    _contact_array(c, ix1 + enc, iy0 + yoff, 1, rows)
+
+    if ring_type == "psub":
+        _ring(
+            c,
+            (
+                ix0 + t.psd_enc_active,
+                iy0 + t.psd_enc_active,
+                ix1 - t.psd_enc_active,
+                iy1 - t.psd_enc_active,
+            ),
+            width + 2 * t.psd_enc_active,
+            tech.LAYER.pSDdrawing,
+        )
+    elif ring_type == "nwell":
+        _ring(
+            c,
+            (
+                ix0 + t.nwell_enc_active,
+                iy0 + t.nwell_enc_active,
+                ix1 - t.nwell_enc_active,
+                iy1 - t.nwell_enc_active,
+            ),
+            width + 2 * t.nwell_enc_active,
+            tech.LAYER.NWelldrawing,
+        )
+
+
+@gf.cell
+def mos(
+    device: str = "nmos",
+    w: float = 0.15,
+    l: float = 0.13,
+    ng: int = 1,
+    guardRingType: str = "none",
+    guardRingDistance: float = 1,
+) -> gf.Component:
+    """Create a MOS transistor natively, without the IHP PyCell.
+
+    Gates and source/drain strips are arrayed references of one finger
+    cell each, so the layout stays the same size as ``ng`` grows. Rules
+    come from ``TECH``, minimum sizes from ``techParams``. :func:`nmos`,
+    :func:`pmos`, :func:`nmosHV` and :func:`pmosHV` stay on the PyCells
+    until tests/test_mos.py passes against them with the PDK.
+
+    Args:
+        device: nmos, pmos, nmosHV or pmosHV.
+        w: Total width of the transistor in micrometers.
+        l: Length of the transistor in micrometers.
+        ng: Number of gates/fingers.
+        guardRingType: none, psub or nwell.
+        guardRingDistance: Distance from the guard ring to Activ in micrometers.
+
+    Returns:
+        Component with the transistor layout. Ports ``G_<i>`` are on the gates,
+        ``DS_<i>`` on the source/drain Metal1 strips.
+    """
+    if device not in {"nmos", "pmos", "nmosHV", "pmosHV"}:
+        raise ValueError(f"device must be nmos, pmos, nmosHV or pmosHV, got {device!r}")
+    if guardRingType not in {"none", "psub", "nwell"}:
+        raise ValueError(
+            f"guardRingType must be none, psub or nwell, got {guardRingType!r}"
+        )
+
+    t = tech.TECH
+    ws = round(round(w / ng / t.grid) * t.grid, 6)
+    w_min = eng_string_to_float(tech.techParams[f"{device}_minW"]) * 1e6
+    l_min = eng_string_to_float(tech.techParams[f"{device}_minL"]) * 1e6
+    if ws < w_min - 1e-9 or l < l_min - 1e-9:
+        raise ValueError(
+            f"{device} needs w/ng >= {w_min} and l >= {l_min}, got {ws} and {l}"
+        )
+
+    c = gf.Component()
+    half = t.cont_size / 2
+    pad, *_ = _diffusion(ws)
+    cont_gate = t.cont_gate_spacing
+    if pad > ws:  # keep the dog bone pads GatPoly to Activ spacing away from the gates
+        cont_gate = max(cont_gate, t.cont_enc_active + t.gate_active_spacing)
+    pitch = l + t.cont_size + 2 * cont_gate
+    gate_x0 = half + cont_gate
+
+    gate = gf.components.rectangle(
+        size=(l, ws + 2 * t.gate_extension),
+        layer=tech.LAYER.GatPolydrawing,
+        port_type=None,
+    )
+    ref = c.add_ref(gate, columns=ng, rows=1, column_pitch=pitch, row_pitch=0)
+    ref.dmove((gate_x0, -t.gate_extension))
+    c.add_ref(
+        _mos_diffusion(ws), columns=ng + 1, rows=1, column_pitch=pitch, row_pitch=0
+    )
+
+    x0 = -half - t.cont_enc_active
+    x1 = ng * pitch + half + t.cont_enc_active
+    _rect(c, x0, 0, x1, ws, tech.LAYER.Activdrawing)
+
+    activ = (x0, (ws - pad) / 2, x1, (ws + pad) / 2)  # including the dog bone pads
+    if device.startswith("pmos"):
+        for layer, enc in (
+            (tech.LAYER.pSDdrawing, t.psd_enc_active),
+            (tech.LAYER.NWelldrawing, t.nwell_enc_active),
+        ):
+            _rect(
+                c, activ[0] - enc, activ[1] - enc, activ[2] + enc, activ[3] + enc, layer
+            )
+    if device.endswith("HV"):
+        enc = t.thickgateox_enc_active
+        _rect(
+            c,
+            activ[0] - enc,
+            activ[1] - enc,
+            activ[2] + enc,
+            activ[3] + enc,
+            tech.LAYER.ThickGateOxdrawing,
+        )
+    if guardRingType != "none":
+        _guard_ring(c, activ, guardRingDistance, guardRingType)
+
+    for i in range(ng):
+        x = gate_x0 + i * pitch + l / 2
+        c.add_port(
+            name=f"G_{i + 1}",
+            center=(x, -t.gate_extension),
+            width=l,
+            orientation=270,
+            layer=tech.LAYER.GatPolydrawing,
+            port_type="electrical",
+        )
+    _, top = _metal1_strip(ws)
+    for i in range(ng + 1):
+        c.add_port(
+            name=f"DS_{i + 1}",
+            center=(i * pitch, top),
+            width=t.cont_size,
+            orientation=90,
+            layer=tech.LAYER.Metal1drawing,
+            port_type="electrical",
+        )
+    return c
@@ -0,0 +1,192 @@
+"""Port extraction from pin boxes with NumPy.
+
+:func:`add_ports_from_boxes` gives the same ports as
+``gf.add_ports.add_ports_from_boxes``. The boxes of a layer are read into one
+array in a single pass, and the area filters, the orientation, the duplicate
+check and the clockwise sort run on whole arrays. Multi-finger devices have
+hundreds of Metal1 and GatPoly boxes. For them, the per-box Python loop and the
+quadratic duplicate check of the gdsfactory version dominate.
+"""
+
+from __future__ import annotations
+
+import gdsfactory as gf
+import numpy as np
+from gdsfactory.typings import LayerSpec
+from kfactory import kdb
+
+__all__ = ["add_ports_from_boxes", "box_array"]
+
+
+def box_array(component: gf.Component, layer: LayerSpec) -> np.ndarray:
+    """Returns the boxes of layer as an (n, 4) array of xmin, ymin, xmax, ymax in um.
+
+    The boxes come in the order of ``component.get_boxes(layer)``.
+    """
+    iterator = component.kdb_cell.begin_shapes_rec(gf.get_layer(layer))
+    iterator.shape_flags = kdb.Shapes.SBoxes
+    coords = []
+    for it in iterator.each():
+        box = it.shape().dbox.transformed(it.dtrans())
+        coords += (box.left, box.bottom, box.right, box.top)
+    return np.array(coords, dtype=float).reshape(-1, 4)
+
+
+def _to_dbu(values: np.ndarray, dbu: float) -> np.ndarray:
+    """Rounds um to database units like KLayout, half away from zero."""
+    scaled = values / dbu
+    return np.trunc(scaled + np.copysign(0.5, scaled)).astype(np.int64)
+
+
+def add_ports_from_boxes(
+    component: gf.Component,
+    pin_layer: LayerSpec,
+    port_layer: LayerSpec | None = None,
+    inside: bool = False,
+    tol: float = 0.1,
+    pin_extra_width: float = 0.0,
+    min_pin_area_um2: float | None = None,
+    max_pin_area_um2: float | None = 150.0 * 150.0,
+    skip_square_ports: bool = False,
+    xcenter: float | None = None,
+    ycenter: float | None = None,
+    port_name_prefix: str | None = None,
+    port_type: str = "optical",
+    ports_on_short_side: bool = False,
+    auto_rename_ports: bool = True,
+) -> gf.Component:
+    """Adds ports from pin boxes, guessing the orientation from the component boundary.
+
+    Takes the arguments of ``gf.add_ports.add_ports_from_boxes`` except
+    ``debug``, and adds the same ports with the same names and order.
+
+    Args:
+        component: to read boxes from and to write ports to.
+        pin_layer: layer of the pin boxes.
+        port_layer: for the new ports. Defaults to pin_layer.
+        inside: True puts the port on the box edge, False at the box center.
+        tol: tolerance to find square boxes on the component boundary.
+        pin_extra_width: 2*offset from pin to straight.
+        min_pin_area_um2: ignores boxes with a smaller area.
+        max_pin_area_um2: ignores boxes with a larger area.
+        skip_square_ports: ignores square boxes.
+        xcenter: for guessing the orientation. Defaults to the component center.
+        ycenter: for guessing the orientation. Defaults to the component center.
+        port_name_prefix: defaults to 'o' for optical and 'e' for electrical ports.
+        port_type: type of the ports.
+        ports_on_short_side: puts the port on the short side of the box.
+        auto_rename_ports: renames the ports afterwards.
+    """
+    xc = xcenter or component.x
+    yc = ycenter or component.y
+    layer = gf.get_layer(port_layer or pin_layer)
+    prefix = port_name_prefix or ("o" if port_type == "optical" else "e")
+    dbu = component.kcl.dbu
+
+    boxes = box_array(component, pin_layer)
+    index = np.arange(1, len(boxes) + 1)
+    pxmin, pymin, pxmax, pymax = boxes.T
+    x = (pxmax + pxmin) / 2
+    y = (pymin + pymax) / 2
+    dx = np.abs(pxmax - pxmin)
+    dy = np.abs(pymax - pymin)
+
+    keep = np.ones(len(boxes), dtype=bool)
+    if min_pin_area_um2:
+        keep &= ~(dx * dy < min_pin_area_um2)
+    if max_pin_area_um2:
+        keep &= ~(dx * dy > max_pin_area_um2)
+    if skip_square_ports:
+        keep &= _to_dbu(dx, dbu) != _to_dbu(dy, dbu)
+    index, pxmin, pymin, pxmax, pymax, x, y, dx, dy = (
+        a[keep] for a in (index, pxmin, pymin, pxmax, pymax, x, y, dx, dy)
+    )
+
+    horizontal = dy < dx if ports_on_short_side else dx < dy
+    vertical = ~horizontal & (dy > dx if ports_on_short_side else dx > dy)
+    square = ~horizontal & ~vertical
+    east = square & (pxmax > component.xmax - tol)
+    west = square & ~east & (pxmin < component.xmin + tol)
+    north = square & ~east & ~west & (pymax > component.ymax - tol)
+    south = square & ~east & ~west & ~north & (pymin < component.ymin + tol)
+    rest = square & ~east & ~west & ~north & ~south
+
+    orientation = np.select(
+        [
+            horizontal & (x > xc),
+            horizontal,
+            vertical & (y > yc),
+            vertical,
+            east,
+            west,
+            north,
+            south,
+            rest & (pxmax > xc),
+        ],
+        [0, 180, 90, 270, 0, 180, 90, 270, 0],
+        default=180,
+    )
+    across_x = horizontal | east | west | rest  # ports facing east or west
+    width = np.where(across_x, dy, dx)
+    if inside:
+        x = np.where(across_x, np.where(orientation == 0, pxmax, pxmin), x)
+        y = np.where(across_x, y, np.where(orientation == 90, pymax, pymin))
+    width = np.round((width - pin_extra_width) / 0.002) * 0.002
+
+    # first box at each location
+    _, first = np.unique(np.stack([x, y], axis=1), axis=0, return_index=True)
+    first.sort()
+    index, x, y, width, orientation = (
+        a[first] for a in (index, x, y, width, orientation)
+    )
+
+    # the center as gf.Port stores it: on the grid if it is close to it
+    ix, iy = _to_dbu(x, dbu), _to_dbu(y, dbu)
+    on_grid = (np.abs(x - ix * dbu) < 1e-5) & (np.abs(y - iy * dbu) < 1e-5)
+    sx, sy = np.where(on_grid, ix * dbu, x), np.where(on_grid, iy * dbu, y)
+
+    # clockwise from the south-west: west, north, east and south sides
+    side = np.select(
+        [orientation == 180, orientation == 90, orientation == 0], [0, 1, 2], 3
+    )
+    key = np.select([side == 0, side == 1, side == 2], [sy, sx, -sy], -sx)
+    order = np.lexsort((key, side))
+
+    names = [f"{prefix}{i}" for i in index[order]]
+    existing = {p.name for p in component.ports}
+    for name in names:
+        if name in existing:
+            raise ValueError(
+                f"port {name!r} already in {sorted(existing)}. "
+                "You can pass a port_name_prefix to add it with a different name."
+            )
+
+    kcl = component.kcl
+    layer_info = kcl.layout.get_info(layer)
+    widths = _to_dbu(width, dbu)
+    cross_sections = {
+        w: kcl.get_symmetrical_cross_section({"layer": layer_info, "width": int(w)})
+        for w in np.unique(widths)
+    }
+    for name, i in zip(names, order):
+        if on_grid[i]:
+            trans = kdb.Trans(int(orientation[i]) // 90, False, int(ix[i]), int(iy[i]))
+            component.create_port(
+                name=name,
+                trans=trans,
+                cross_section=cross_sections[widths[i]],
+                port_type=port_type,
+            )
+        else:
+            trans = kdb.DCplxTrans(
+                1, float(orientation[i]), False, float(x[i]), float(y[i])
+            )
+            component.create_port(
+                name=name,
+                dcplx_trans=trans,
+                cross_section=cross_sections[widths[i]],
+                port_type=port_type,
+            )
+    if auto_rename_ports:
+        component.auto_rename_ports()
+    return component
@@ -1,33 +1,34 @@
 """Resistor components for IHP PDK."""
+
 import sys
+
 sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python")
-sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/")
+sys.path.append(
+    "/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/"
+)
 
-from sg13g2_pycell_lib.ihp.utility_functions import eng_string_to_float
 
+import gdsfactory as gf
 from sg13g2_pycell_lib.ihp.rhigh_code import rhigh as rhighIHP
 from sg13g2_pycell_lib.ihp.rppd_code import rppd as rppdIHP
 from sg13g2_pycell_lib.ihp.rsil_code import rsil as rsilIHP
+from sg13g2_pycell_lib.ihp.utility_functions import eng_string_to_float
 
-
-import gdsfactory as gf
-
-from .utils import *
-from functools import partial
 from .. import tech
+from .utils import generate_gf_from_ihp
 
 
 @gf.cell
 def rhigh(
-    length = 0.96,
-    width = 0.5,
-    bends = 0,
-    poly_space = 0.18,
-    numberOfSegments = 1,
-    segmentConnection = 'Serial',
-    segmentSpacing = 2,
-    guardRingType = 'none',
-    guardRingDistance = 1,
+    length=0.96,
+    width=0.5,
+    bends=0,
+    poly_space=0.18,
+    numberOfSegments=1,
+    segmentConnection="Serial",
+    segmentSpacing=2,
+    guardRingType="none",
+    guardRingDistance=1,
 ) -> gf.Component:
     """Create a high-resistance polysilicon resistor.
 
@@ -39,40 +40,41 @@ def rhigh(
     Returns:
         Component with high-resistance poly resistor layout.
     """
-    
 
     params = {
-        'cdf_version': tech.techParams['CDFVersion'],
-        'Display': 'Selected',
-        'Calculate': 'l',       # TODO check what to do
-        'Recommendation': "No",
-        'model': tech.techParams['rhigh_model'],
-        'R': 3.16*1e3,
-        'w': width*1e-6,    # Length in μm
-        'l': length*1e-6,   # Length in μm
-        'b': bends,
-        'ps': poly_space*1e-6,
-        'Imax': 0.3*1e-3, #TODO check imax value
-        'bn': "sub!",
-        'Wmin': eng_string_to_float(tech.techParams['rhigh_minW'])*1e-6,
-        'Lmin': eng_string_to_float(tech.techParams['rhigh_minL'])*1e-6,
-        'PSmin': eng_string_to_float(tech.techParams['rhigh_minPS'])*1e-6,
-        'Rspec': tech.techParams['rhigh_rspec'],
-        'Rkspec': tech.techParams['rhigh_rkspec'],
-        'Rzspec': tech.techParams['rhigh_rzspec'],
-        'tc1': -2300e-6,    # hardcoded in the PCell
-        'tc2': 2.1e-6,    # hardcoded in the PCell
-        'PWB': "No",
-        'm': 1,      # Multiplier
-        'trise': 0,
-        'NumberOfSegments': numberOfSegments,
-        'SegmentConnection': segmentConnection,
-        'SegmentSpacing': segmentSpacing*1e-6,
-        'guardRingType': guardRingType,
-        'guardRingDistance': guardRingDistance*1e-6,
+        "cdf_version": tech.techParams["CDFVersion"],
+        "Display": "Selected",
+        "Calculate": "l",  # TODO check what to do
+        "Recommendation": "No",
+        "model": tech.techParams["rhigh_model"],
+        "R": 3.16 * 1e3,
+        "w": width * 1e-6,  # Length in μm
+        "l": length * 1e-6,  # Length in μm
+        "b": bends,
+        "ps": poly_space * 1e-6,
+        "Imax": 0.3 * 1e-3,  # TODO check imax value
+        "bn": "sub!",
+        "Wmin": eng_string_to_float(tech.techParams["rhigh_minW"]) * 1e-6,
+        "Lmin": eng_string_to_float(tech.techParams["rhigh_minL"]) * 1e-6,
+        "PSmin": eng_string_to_float(tech.techParams["rhigh_minPS"]) * 1e-6,
+        "Rspec": tech.techParams["rhigh_rspec"],
+        "Rkspec": tech.techParams["rhigh_rkspec"],
+        "Rzspec": tech.techParams["rhigh_rzspec"],
+        "tc1": -2300e-6,  # hardcoded in the PCell
+        "tc2": 2.1e-6,  # hardcoded in the PCell
+        "PWB": "No",
+        "m": 1,  # Multiplier
+        "trise": 0,
+        "NumberOfSegments": numberOfSegments,
+        "SegmentConnection": segmentConnection,
+        "SegmentSpacing": segmentSpacing * 1e-6,
+        "guardRingType": guardRingType,
+        "guardRingDistance": guardRingDistance * 1e-6,
     }
 
-    c = generate_gf_from_ihp(cell_name="rhigh", cell_params=params, function_name=rhighIHP())
+    c = generate_gf_from_ihp(
+        cell_name="rhigh", cell_params=params, function_name=rhighIHP
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -81,15 +83,15 @@ def rhigh(
 
 @gf.cell
 def rppd(
-    length = 0.5,
-    width = 0.5,
-    bends = 0,
-    poly_space = 0.18,
-    numberOfSegments = 1,
-    segmentConnection = 'Serial',
-    segmentSpacing = 2,
-    guardRingType = 'none',
-    guardRingDistance = 1, 
+    length=0.5,
+    width=0.5,
+    bends=0,
+    poly_space=0.18,
+    numberOfSegments=1,
+    segmentConnection="Serial",
+    segmentSpacing=2,
+    guardRingType="none",
+    guardRingDistance=1,
 ) -> gf.Component:
     """Create a high-resistance polysilicon resistor.
 
@@ -101,40 +103,41 @@ def rppd(
     Returns:
         Component with high-resistance poly resistor layout.
     """
-    
 
     params = {
-        'cdf_version': tech.techParams['CDFVersion'],
-        'Display': 'Selected',
-        'Calculate': 'l',       # TODO check what to do
-        'Recommendation': "No",
-        'model': tech.techParams['rppd_model'],
-        'R': 3.16*1e3,
-        'w': width*1e-6,    # Length in μm
-        'l': length*1e-6,   # Length in μm
-        'b': bends,
-        'ps': poly_space*1e-6,
-        'Imax': 0.6*1e-3, #TODO check imax value
-        'bn': "sub!",
-        'Wmin': eng_string_to_float(tech.techParams['rppd_minW'])*1e-6,
-        'Lmin': eng_string_to_float(tech.techParams['rppd_minL'])*1e-6,
-        'PSmin': eng_string_to_float(tech.techParams['rppd_minPS'])*1e-6,
-        'Rspec': tech.techParams['rppd_rspec'],
-        'Rkspec': tech.techParams['rppd_rkspec'],
-        'Rzspec': tech.techParams['rppd_rzspec'],
-        'tc1': -170e-6,    # hardcoded in the PCell
-        'tc2': 0.4e-6,    # hardcoded in the PCell
-        'PWB': "No",
-        'm': 1,      # Multiplier
-        'trise': 0,
-        'NumberOfSegments': numberOfSegments,
-        'SegmentConnection': segmentConnection,
-        'SegmentSpacing': segmentSpacing*1e-6,
-        'guardRingType': guardRingType,
-        'guardRingDistance': guardRingDistance*1e-6,
+        "cdf_version": tech.techParams["CDFVersion"],
+        "Display": "Selected",
+        "Calculate": "l",  # TODO check what to do
+        "Recommendation": "No",
+        "model": tech.techParams["rppd_model"],
+        "R": 3.16 * 1e3,
+        "w": width * 1e-6,  # Length in μm
+        "l": length * 1e-6,  # Length in μm
+        "b": bends,
+        "ps": poly_space * 1e-6,
+        "Imax": 0.6 * 1e-3,  # TODO check imax value
+        "bn": "sub!",
+        "Wmin": eng_string_to_float(tech.techParams["rppd_minW"]) * 1e-6,
+        "Lmin": eng_string_to_float(tech.techParams["rppd_minL"]) * 1e-6,
+        "PSmin": eng_string_to_float(tech.techParams["rppd_minPS"]) * 1e-6,
+        "Rspec": tech.techParams["rppd_rspec"],
+        "Rkspec": tech.techParams["rppd_rkspec"],
+        "Rzspec": tech.techParams["rppd_rzspec"],
+        "tc1": -170e-6,  # hardcoded in the PCell
+        "tc2": 0.4e-6,  # hardcoded in the PCell
+        "PWB": "No",
+        "m": 1,  # Multiplier
+        "trise": 0,
+        "NumberOfSegments": numberOfSegments,
+        "SegmentConnection": segmentConnection,
+        "SegmentSpacing": segmentSpacing * 1e-6,
+        "guardRingType": guardRingType,
+        "guardRingDistance": guardRingDistance * 1e-6,
     }
 
-    c = generate_gf_from_ihp(cell_name="rppd", cell_params=params, function_name=rppdIHP())
+    c = generate_gf_from_ihp(
+        cell_name="rppd", cell_params=params, function_name=rppdIHP
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -143,49 +146,49 @@ def rppd(
 
 @gf.cell
 def rsil(
-    length = 0.5,
-    width = 0.5,
-    poly_space = 0.18,
-    resistance = 24.9,
-    numberOfSegments = 1,
-    segmentConnection = 'Serial',
-    segmentSpacing = 2,
-    guardRingType = 'none',
-    guardRingDistance = 1, 
+    length=0.5,
+    width=0.5,
+    poly_space=0.18,
+    resistance=24.9,
+    numberOfSegments=1,
+    segmentConnection="Serial",
+    segmentSpacing=2,
+    guardRingType="none",
+    guardRingDistance=1,
 ) -> gf.Component:
-    
-
     params = {
-        'cdf_version': tech.techParams['CDFVersion'],
-        'Display': 'Selected',
-        'Calculate': 'l',       # TODO check what to do
-        'Recommendation': "No",
-        'model': tech.techParams['rsil_model'],
-        'R': resistance,
-        'w': width*1e-6,    # Length in μm
-        'l': length*1e-6,   # Length in μm
-        'ps': poly_space*1e-6,
-        'Imax': 0.6*1e-3, #TODO check imax value
-        'bn': "sub!",
-        'Wmin': eng_string_to_float(tech.techParams['rsil_minW'])*1e-6,
-        'Lmin': eng_string_to_float(tech.techParams['rsil_minL'])*1e-6,
-        'PSmin': eng_string_to_float(tech.techParams['rsil_minPS'])*1e-6,
-        'Rspec': tech.techParams['rsil_rspec'],
-        'Rkspec': tech.techParams['rsil_rkspec'],
-        'Rzspec': tech.techParams['rsil_rzspec'],
-        'tc1': -170e-6,    # hardcoded in the PCell
-        'tc2': 0.4e-6,    # hardcoded in the PCell
-        'PWB': "No",
-        'm': 1,      # Multiplier
-        'trise': 0,
-        'NumberOfSegments': numberOfSegments,
-        'SegmentConnection': segmentConnection,
-        'SegmentSpacing': segmentSpacing*1e-6,
-        'guardRingType': guardRingType,
-        'guardRingDistance': guardRingDistance*1e-6,
+        "cdf_version": tech.techParams["CDFVersion"],
+        "Display": "Selected",
+        "Calculate": "l",  # TODO check what to do
+        "Recommendation": "No",
+        "model": tech.techParams["rsil_model"],
+        "R": resistance,
+        "w": width * 1e-6,  # Length in μm
+        "l": length * 1e-6,  # Length in μm
+        "ps": poly_space * 1e-6,
+        "Imax": 0.6 * 1e-3,  # TODO check imax value
+        "bn": "sub!",
+        "Wmin": eng_string_to_float(tech.techParams["rsil_minW"]) * 1e-6,
+        "Lmin": eng_string_to_float(tech.techParams["rsil_minL"]) * 1e-6,
+        "PSmin": eng_string_to_float(tech.techParams["rsil_minPS"]) * 1e-6,
+        "Rspec": tech.techParams["rsil_rspec"],
+        "Rkspec": tech.techParams["rsil_rkspec"],
+        "Rzspec": tech.techParams["rsil_rzspec"],
+        "tc1": -170e-6,  # hardcoded in the PCell
+        "tc2": 0.4e-6,  # hardcoded in the PCell
+        "PWB": "No",
+        "m": 1,  # Multiplier
+        "trise": 0,
+        "NumberOfSegments": numberOfSegments,
+        "SegmentConnection": segmentConnection,
+        "SegmentSpacing": segmentSpacing * 1e-6,
+        "guardRingType": guardRingType,
+        "guardRingDistance": guardRingDistance * 1e-6,
     }
 
-    c = generate_gf_from_ihp(cell_name="rsil", cell_params=params, function_name=rsilIHP())
+    c = generate_gf_from_ihp(
+        cell_name="rsil", cell_params=params, function_name=rsilIHP
+    )
     # Adjust port orientations, for metal1 so every other port points in the opposite direction
     # for i, port in enumerate(c.ports):
     #     port.orientation = 90 if port.name.startswith("DS_") and i % 2 == 1 else port.orientation
@@ -1,56 +1,205 @@
 import sys
+
 sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python")
-sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/")
-import gdsfactory as gf # to have gf.Component
-from cni.tech import Tech # to get the technology
-from cni.dlo import PCellWrapper # to wrap the PyCell
-import pya # KLayout Python API
-import os
+sys.path.append(
+    "/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/"
+)
+import dataclasses
+import functools
+import threading
+import time
+
+import gdsfactory as gf  # to have gf.Component
+import pya  # KLayout Python API
+from cni.dlo import PCellWrapper  # to wrap the PyCell
+from cni.tech import Tech  # to get the technology
+
+from . import cache as _cache
+
+
+@dataclasses.dataclass
+class PyCellTimings:
+    """Accumulated wall time in seconds spent in each step of a PyCell device."""
+
+    calls: int = 0
+    cache_hits: int = 0
+    setup: float = 0.0  # Tech, PCellWrapper and parameter ordering
+    geometry: float = 0.0  # PCellWrapper.produce
+    bridge: float = 0.0  # copy into gdsfactory and cache lookups
+
+
+@dataclasses.dataclass
+class _PyCell:
+    """A PCellWrapper built once per PyCell class, with its parameter order.
+
+    The wrapper is built on the first cache miss, so devices that all come
+    from the disk cache never set up the PyCell. It keeps the parameters of
+    the current call on the PyCell instance, so ``lock`` serializes the calls
+    of one PyCell class across threads. Different PyCell classes do not wait
+    for each other.
+    """
+
+    impl: type
+    timings: PyCellTimings
+    wrapper: PCellWrapper | None = None
+    param_names: tuple[str, ...] = ()
+    lock: threading.Lock = dataclasses.field(default_factory=threading.Lock)
+
+    def build(self) -> None:
+        """Builds the wrapper, call with ``lock`` held."""
+        if self.wrapper is None:
+            # PCellWrapper acts like the 'specs' object in KLayout
+            # It handles parameter declarations and calls defineParamSpecs internally
+            wrapper = PCellWrapper(impl=self.impl(), tech=_tech())
+            self.param_names = tuple(p.name for p in wrapper.param_decls)
+            self.wrapper = wrapper
+
+
+@functools.cache
+def _tech() -> Tech:
+    return Tech.get("SG13_dev")  # Must match the name registered in SG13_Tech
+
+
+_registry: dict[type, _PyCell] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_pycell(impl: type) -> _PyCell:
+    """Returns the registry entry of a PyCell class, adding it on first use."""
+    entry = _registry.get(impl)
+    if entry is None:
+        with _registry_lock:
+            entry = _registry.setdefault(impl, _PyCell(impl, PyCellTimings()))
+    return entry
 
 
+def pycell_timings() -> dict[str, PyCellTimings]:
+    """Returns the timings of every PyCell class used so far, by class name.
+
+    .. code::
+
+        from ihp.cells.utils import pycell_timings
+
+        for name, t in pycell_timings().items():
+            print(name, t.calls, t.setup, t.geometry, t.bridge)
+    """
+    return {
+        impl.__name__: dataclasses.replace(entry.timings)
+        for impl, entry in _registry.items()
+    }
+
+
+def reset_pycell_timings() -> None:
+    """Sets every PyCell timing counter back to zero."""
+    for entry in _registry.values():
+        with entry.lock:
+            entry.timings = PyCellTimings()
+
+
+def _layout_to_component(cell: pya.Cell, ports=()) -> gf.Component:
+    """Copies a PyCell cell into a new Component without going through a GDS file.
+
+    ``copy_tree`` brings the shapes, texts and child cells of ``cell`` into the
+    gdsfactory layout and maps layers by layer/datatype, exactly like writing
+    the layout to disk and reading it back with ``gf.read.import_gds``.
+    """
+    c = gf.Component()
+    c.kdb_cell.copy_tree(cell)
+    c.name = cell.name
+    for port in ports:
+        c.add_port(
+            **{**port, "center": tuple(port["center"]), "layer": tuple(port["layer"])}
+        )
+    return c
+
+
+def _ports_data(c: gf.Component) -> list[dict]:
+    """Returns the ports of c as plain data for the disk cache."""
+    return [
+        dict(
+            name=port.name,
+            center=tuple(port.dcenter),
+            width=port.dwidth,
+            orientation=port.orientation,
+            layer=(port.layer_info.layer, port.layer_info.datatype),
+            port_type=port.port_type,
+        )
+        for port in c.ports
+    ]
+
 
 def generate_gf_from_ihp(
-    cell_name, 
-    cell_params, 
-    function_name
-    ) -> gf.Component: 
-    
+    cell_name, cell_params, function_name, add_ports=None
+) -> gf.Component:
+    """Returns a Component with the layout of an IHP PyCell.
+
+    Args:
+        cell_name: name of the produced top cell.
+        cell_params: PyCell parameters by name, unset ones are passed as None.
+        function_name: PyCell class (or instance) such as ``nmos`` from
+            ``sg13g2_pycell_lib.ihp.nmos_code``.
+        add_ports: called with the new Component to add its ports. It runs
+            before the layout is cached, so a cache hit has the same ports.
+    """
+    impl = function_name if isinstance(function_name, type) else type(function_name)
+    pycell = _get_pycell(impl)
+
     # ----------------------------------------------------------------
-    # Step 1: Get the technology object
+    # Step 1: Reuse a layout produced by an earlier run
     # ----------------------------------------------------------------
-    tech = Tech.get("SG13_dev")  # Must match the name registered in SG13_Tech
+    t0 = time.perf_counter()
+    cache = _cache.get_cache()
+    if cache is not None:
+        key = _cache.cache_key(impl, cell_name, cell_params, add_ports)
+        hit = cache.get(key)
+        if hit is not None:
+            layout, ports = hit
+            c = _layout_to_component(layout.top_cell(), ports)
+            with pycell.lock:
+                pycell.timings.calls += 1
+                pycell.timings.cache_hits += 1
+                pycell.timings.bridge += time.perf_counter() - t0
+            return c
 
     # ----------------------------------------------------------------
     # Step 2: Create a layout and a cell
     # ----------------------------------------------------------------
-    layout = pya.Layout()                # new empty layout
+    t1 = time.perf_counter()
+    layout = pya.Layout()  # new empty layout
     cell = layout.create_cell(cell_name)  # new cell for your transistor
 
     # ----------------------------------------------------------------
-    # Step 3: Wrap the PyCell
+    # Step 3: Produce the layout, one call per PyCell class at a time.
+    # The PCellWrapper is built once per PyCell class, on the first miss.
     # ----------------------------------------------------------------
-    # PCellWrapper acts like the 'specs' object in KLayout
-    # It handles parameter declarations and calls defineParamSpecs internally
-    device = PCellWrapper(impl=function_name, tech=tech)
-    
-    # Convert params into a list in the order of device.param_decls
-    param_values = [cell_params[p.name] for p in device.param_decls]
+    with pycell.lock:
+        pycell.build()
+        missing = [name for name in pycell.param_names if name not in cell_params]
+        if missing:
+            raise ValueError(f"{cell_name} is missing the PyCell parameters {missing}")
+        param_values = [cell_params[name] for name in pycell.param_names]
+        t2 = time.perf_counter()
+        pycell.wrapper.produce(
+            layout=layout,
+            layers={},  # can pass layer map if needed
+            parameters=param_values,
+            cell=cell,
+        )
+        t3 = time.perf_counter()
 
     # ----------------------------------------------------------------
-    # Step 4: Produce the layout
+    # Step 4: Bring to GDSFactory (in memory, no temporary GDS)
     # ----------------------------------------------------------------
-    device.produce(layout=layout,
-                layers={},        # can pass layer map if needed
-                parameters=param_values,
-                cell=cell)
+    c = _layout_to_component(cell)
+    if add_ports is not None:
+        add_ports(c)
+    if cache is not None:
+        cache.put(key, cell, _ports_data(c))
 
-    # ----------------------------------------------------------------
-    # Step 5: Bring to GDSFactory
-    # ----------------------------------------------------------------
-    layout.write("temp.gds")
-    print(f"✅ {cell_name} PyCell placed successfully and GDS written.")
-    c = gf.read.import_gds(gdspath="temp.gds")
-    os.remove("temp.gds")
-    # ----------------------------------------------------------------
-    
-    return c
\ No newline at end of file
+    with pycell.lock:
+        timings = pycell.timings
+        timings.calls += 1
+        timings.setup += t2 - t1
+        timings.geometry += t3 - t2
+        timings.bridge += (t1 - t0) + (time.perf_counter() - t3)
+    return c
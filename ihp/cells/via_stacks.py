@@ -1,21 +1,160 @@
 """Via stack components for IHP PDK. Also includes NoFillerStack."""
-#TODO prbably not the right place for NoFillerStack
+
+# TODO prbably not the right place for NoFillerStack
 import sys
-sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python")
-sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/")
-from sg13g2_pycell_lib.ihp.via_stack_code import via_stack as via_stackIHP
-from sg13g2_pycell_lib.ihp.NoFillerStack_code import NoFillerStack as no_filler_stackIHP
 
-from cni.tech import Tech
+sys.path.append("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python")
+sys.path.append(
+    "/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/pycell4klayout-api/source/python/"
+)
+import math
 
-from cni.dlo import PCellWrapper
-import pya
 import gdsfactory as gf
 from gdsfactory import Component
-import os
+from sg13g2_pycell_lib.ihp.NoFillerStack_code import NoFillerStack as no_filler_stackIHP
+from sg13g2_pycell_lib.ihp.via_stack_code import via_stack as via_stackIHP
 
-from functools import partial
 from .. import tech
+from .utils import generate_gf_from_ihp
+
+_metals = ("Metal1", "Metal2", "Metal3", "Metal4", "Metal5", "TopMetal1", "TopMetal2")
+_vias = ("Via1", "Via2", "Via3", "Via4", "TopVia1", "TopVia2")
+
+
+def _via_rules(via: str, bottom: str) -> tuple[float, float, float, float]:
+    """Returns size, spacing, bottom and top layer enclosure of a via from TECH."""
+    t = tech.TECH
+    if via == "Cont":
+        enc_bottom = t.cont_enc_active if bottom == "Activ" else t.cont_enc_poly
+        return t.cont_size, t.cont_spacing, enc_bottom, t.cont_enc_metal
+    if via == "TopVia1":
+        return (
+            t.topvia1_size,
+            t.topvia1_spacing,
+            t.topvia1_enc_metal5,
+            t.topvia1_enc_metal,
+        )
+    rule = via.lower()
+    enc = getattr(t, f"{rule}_enc_metal")
+    return getattr(t, f"{rule}_size"), getattr(t, f"{rule}_spacing"), enc, enc
+
+
+def _snap(x: float) -> float:
+    """Rounds x down to the manufacturing grid."""
+    return round(math.floor(x / tech.TECH.grid + 1e-6) * tech.TECH.grid, 6)
+
+
+@gf.cell
+def _via_stack_native(
+    bottom_layer: str = "Metal1",
+    top_layer: str = "Metal2",
+    vn_columns: int = 2,
+    vn_rows: int = 2,
+    vt1_columns: int = 1,
+    vt1_rows: int = 1,
+    vt2_columns: int = 1,
+    vt2_rows: int = 1,
+) -> Component:
+    """Create a via stack without the PyCell, see :func:`via_stack`.
+
+    Draws the same layers as the ``via_stack`` PyCell from the ``TECH`` rules,
+    without going through KLayout. Each via level is one arrayed reference
+    of a shared via cell, the metal plates enclose the via arrays above and
+    below them. The stack is centered on the origin. With ``bottom_layer ==
+    top_layer`` it is a single metal pad, sized to land the next via array on.
+
+    The PyCell puts its origin elsewhere, so :func:`via_stack` stays on the
+    PyCell until tests/test_via_stack.py passes against it with the PDK.
+
+    Args:
+        bottom_layer: Bottom layer name (Activ, GatPoly, Metal1 ... TopMetal1).
+        top_layer: Top metal layer name (Metal1 ... TopMetal2).
+        vn_columns: Number of columns for normal vias (Cont, Via1-Via4).
+        vn_rows: Number of rows for normal vias.
+        vt1_columns: Number of columns for TopVia1.
+        vt1_rows: Number of rows for TopVia1.
+        vt2_columns: Number of columns for TopVia2.
+        vt2_rows: Number of rows for TopVia2.
+
+    Returns:
+        Component with via stack.
+    """
+    levels = (bottom_layer,) if bottom_layer in {"Activ", "GatPoly"} else ()
+    if top_layer not in _metals or (bottom_layer not in levels + _metals):
+        raise ValueError(f"Unknown via stack layers {bottom_layer!r} to {top_layer!r}")
+    start = 0 if levels else _metals.index(bottom_layer)
+    stop = _metals.index(top_layer)
+    if not levels and start > stop:
+        raise ValueError(
+            f"bottom_layer {bottom_layer!r} must be below top_layer {top_layer!r}"
+        )
+
+    levels += _metals[start : stop + 1]
+    vias = (("Cont",) if levels[0] in {"Activ", "GatPoly"} else ()) + _vias[start:stop]
+    array = dict(TopVia1=(vt1_columns, vt1_rows), TopVia2=(vt2_columns, vt2_rows))
+
+    def _array(via: str) -> tuple[float, float, float, float]:
+        size, spacing, _, _ = _via_rules(via, "")
+        columns, rows = array.get(via, (vn_columns, vn_rows))
+        w = columns * size + (columns - 1) * spacing
+        h = rows * size + (rows - 1) * spacing
+        return _snap(-w / 2), _snap(-h / 2), w, h
+
+    c = Component()
+    if len(levels) == 1:
+        # a single metal: the pad the next via level up (down for the top
+        # metal) would land on, without any via
+        if stop < len(_vias):
+            via = _vias[stop]
+            enc = _via_rules(via, top_layer)[2]
+        else:
+            via = _vias[stop - 1]
+            enc = _via_rules(via, _metals[stop - 1])[3]
+        x0, y0, w, h = _array(via)
+        c.add_polygon(
+            [
+                (x0 - enc, y0 - enc),
+                (x0 + w + enc, y0 - enc),
+                (x0 + w + enc, y0 + h + enc),
+                (x0 - enc, y0 + h + enc),
+            ],
+            layer=getattr(tech.LAYER, f"{top_layer}drawing"),
+        )
+        return c
+
+    plates: dict[str, list[tuple[float, float, float, float]]] = {}
+    for bottom, top, via in zip(levels, levels[1:], vias):
+        size, spacing, enc_bottom, enc_top = _via_rules(via, bottom)
+        columns, rows = array.get(via, (vn_columns, vn_rows))
+        x0, y0, w, h = _array(via)
+
+        cell = gf.components.rectangle(
+            size=(size, size),
+            layer=getattr(tech.LAYER, f"{via}drawing"),
+            port_type=None,
+        )
+        ref = c.add_ref(
+            cell,
+            columns=columns,
+            rows=rows,
+            column_pitch=size + spacing,
+            row_pitch=size + spacing,
+        )
+        ref.dmove((x0, y0))
+
+        for level, enc in ((bottom, enc_bottom), (top, enc_top)):
+            plates.setdefault(level, []).append(
+                (x0 - enc, y0 - enc, x0 + w + enc, y0 + h + enc)
+            )
+
+    for level, boxes in plates.items():
+        xmin, ymin = min(b[0] for b in boxes), min(b[1] for b in boxes)
+        xmax, ymax = max(b[2] for b in boxes), max(b[3] for b in boxes)
+        c.add_polygon(
+            [(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)],
+            layer=getattr(tech.LAYER, f"{level}drawing"),
+        )
+    return c
 
 
 @gf.cell
@@ -29,7 +168,7 @@ def via_stack(
     vt2_columns: int = 1,
     vt2_rows: int = 1,
 ) -> Component:
-    """Create a via stack test component.
+    """Create a via stack with the IHP ``via_stack`` PyCell.
 
     Args:
         bottom_layer: Bottom metal layer name.
@@ -44,76 +183,37 @@ def via_stack(
     Returns:
         Component with via stack test.
     """
-    # ----------------------------------------------------------------
-    # Step 1: Get the technology object
-    # ----------------------------------------------------------------
-    tech = Tech.get("SG13_dev")  # Must match the name registered in SG13_Tech
-
-    # ----------------------------------------------------------------
-    # Step 2: Create a layout and a cell
-    # ----------------------------------------------------------------
-    layout = pya.Layout()                # new empty layout
-    cell = layout.create_cell("VIA_STACK_1")  # new cell for your transistor
-
-    # ----------------------------------------------------------------
-    # Step 3: Wrap the PyCell
-    # ----------------------------------------------------------------
-    # PCellWrapper acts like the 'specs' object in KLayout
-    # It handles parameter declarations and calls defineParamSpecs internally
-    device = PCellWrapper(impl=via_stackIHP(), tech=tech)
-
-    # ----------------------------------------------------------------
-    # Step 4: Define parameters
-    # ----------------------------------------------------------------
     params = {
-        'cdf_version': 8,
-        'Display': 'Selected',
-        'b_layer': bottom_layer,
-        't_layer': top_layer,
-        'vn_columns': vn_columns,
-        'vn_rows': vn_rows,
-        'vt1_columns': vt1_columns,
-        'vt1_rows': vt1_rows,
-        'vt2_columns': vt2_columns,
-        'vt2_rows': vt2_rows
+        "cdf_version": 8,
+        "Display": "Selected",
+        "b_layer": bottom_layer,
+        "t_layer": top_layer,
+        "vn_columns": vn_columns,
+        "vn_rows": vn_rows,
+        "vt1_columns": vt1_columns,
+        "vt1_rows": vt1_rows,
+        "vt2_columns": vt2_columns,
+        "vt2_rows": vt2_rows,
     }
 
-    # Convert params into a list in the order of device.param_decls
-    param_values = [params[p.name] for p in device.param_decls]
-
-    # ----------------------------------------------------------------
-    # Step 5: Produce the layout
-    # ----------------------------------------------------------------
-    device.produce(layout=layout,
-                layers={},        # can pass layer map if needed
-                parameters=param_values,
-                cell=cell)
-
-    # ----------------------------------------------------------------
-    # Step 6: Save GDS
-    # ----------------------------------------------------------------
-    layout.write("temp.gds")
-    print("✅ Via Stack PyCell placed successfully and GDS written.")
-    # ----------------------------------------------------------------
-    c = gf.read.import_gds(gdspath="temp.gds")
-    
-    os.remove("temp.gds")
-    return c
+    return generate_gf_from_ihp(
+        cell_name="VIA_STACK_1", cell_params=params, function_name=via_stackIHP
+    )
 
 
 @gf.cell
 def no_filler_stack(
     width: int = 10,
     length: int = 10,
-    noAct: str = "Yes",   # no active filler
-    noGP: str = "Yes",    # no GatePoly filler
-    noM1: str = "Yes",    # no M1 filler
-    noM2: str = "Yes",    # no M2 filler
-    noM3: str = "Yes",    # no M3 filler
-    noM4: str = "Yes",    # no M4 filler
-    noM5: str = "Yes",    # no M5 filler
-    noTM1: str = "Yes",   # no TM1 filler
-    noTM2: str = "Yes",   # no TM2 filler
+    noAct: str = "Yes",  # no active filler
+    noGP: str = "Yes",  # no GatePoly filler
+    noM1: str = "Yes",  # no M1 filler
+    noM2: str = "Yes",  # no M2 filler
+    noM3: str = "Yes",  # no M3 filler
+    noM4: str = "Yes",  # no M4 filler
+    noM5: str = "Yes",  # no M5 filler
+    noTM1: str = "Yes",  # no TM1 filler
+    noTM2: str = "Yes",  # no TM2 filler
 ) -> Component:
     """Create a NoFiller via stack test component.
 
@@ -129,18 +229,11 @@ def no_filler_stack(
     Returns:
         gdsfactory.Component with NoFiller via stack.
     """
-    tech = Tech.get("SG13_dev")
-
-    layout = pya.Layout()
-    cell = layout.create_cell("NO_FILLER_STACK")
-
-    device = PCellWrapper(impl=no_filler_stackIHP(), tech=tech)
-
     params = {
         "cdf_version": 8,
         "Display": "Selected",
-        "w": width*1e-6,
-        "l": length*1e-6,
+        "w": width * 1e-6,
+        "l": length * 1e-6,
         "noAct": noAct,
         "noGP": noGP,
         "noM1": noM1,
@@ -152,24 +245,14 @@ def no_filler_stack(
         "noTM2": noTM2,
     }
 
-    # Convert params into a list in the order of device.param_decls
-    param_values = [params.get(p.name, None) for p in device.param_decls]
-
-    device.produce(
-        layout=layout,
-        layers={},
-        parameters=param_values,
-        cell=cell,
+    return generate_gf_from_ihp(
+        cell_name="NO_FILLER_STACK",
+        cell_params=params,
+        function_name=no_filler_stackIHP,
     )
 
-    layout.write("temp.gds")
-    c = gf.read.import_gds(gdspath="temp.gds")
-    os.remove("temp.gds")
-    return c
-
 
 if __name__ == "__main__":
     # Test the components
     c = via_stack(bottom_layer="Metal1", top_layer="Metal5")
     c.show()
-
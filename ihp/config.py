@@ -3,12 +3,15 @@
 Can overwrite config with an optional `config.yml` file in the current working directory.
 """
 
+import os
 import pathlib
 
 cwd = pathlib.Path.cwd()
 cwd_config = cwd / "config.yml"
 module = pathlib.Path(__file__).parent.absolute()
 repo = module.parent
+home = pathlib.Path.home()
+pdk = pathlib.Path("/foss/pdks/ihp-sg13g2")
 
 
 class Path:
@@ -23,6 +26,14 @@ class Path:
     lyt = module / "klayout" / "tech" / "tech.lyt"
     layers_yaml = module / "layers.yaml"
     tech = module / "klayout" / "tech"
+    layer_map = module / "layer_map_ihp.py"
+
+    pdk = pdk
+    pdk_lyp = pdk / "libs.tech" / "klayout" / "tech" / "sg13g2.lyp"
+    pycell_lib = pdk / "libs.tech" / "klayout" / "python" / "sg13g2_pycell_lib"
+    tech_json = pycell_lib / "sg13g2_tech.json"
+    cache = pathlib.Path(os.environ.get("IHP_CACHE_DIR", home / ".cache" / "ihp"))
+    snapshots = cache / "snapshots"
 
 
 PATH = Path()
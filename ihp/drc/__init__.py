@@ -0,0 +1,29 @@
+"""Fast DRC of the ``ihp.tech.TECH`` rules.
+
+See :mod:`ihp.drc.engine` for the checks, :mod:`ihp.drc.incremental` for the
+per-cell result cache and :mod:`ihp.drc.tiled` for multi-core full-chip checks.
+"""
+
+from ihp.drc.engine import (
+    Rule,
+    Violation,
+    check,
+    check_cell,
+    tech_rules,
+    warn_violations,
+    write_rdb,
+)
+from ihp.drc.incremental import DrcCache
+from ihp.drc.tiled import check_tiled
+
+__all__ = [
+    "DrcCache",
+    "Rule",
+    "Violation",
+    "check",
+    "check_cell",
+    "check_tiled",
+    "tech_rules",
+    "warn_violations",
+    "write_rdb",
+]
@@ -0,0 +1,320 @@
+"""Fast in-process DRC for the rules in ``ihp.tech.TECH``.
+
+The geometric rules of :class:`ihp.tech.TechIHP` (widths, spacings, via sizes,
+enclosures, ...) compile to KLayout region operations. :func:`check` runs them
+on the shapes of a component in deep (hierarchical) mode: KLayout checks each
+unique cell once per context instead of once per instance. It is a quick check
+during development and does not replace the signoff deck under
+``ihp/klayout/tech/drc``.
+
+.. code::
+
+    from ihp import drc
+
+    violations = drc.check(c)
+    drc.write_rdb(violations, "c.lyrdb", c.name)
+
+To check every new cell while developing, add :func:`warn_violations` to the
+``post_process`` of ``@gf.cell``.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import pathlib
+import warnings
+from collections.abc import Iterable, Sequence
+
+import gdsfactory as gf
+from kfactory import kdb
+from klayout import rdb
+
+from ihp.layer_map_ihp import LAYER
+
+__all__ = [
+    "Rule",
+    "Violation",
+    "check",
+    "check_cell",
+    "tech_rules",
+    "warn_violations",
+    "write_rdb",
+]
+
+_metals = {
+    "metal1": "Metal1",
+    "metal2": "Metal2",
+    "metal3": "Metal3",
+    "metal4": "Metal4",
+    "metal5": "Metal5",
+    "topmetal1": "TopMetal1",
+    "topmetal2": "TopMetal2",
+}
+
+# TECH field -> check, layer, other layer. "gate" is Activ & GatPoly.
+_rule_table: tuple[tuple[str, str, str, str | None], ...] = (
+    ("gate_extension", "extension", "GatPolydrawing", "Activdrawing"),
+    ("cont_gate_spacing", "separation", "Contdrawing", "gate"),
+    ("psd_enc_active", "optional_enclosure", "Activdrawing", "pSDdrawing"),
+    ("nwell_enc_active", "optional_enclosure", "Activdrawing", "NWelldrawing"),
+    (
+        "thickgateox_enc_active",
+        "optional_enclosure",
+        "Activdrawing",
+        "ThickGateOxdrawing",
+    ),
+    ("cont_size", "size", "Contdrawing", None),
+    ("cont_spacing", "space", "Contdrawing", None),
+    ("cont_enc_active", "optional_enclosure", "Contdrawing", "Activdrawing"),
+    ("cont_enc_poly", "optional_enclosure", "Contdrawing", "GatPolydrawing"),
+    ("cont_enc_metal", "enclosure", "Contdrawing", "Metal1drawing"),
+    *(
+        rule
+        for n in range(1, 5)
+        for rule in (
+            (f"via{n}_size", "size", f"Via{n}drawing", None),
+            (f"via{n}_spacing", "space", f"Via{n}drawing", None),
+            (f"via{n}_enc_metal", "enclosure", f"Via{n}drawing", f"Metal{n}drawing"),
+            (
+                f"via{n}_enc_metal",
+                "enclosure",
+                f"Via{n}drawing",
+                f"Metal{n + 1}drawing",
+            ),
+        )
+    ),
+    ("topvia1_size", "size", "TopVia1drawing", None),
+    ("topvia1_spacing", "space", "TopVia1drawing", None),
+    ("topvia1_enc_metal5", "enclosure", "TopVia1drawing", "Metal5drawing"),
+    ("topvia1_enc_metal", "enclosure", "TopVia1drawing", "TopMetal1drawing"),
+    ("topvia2_size", "size", "TopVia2drawing", None),
+    ("topvia2_spacing", "space", "TopVia2drawing", None),
+    ("topvia2_enc_metal", "enclosure", "TopVia2drawing", "TopMetal1drawing"),
+    ("topvia2_enc_metal", "enclosure", "TopVia2drawing", "TopMetal2drawing"),
+    *(
+        rule
+        for metal, name in _metals.items()
+        for rule in (
+            (f"{metal}_width", "width", f"{name}drawing", None),
+            (f"{metal}_spacing", "space", f"{name}drawing", None),
+        )
+    ),
+    ("mim_min_size", "width", "MIMdrawing", None),
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Rule:
+    """A design rule of TECH compiled to a region check.
+
+    Args:
+        name: field of :class:`ihp.tech.TechIHP` with the value.
+        kind: width, space, size, enclosure (other covers and encloses layer),
+            optional_enclosure (enclosure where layer is inside other),
+            separation (layer to other) or extension (layer beyond other).
+        layer: LAYER name of the checked shapes.
+        other: LAYER name of the second layer, "gate" for Activ & GatPoly.
+        value: rule value in um.
+    """
+
+    name: str
+    kind: str
+    layer: str
+    other: str | None
+    value: float
+
+    @property
+    def layers(self) -> tuple[str, ...]:
+        return (self.layer,) if self.other is None else (self.layer, self.other)
+
+    @property
+    def required_layers(self) -> tuple[str, ...]:
+        """Layers that must have shapes for the rule to find violations."""
+        return (self.layer,) if self.kind == "enclosure" else self.layers
+
+
+@dataclasses.dataclass(frozen=True)
+class Violation:
+    """A rule violation with its marker polygon in um."""
+
+    rule: Rule
+    marker: kdb.DPolygon
+
+    @property
+    def bbox(self) -> kdb.DBox:
+        return self.marker.bbox()
+
+
+def tech_rules(tech=None) -> list[Rule]:
+    """Returns the rules compiled from the values of tech, ``TECH`` by default."""
+    if tech is None:
+        from ihp.tech import TECH as tech
+
+    return [
+        Rule(name, kind, layer, other, getattr(tech, name))
+        for name, kind, layer, other in _rule_table
+    ]
+
+
+class _Layers:
+    """Regions of a cell by LAYER name, built on first use.
+
+    Args:
+        cell: cell to read.
+        dss: deep shape store for hierarchical regions, None for flat ones.
+        window: only read shapes touching this region.
+        max_depth: hierarchy levels to read, 0 for the shapes of cell only.
+    """
+
+    def __init__(
+        self,
+        cell: kdb.Cell,
+        dss: kdb.DeepShapeStore | None = None,
+        window: kdb.Region | None = None,
+        max_depth: int | None = None,
+    ) -> None:
+        self.cell = cell
+        self.dss = dss
+        self.window = window
+        self.max_depth = max_depth
+        self._regions: dict[str, kdb.Region] = {}
+
+    def __getitem__(self, name: str) -> kdb.Region:
+        if name not in self._regions:
+            if name == "gate":
+                region = self["Activdrawing"] & self["GatPolydrawing"]
+            else:
+                layer = getattr(LAYER, name)
+                li = self.cell.layout().find_layer(layer.layer, layer.datatype)
+                if li is None:
+                    region = kdb.Region()
+                else:
+                    it = self.cell.begin_shapes_rec(li)
+                    if self.window is not None:
+                        it.region = self.window
+                    if self.max_depth is not None:
+                        it.max_depth = self.max_depth
+                    region = (
+                        kdb.Region(it) if self.dss is None else kdb.Region(it, self.dss)
+                    )
+            self._regions[name] = region
+        return self._regions[name]
+
+
+def _run(rule: Rule, layers: _Layers, d: int) -> kdb.EdgePairs | kdb.Region:
+    """Returns the edge pairs or polygons that violate rule, d is the value in dbu."""
+    region = layers[rule.layer]
+    if rule.kind == "width":
+        return region.width_check(d)
+    if rule.kind == "space":
+        return region.space_check(d)
+    if rule.kind == "size":
+        return region.non_squares() + region.squares().with_bbox_width(d, True)
+    other = layers[rule.other]
+    if rule.kind == "enclosure":  # the parts outside other violate too
+        return other.enclosing_check(region, d).polygons() + (region - other)
+    if rule.kind == "optional_enclosure":
+        return other.enclosing_check(region, d)
+    if rule.kind == "separation":
+        return region.separation_check(other, d)
+    if rule.kind == "extension":
+        ends = (region & other).edges() & other.edges()
+        return region.edges().enclosing_check(ends, d)
+    raise ValueError(f"unknown rule kind {rule.kind!r}")
+
+
+def _markers(result: kdb.EdgePairs | kdb.Region) -> Iterable[kdb.Polygon]:
+    if isinstance(result, kdb.EdgePairs):
+        return (ep.polygon(0) for ep in result.each())
+    return result.each()
+
+
+def _results(
+    rules: Sequence[Rule], layers: _Layers, dbu: float
+) -> dict[Rule, kdb.EdgePairs | kdb.Region]:
+    """Returns the edge pairs or polygons that violate each rule, skips clean rules."""
+    results = {}
+    for rule in rules:
+        if any(layers[name].is_empty() for name in rule.required_layers):
+            continue
+        result = _run(rule, layers, round(rule.value / dbu))
+        if isinstance(result, kdb.Region):
+            result.merged_semantics = False  # keep touching markers apart
+        if not result.is_empty():
+            results[rule] = result
+    return results
+
+
+def _violations(
+    results: dict[Rule, kdb.EdgePairs | kdb.Region], dbu: float
+) -> list[Violation]:
+    return [
+        Violation(rule, marker.to_dtype(dbu))
+        for rule, result in results.items()
+        for marker in _markers(result)
+    ]
+
+
+def check_cell(
+    cell: kdb.Cell, rules: Sequence[Rule] | None = None, deep: bool = True
+) -> list[Violation]:
+    """Returns the violations of a KLayout cell, including its children.
+
+    Args:
+        cell: cell to check.
+        rules: rules to check. Defaults to :func:`tech_rules`.
+        deep: check hierarchically, each unique cell once.
+    """
+    if rules is None:
+        rules = tech_rules()
+    dbu = cell.layout().dbu
+    layers = _Layers(cell, kdb.DeepShapeStore() if deep else None)
+    return _violations(_results(rules, layers, dbu), dbu)
+
+
+def check(
+    component: gf.Component,
+    rules: Sequence[Rule] | None = None,
+    deep: bool | None = None,
+) -> list[Violation]:
+    """Returns the violations of a component.
+
+    Args:
+        component: to check.
+        rules: rules to check. Defaults to :func:`tech_rules`.
+        deep: check hierarchically, each unique cell once. Defaults to True
+            if the component has instances.
+    """
+    if deep is None:
+        deep = not component.kdb_cell.is_leaf()
+    return check_cell(component.kdb_cell, rules, deep=deep)
+
+
+def warn_violations(component: gf.Component) -> None:
+    """Warns about the DRC violations of component, for ``@gf.cell(post_process=...)``."""
+    violations = check(component)
+    if violations:
+        counts: dict[str, int] = {}
+        for v in violations:
+            counts[v.rule.name] = counts.get(v.rule.name, 0) + 1
+        summary = ", ".join(f"{name}: {n}" for name, n in sorted(counts.items()))
+        warnings.warn(f"{component.name} has DRC violations ({summary})", stacklevel=2)
+
+
+def write_rdb(
+    violations: Iterable[Violation], path: pathlib.Path | str, cell_name: str = "TOP"
+) -> pathlib.Path:
+    """Writes violations to a KLayout marker database (.lyrdb)."""
+    db = rdb.ReportDatabase("ihp.drc")
+    cell = db.create_cell(cell_name)
+    categories: dict[Rule, rdb.RdbCategory] = {}
+    for v in violations:
+        if v.rule not in categories:
+            category = db.create_category(f"{v.rule.name}:{v.rule.layer}")
+            category.description = f"{v.rule.kind} {v.rule.value} um"
+            categories[v.rule] = category
+        item = db.create_item(cell.rdb_id(), categories[v.rule].rdb_id())
+        item.add_value(v.marker)
+    path = pathlib.Path(path)
+    db.save(str(path))
+    return path
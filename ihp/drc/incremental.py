@@ -0,0 +1,253 @@
+"""Incremental DRC with results cached per cell by geometry hash.
+
+:class:`DrcCache` checks a hierarchy bottom-up. The violations of each cell
+are cached under the content hash of the cell, i.e. of its shapes on the rule
+layers and of its child instances. A cell whose hash is known is not checked
+again. A changed cell takes the cached results of its children, checks its
+own shapes and then checks only the context windows again:
+
+- where two child instances come closer than the halo
+- where its own shapes come closer than the halo to a child
+
+Regular arrays are checked as one unit with their own cache entry, so an
+array of an unchanged cell is not checked again either. The array is built in
+a private scratch layout, the checked layout is never modified.
+
+The halo is the largest rule value. Violations touching a context window come
+from the window check. Violations elsewhere come from the children and from the
+own shapes. After an edit only the edited cell and its parents are checked,
+and only in those windows. The cache keeps the results of the ``max_entries``
+most recently used cells and arrays.
+
+.. code::
+
+    from ihp.drc import DrcCache
+
+    cache = DrcCache()
+    violations = cache.check(c)  # checks every cell
+    violations = cache.check(c2)  # only cells that differ from c
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import threading
+from collections.abc import Sequence
+
+import gdsfactory as gf
+from kfactory import kdb
+
+from ihp.cells.fixed_library import content_hashes
+from ihp.drc.engine import Rule, Violation, _Layers, _results, _violations, tech_rules
+from ihp.layer_map_ihp import LAYER
+
+__all__ = ["DrcCache"]
+
+Results = dict[Rule, kdb.EdgePairs | kdb.Region]
+
+
+def _markers(result: kdb.EdgePairs | kdb.Region) -> kdb.EdgePairs | kdb.Region:
+    """Returns result with touching marker polygons kept apart."""
+    if isinstance(result, kdb.Region):
+        result.merged_semantics = False
+    return result
+
+
+class DrcCache:
+    """DRC results of each cell cached by geometry hash.
+
+    Args:
+        rules: rules to check. Defaults to :func:`ihp.drc.tech_rules`.
+        halo: context distance in um. Defaults to the largest rule value.
+        max_entries: cached results, the least recently used are dropped above it.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Rule] | None = None,
+        halo: float | None = None,
+        max_entries: int = 10_000,
+    ) -> None:
+        self.rules = tuple(tech_rules() if rules is None else rules)
+        self.halo = max(rule.value for rule in self.rules) if halo is None else halo
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results: collections.OrderedDict[str, Results] = collections.OrderedDict()
+        self._hashes: dict[tuple[int, int, str], str] = {}  # locked cells only
+        self._lock = threading.RLock()
+
+    def clear(self) -> None:
+        """Drops every cached result."""
+        with self._lock:
+            self._results.clear()
+            self._hashes.clear()
+            self.hits = self.misses = 0
+
+    def _layer_indexes(self, layout: kdb.Layout) -> list[int]:
+        names = {name for rule in self.rules for name in rule.layers}
+        if "gate" in names:
+            names |= {"Activdrawing", "GatPolydrawing"}
+        indexes = []
+        for name in sorted(names - {"gate"}):
+            layer = getattr(LAYER, name)
+            li = layout.find_layer(layer.layer, layer.datatype)
+            if li is not None:
+                indexes.append(li)
+        return indexes
+
+    def _hash(self, cell: kdb.Cell) -> dict[int, str]:
+        """Returns the geometry hashes of cell and its children by cell index.
+
+        Hashes of locked cells are kept, gdsfactory does not change them.
+        """
+        layout = cell.layout()
+        known = {}
+        for ci in (cell.cell_index(), *cell.called_cells()):
+            key = (id(layout), ci, layout.cell(ci).name)
+            if key in self._hashes:
+                known[ci] = self._hashes[key]
+        hashes = content_hashes(layout, cell, self._layer_indexes(layout), known)
+        for ci, h in hashes.items():
+            if ci not in known and layout.cell(ci).is_locked():
+                self._hashes[(id(layout), ci, layout.cell(ci).name)] = h
+        return hashes
+
+    def _check(
+        self, cell: kdb.Cell, hashes: dict[int, str], arrays: bool = True
+    ) -> Results:
+        """Returns the violations of cell in cell coordinates.
+
+        Args:
+            cell: to check.
+            hashes: geometry hashes by cell index, including cell.
+            arrays: check each regular array as one unit, with its own cache entry.
+        """
+        key = hashes[cell.cell_index()]
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        layout = cell.layout()
+        dbu = layout.dbu
+        halo = round(self.halo / dbu)
+
+        own_layers = _Layers(cell, max_depth=0)
+        results = _results(self.rules, own_layers, dbu)
+
+        placed: list[tuple[Results, kdb.ICplxTrans]] = []
+        elements = kdb.Region()
+        for inst in cell.each_inst():
+            if arrays and inst.is_regular_array() and inst.size() > 1:
+                array_results = self._check_array(inst, hashes)
+                elements.insert(inst.bbox().enlarged(halo, halo))
+                if array_results:
+                    placed.append((array_results, kdb.ICplxTrans(inst.cplx_trans.disp)))
+                continue
+            child = layout.cell(inst.cell_index)
+            child_results = self._check(child, hashes)
+            bbox = child.bbox()
+            for trans in inst.cell_inst.each_cplx_trans():
+                elements.insert(bbox.transformed(trans).enlarged(halo, halo))
+                if child_results:
+                    placed.append((child_results, trans))
+
+        own = kdb.Region()
+        for li in self._layer_indexes(layout):
+            own.insert(cell.shapes(li))
+        windows = elements.merged(False, 2) + (
+            elements.merged() & own.sized(halo)
+        )  # overlaps
+        windows.merge()
+
+        if not windows.is_empty():
+            results = {rule: r.not_interacting(windows) for rule, r in results.items()}
+            window_layers = _Layers(cell, window=windows.sized(halo))
+            for rule, r in _results(self.rules, window_layers, dbu).items():
+                r = r.interacting(windows)
+                if rule in results:
+                    results[rule] += r
+                else:
+                    results[rule] = r
+
+        for child_results, trans in placed:
+            for rule, r in child_results.items():
+                r = _markers(r.transformed(trans))
+                if not windows.is_empty():
+                    r = r.not_interacting(windows)
+                if rule in results:
+                    results[rule] += r
+                else:
+                    results[rule] = r
+
+        results = {rule: _markers(r) for rule, r in results.items() if not r.is_empty()}
+        self._put(key, results)
+        return results
+
+    def _get(self, key: str) -> Results | None:
+        """Returns the cached results of key and marks them as recently used."""
+        results = self._results.get(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return results
+
+    def _put(self, key: str, results: Results) -> None:
+        self._results[key] = results
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def _check_array(self, inst: kdb.Instance, hashes: dict[int, str]) -> Results:
+        """Returns the violations of a regular array, relative to its first element.
+
+        The array is checked in a scratch cell of a private layout, so that its
+        result is cached on its own and reused wherever the same array is placed.
+        The element cell and its children are copied there on the rule layers.
+        """
+        base = inst.cplx_trans
+        local = kdb.ICplxTrans(base.mag, base.angle, base.is_mirror(), 0, 0)
+        key = hashlib.sha256(
+            f"{hashes[inst.cell_index]} {local} {inst.a} {inst.b} {inst.na} {inst.nb}".encode()
+        ).hexdigest()
+        if key in self._results:
+            return self._get(key)
+
+        layout = inst.cell.layout()
+        scratch_layout = kdb.Layout()
+        scratch_layout.dbu = layout.dbu
+        layers = kdb.LayerMapping()
+        for li in self._layer_indexes(layout):
+            layers.map(li, scratch_layout.layer(layout.get_info(li)))
+        element = layout.cell(inst.cell_index)
+        copy = scratch_layout.create_cell(element.name)
+        cells = kdb.CellMapping()
+        cells.for_single_cell_full(
+            scratch_layout, copy.cell_index(), layout, element.cell_index()
+        )
+        copy.copy_tree_shapes(element, cells, layers)
+
+        scratch = scratch_layout.create_cell("$drc_array")
+        scratch.insert(
+            kdb.CellInstArray(
+                copy.cell_index(), local, inst.a, inst.b, inst.na, inst.nb
+            )
+        )
+        scratch_hashes = {
+            target: hashes[source] for source, target in cells.table().items()
+        }
+        scratch_hashes[scratch.cell_index()] = key
+        return self._check(scratch, scratch_hashes, arrays=False)
+
+    def check_cell(self, cell: kdb.Cell) -> list[Violation]:
+        """Returns the violations of a KLayout cell, checking only cells not seen before."""
+        with self._lock:
+            results = self._check(cell, self._hash(cell))
+            return _violations(results, cell.layout().dbu)
+
+    def check(self, component: gf.Component) -> list[Violation]:
+        """Returns the violations of component, checking only cells not seen before."""
+        return self.check_cell(component.kdb_cell)
@@ -0,0 +1,196 @@
+"""Tiled DRC on several processes for full-chip layouts.
+
+:func:`check_tiled` cuts the layout into square tiles. Each tile is checked on
+the shapes that touch it, plus an overlap as wide as the largest rule value in
+``TECH``. A violation belongs to the tile that contains the center of its
+marker box, so the results of neighbouring tiles do not repeat each other. A
+marker longer than the overlap, e.g. along a long narrow wire, is checked again
+in a window grown over it, so it comes out whole. The tiles are spread over a
+process pool. Each worker reads the layout once from a temporary OASIS file.
+
+.. code::
+
+    from ihp.drc import check_tiled
+
+    violations = check_tiled(chip, tile_size=500, processes=8)
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import math
+import os
+import pathlib
+import tempfile
+from collections.abc import Sequence
+from typing import Any
+
+import gdsfactory as gf
+from kfactory import kdb
+
+from ihp.drc.engine import Rule, Violation, _Layers, _results, tech_rules
+
+__all__ = ["check_tiled", "tiles"]
+
+Marker = tuple[
+    int, tuple[bool, tuple[tuple[int, ...], ...]]
+]  # rule index, packed edge pair or polygon
+
+_worker: dict[str, Any] = {}
+
+
+def tiles(bbox: kdb.Box, tile_size: int) -> list[kdb.Box]:
+    """Returns tiles of tile_size dbu that cover bbox, including its top and right edges."""
+    nx = bbox.width() // tile_size + 1
+    ny = bbox.height() // tile_size + 1
+    x0, y0 = bbox.left, bbox.bottom
+    return [
+        kdb.Box(
+            x0 + i * tile_size,
+            y0 + j * tile_size,
+            x0 + (i + 1) * tile_size,
+            y0 + (j + 1) * tile_size,
+        )
+        for j in range(ny)
+        for i in range(nx)
+    ]
+
+
+def _init(path: str, cell_name: str, rules: Sequence[Rule], overlap: int) -> None:
+    layout = kdb.Layout()
+    layout.read(path)
+    _worker.update(
+        layout=layout, cell=layout.cell(cell_name), rules=tuple(rules), overlap=overlap
+    )
+
+
+def _check_tile(tile: tuple[int, int, int, int]) -> list[Marker]:
+    """Returns the violations owned by a tile of the layout loaded by :func:`_init`.
+
+    A marker that reaches out of the window can come from a merged polygon cut
+    off at the window. The window grows over such markers until they fit.
+    """
+    cell, rules, overlap = _worker["cell"], _worker["rules"], _worker["overlap"]
+    dbu = cell.layout().dbu
+    box = kdb.Box(*tile)
+    trusted = box.enlarged(overlap, overlap)
+    window = kdb.Region(trusted)
+    results: dict[Rule, kdb.EdgePairs | kdb.Region] = {}
+    pending = rules
+    while pending:
+        for rule in pending:
+            results.pop(rule, None)
+        results.update(_results(pending, _Layers(cell, window=window), dbu))
+        cut = {
+            rule: _cut(results[rule], box, trusted, window)
+            for rule in pending
+            if rule in results
+        }
+        pending = tuple(rule for rule in rules if cut.get(rule))
+        for bbox in (bbox for bboxes in cut.values() for bbox in bboxes):
+            window.insert(bbox.enlarged(overlap, overlap))
+        window.merge()
+
+    owned = []
+    for i, rule in enumerate(rules):
+        for marker in results[rule].each() if rule in results else ():
+            center = marker.bbox().center()
+            if box.left <= center.x < box.right and box.bottom <= center.y < box.top:
+                owned.append((i, _pack(marker)))
+    return owned
+
+
+def _cut(
+    result: kdb.EdgePairs | kdb.Region,
+    box: kdb.Box,
+    trusted: kdb.Box,
+    window: kdb.Region,
+) -> list[kdb.Box]:
+    """Returns the boxes of the markers that touch box and reach out of window."""
+    bboxes = [
+        bbox
+        for bbox in (marker.bbox() for marker in result.each())
+        if not bbox.inside(trusted)
+    ]
+    return [
+        bbox
+        for bbox in bboxes
+        if bbox.touches(box) and not (kdb.Region(bbox) - window).is_empty()
+    ]
+
+
+def _pack(
+    marker: kdb.EdgePair | kdb.Polygon,
+) -> tuple[bool, tuple[tuple[int, ...], ...]]:
+    """Returns the edge pair, or the hull and holes of the polygon, as integer tuples."""
+    if isinstance(marker, kdb.EdgePair):
+        edges = (marker.first, marker.second)
+        return True, (
+            tuple(c for e in edges for c in (e.p1.x, e.p1.y, e.p2.x, e.p2.y)),
+        )
+    contours = [
+        marker.each_point_hull(),
+        *(marker.each_point_hole(i) for i in range(marker.holes())),
+    ]
+    return False, tuple(
+        tuple(c for p in contour for c in (p.x, p.y)) for contour in contours
+    )
+
+
+def _unpack(packed: tuple[bool, tuple[tuple[int, ...], ...]]) -> kdb.Polygon:
+    edge_pair, (c, *holes) = packed
+    if edge_pair:
+        return kdb.EdgePair(kdb.Edge(*c[:4]), kdb.Edge(*c[4:])).polygon(0)
+    polygon = kdb.Polygon([kdb.Point(x, y) for x, y in zip(c[::2], c[1::2])])
+    for hole in holes:
+        polygon.insert_hole([kdb.Point(x, y) for x, y in zip(hole[::2], hole[1::2])])
+    return polygon
+
+
+def check_tiled(
+    component: gf.Component,
+    rules: Sequence[Rule] | None = None,
+    tile_size: float = 500.0,
+    processes: int | None = None,
+) -> list[Violation]:
+    """Returns the violations of component, checked tile by tile in a process pool.
+
+    Args:
+        component: to check.
+        rules: rules to check. Defaults to :func:`ihp.drc.tech_rules`.
+        tile_size: tile width and height in um.
+        processes: worker processes. Defaults to the CPU count, 1 checks in this process.
+    """
+    rules = tuple(tech_rules() if rules is None else rules)
+    cell = component.kdb_cell
+    layout = cell.layout()
+    dbu = layout.dbu
+    overlap = math.ceil(max(rule.value for rule in rules) / dbu)
+    boxes = [
+        (b.left, b.bottom, b.right, b.top)
+        for b in tiles(cell.bbox(), max(round(tile_size / dbu), 1))
+    ]
+    processes = processes or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = pathlib.Path(tmp) / "layout.oas"
+        options = kdb.SaveLayoutOptions()
+        options.select_cell(cell.cell_index())
+        layout.write(str(path), options)
+        args = (str(path), cell.name, rules, overlap)
+
+        if processes == 1:
+            _init(*args)
+            chunks = [_check_tile(box) for box in boxes]
+            _worker.clear()
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                processes, initializer=_init, initargs=args
+            ) as pool:
+                chunksize = max(len(boxes) // (4 * processes), 1)
+                chunks = list(pool.map(_check_tile, boxes, chunksize=chunksize))
+
+    markers = dict.fromkeys(
+        marker for chunk in chunks for marker in chunk
+    )  # ordered, deduplicated
+    return [Violation(rules[i], _unpack(packed).to_dtype(dbu)) for i, packed in markers]
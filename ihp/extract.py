@@ -0,0 +1,283 @@
+"""Net extraction with union-find over the layer connectivity of the PDK.
+
+:func:`extract` reads the conducting layers of ``ihp.connectivity``
+(METAL1-VIA1-METAL2 ... TOPMETAL1-TOPVIA2-TOPMETAL2) flat and merged, so each
+merged polygon is connected on its own layer. For each metal-via pair, a
+uniform grid over the polygon boxes finds the candidate overlaps in NumPy. The
+exact test runs only for candidates that are not both boxes. The overlaps
+are the edges of a graph whose connected components come from a vectorized
+union-find. Time and memory grow with the number of shapes and overlaps, not
+with their square.
+
+Texts on the ``*text`` and ``*pin`` layers of a metal, or on the metal itself,
+label the net under them.
+
+.. code::
+
+    from ihp import extract
+
+    nets = extract.extract(c)
+    nets.netlist()  # {net: [pin names]}
+    nets.shapes(nets.pin_nets("VDD")[0])  # {layer: [polygons]}
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Sequence
+
+import gdsfactory as gf
+import numpy as np
+from kfactory import kdb
+
+from ihp.layer_map_ihp import LAYER
+
+__all__ = ["Extraction", "Pin", "extract"]
+
+
+@dataclasses.dataclass(frozen=True)
+class Pin:
+    """A text that labels a net."""
+
+    name: str
+    layer: str
+    position: kdb.DPoint
+    net: int
+
+
+@dataclasses.dataclass
+class Extraction:
+    """Nets of a layout.
+
+    Args:
+        layers: LAYER names of the conducting layers.
+        polygons: merged polygons of all layers in dbu.
+        layer: index into layers of each polygon.
+        net: net of each polygon, 0 to the number of nets - 1.
+        pins: labels found on the nets.
+        dbu: database unit in um.
+    """
+
+    layers: tuple[str, ...]
+    polygons: list[kdb.Polygon]
+    layer: np.ndarray
+    net: np.ndarray
+    pins: list[Pin]
+    dbu: float
+
+    @property
+    def num_nets(self) -> int:
+        return int(self.net.max()) + 1 if len(self.net) else 0
+
+    def shapes(self, net: int) -> dict[str, list[kdb.DPolygon]]:
+        """Returns the polygons of a net in um by LAYER name."""
+        shapes: dict[str, list[kdb.DPolygon]] = {}
+        for i in np.flatnonzero(self.net == net):
+            shapes.setdefault(self.layers[self.layer[i]], []).append(
+                self.polygons[i].to_dtype(self.dbu)
+            )
+        return shapes
+
+    def nets(self) -> dict[int, dict[str, list[kdb.DPolygon]]]:
+        """Returns the polygons of every net in um by LAYER name."""
+        nets: dict[int, dict[str, list[kdb.DPolygon]]] = {}
+        for polygon, layer, net in zip(self.polygons, self.layer, self.net):
+            nets.setdefault(int(net), {}).setdefault(self.layers[layer], []).append(
+                polygon.to_dtype(self.dbu)
+            )
+        return nets
+
+    def netlist(self) -> dict[int, list[str]]:
+        """Returns the sorted pin names of each labeled net."""
+        netlist: dict[int, set[str]] = {}
+        for pin in self.pins:
+            netlist.setdefault(pin.net, set()).add(pin.name)
+        return {net: sorted(names) for net, names in sorted(netlist.items())}
+
+    def pin_nets(self, name: str) -> list[int]:
+        """Returns the nets labeled name, more than one if the net is open."""
+        return sorted({pin.net for pin in self.pins if pin.name == name})
+
+
+def _layer_name(name: str) -> str:
+    """Returns the LAYER name of a name or an alias like METAL1, e.g. Metal1drawing."""
+    if not hasattr(LAYER, name):
+        import ihp.tech  # noqa: F401, adds the aliases
+
+    return getattr(LAYER, name).name
+
+
+def _boxes(polygons: Sequence[kdb.Polygon]) -> np.ndarray:
+    coords = []
+    for polygon in polygons:
+        box = polygon.bbox()
+        coords += (box.left, box.bottom, box.right, box.top)
+    return np.array(coords, dtype=np.int64).reshape(-1, 4)
+
+
+def _bins(boxes: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns box indexes and keys of the grid bins each box covers."""
+    x0, y0 = boxes[:, 0] // size, boxes[:, 1] // size
+    nx, ny = boxes[:, 2] // size - x0 + 1, boxes[:, 3] // size - y0 + 1
+    counts = nx * ny
+    index = np.repeat(np.arange(len(boxes)), counts)
+    k = np.arange(counts.sum()) - np.repeat(
+        np.cumsum(counts) - counts, counts
+    )  # rank within the box
+    bx = x0[index] + k % nx[index]
+    by = y0[index] + k // nx[index]
+    return index, (bx << 32) + by
+
+
+def _bin_size(a: np.ndarray, b: np.ndarray) -> int:
+    """Returns a bin size for which each box covers a few bins on average."""
+    sizes = np.concatenate([a[:, 2:] - a[:, :2], b[:, 2:] - b[:, :2]]).ravel()
+    size = max(int(np.median(sizes)), 1)
+    n = len(a) + len(b)
+    while True:
+        cover = sum(
+            int(
+                (
+                    (boxes[:, 2] // size - boxes[:, 0] // size + 1)
+                    * (boxes[:, 3] // size - boxes[:, 1] // size + 1)
+                ).sum()
+            )
+            for boxes in (a, b)
+        )
+        if cover <= 8 * n:
+            return size
+        size *= 2
+
+
+def _overlaps(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the index pairs of boxes of a and b that overlap or touch.
+
+    Both sets go into a uniform grid. A pair is reported by the bin that holds
+    the lower left corner of the intersection of the two boxes, so only once.
+    """
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    size = _bin_size(a, b)
+    ia, ka = _bins(a, size)
+    ib, kb = _bins(b, size)
+    order = np.argsort(kb, kind="stable")
+    ib, kb = ib[order], kb[order]
+    lo, hi = np.searchsorted(kb, ka, "left"), np.searchsorted(kb, ka, "right")
+    counts = hi - lo
+    pa = np.repeat(ia, counts)
+    key = np.repeat(ka, counts)
+    pb = ib[
+        np.repeat(lo, counts)
+        + np.arange(counts.sum())
+        - np.repeat(np.cumsum(counts) - counts, counts)
+    ]
+
+    ba, bb = a[pa], b[pb]
+    left = np.maximum(ba[:, 0], bb[:, 0])
+    bottom = np.maximum(ba[:, 1], bb[:, 1])
+    keep = (left <= np.minimum(ba[:, 2], bb[:, 2])) & (
+        bottom <= np.minimum(ba[:, 3], bb[:, 3])
+    )
+    keep &= ((left // size) << 32) + bottom // size == key
+    return pa[keep], pb[keep]
+
+
+def _union_find(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Returns the component of each of n nodes for edges u-v, numbered 0 to k-1.
+
+    Vectorized union-find: roots hook onto the smaller root of each edge, then
+    paths are compressed by pointer jumping, until every edge has one root.
+    """
+    parent = np.arange(n)
+    while True:
+        while True:  # compress
+            grand = parent[parent]
+            if (grand == parent).all():
+                break
+            parent = grand
+        ru, rv = parent[u], parent[v]
+        differ = ru != rv
+        if not differ.any():
+            break
+        ru, rv = ru[differ], rv[differ]
+        low = np.minimum(ru, rv)
+        np.minimum.at(parent, ru, low)
+        np.minimum.at(parent, rv, low)
+    return np.unique(parent, return_inverse=True)[1]
+
+
+def extract(
+    component: gf.Component, connectivity: Sequence[tuple[str, str, str]] | None = None
+) -> Extraction:
+    """Returns the nets of component.
+
+    Args:
+        component: to extract.
+        connectivity: (layer, via, layer) triples of LAYER names or aliases.
+            Defaults to ``ihp.connectivity``.
+    """
+    if connectivity is None:
+        from ihp import connectivity
+
+    cell = component.kdb_cell
+    layout = cell.layout()
+    names = tuple(
+        dict.fromkeys(_layer_name(name) for triple in connectivity for name in triple)
+    )
+
+    polygons: list[kdb.Polygon] = []
+    spans: dict[str, slice] = {}
+    for name in names:
+        start = len(polygons)
+        layer = getattr(LAYER, name)
+        li = layout.find_layer(layer.layer, layer.datatype)
+        if li is not None:
+            polygons += kdb.Region(cell.begin_shapes_rec(li)).merged().each()
+        spans[name] = slice(start, len(polygons))
+    layer = np.repeat(
+        np.arange(len(names)), [span.stop - span.start for span in spans.values()]
+    )
+    boxes = _boxes(polygons)
+    is_box = np.array([polygon.is_box() for polygon in polygons], dtype=bool)
+
+    us, vs = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for triple in connectivity:
+        bottom, via, top = (_layer_name(name) for name in triple)
+        sv = spans[via]
+        for metal in (bottom, top):
+            sm = spans[metal]
+            pm, pv = _overlaps(boxes[sm], boxes[sv])
+            pm, pv = pm + sm.start, pv + sv.start
+            exact = is_box[pm] & is_box[pv]
+            for k in np.flatnonzero(~exact):
+                exact[k] = polygons[pm[k]].touches(polygons[pv[k]])
+            us.append(pm[exact])
+            vs.append(pv[exact])
+    net = _union_find(len(polygons), np.concatenate(us), np.concatenate(vs))
+
+    pins = []
+    for name in names:
+        sm = spans[name]
+        for label in dict.fromkeys(
+            (name, name.replace("drawing", "text"), name.replace("drawing", "pin"))
+        ):
+            if not hasattr(LAYER, label):
+                continue
+            li = layout.find_layer(
+                getattr(LAYER, label).layer, getattr(LAYER, label).datatype
+            )
+            texts = (
+                list(kdb.Texts(cell.begin_shapes_rec(li)).each())
+                if li is not None
+                else []
+            )
+            if not texts:
+                continue
+            points = np.array([(t.x, t.y, t.x, t.y) for t in texts], dtype=np.int64)
+            for t, m in zip(*_overlaps(points, boxes[sm])):
+                text, m = texts[t], m + sm.start
+                if is_box[m] or polygons[m].inside(kdb.Point(text.x, text.y)):
+                    position = kdb.DPoint(text.x * layout.dbu, text.y * layout.dbu)
+                    pins.append(Pin(text.string, label, position, int(net[m])))
+
+    return Extraction(names, polygons, layer, net, pins, layout.dbu)
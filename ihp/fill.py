@@ -0,0 +1,303 @@
+"""Metal density maps and fill for Metal1..TopMetal2.
+
+:func:`density_map` rasterizes a metal layer (drawn shapes and filler) into
+pixels of one window step with KLayout. It then sums the pixels of each
+density window with a NumPy integral image.
+
+:func:`add_fill` places square filler tiles on a global grid. A tile must keep
+the clearance of its :class:`FillRule` from the drawn metal, from the
+``*nofill`` layer of the metal and from ``NoMetFiller``. The free sites come
+from one rasterization of the blocked area, one pixel per site. Rows of free
+sites are merged into rectangles and each rectangle becomes one arrayed
+reference of a single tile cell, so a full chip fills in seconds and the GDS
+stays small.
+
+.. code::
+
+    from ihp import fill
+    from ihp.tech import TECH
+
+    c = fill.add_fill(chip)
+    m1 = fill.density_map(c, "Metal1drawing")
+    low = m1.windows(m1.density < TECH.metal_min_density)
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+from collections.abc import Sequence
+
+import gdsfactory as gf
+import numpy as np
+from kfactory import kdb
+
+from ihp.layer_map_ihp import LAYER
+
+__all__ = [
+    "DensityMap",
+    "FillRule",
+    "add_fill",
+    "density_map",
+    "fill_rules",
+    "fill_tile",
+]
+
+_metals = ("Metal1", "Metal2", "Metal3", "Metal4", "Metal5", "TopMetal1", "TopMetal2")
+
+
+@dataclasses.dataclass(frozen=True)
+class FillRule:
+    """Filler tiles of one metal.
+
+    Args:
+        metal: LAYER name prefix, e.g. Metal1.
+        size: tile width and height in um.
+        spacing: between tiles in um.
+        clearance: from tiles to drawn metal and nofill areas in um.
+    """
+
+    metal: str
+    size: float
+    spacing: float
+    clearance: float
+
+    @property
+    def layer(self) -> str:
+        return f"{self.metal}drawing"
+
+    @property
+    def filler(self) -> str:
+        return f"{self.metal}filler"
+
+    @property
+    def nofill(self) -> tuple[str, ...]:
+        return f"{self.metal}nofill", "NoMetFillerdrawing"
+
+
+@dataclasses.dataclass(frozen=True)
+class DensityMap:
+    """Metal density of square windows.
+
+    Args:
+        layer: LAYER name of the drawn metal.
+        origin: lower left corner of the first window in um.
+        step: from one window to the next in um.
+        window: window width and height in um.
+        density: (rows, columns) array, row 0 at the bottom.
+    """
+
+    layer: str
+    origin: tuple[float, float]
+    step: float
+    window: float
+    density: np.ndarray
+
+    def windows(self, mask: np.ndarray) -> list[kdb.DBox]:
+        """Returns the windows selected by a boolean mask of density, e.g. density < 0.35."""
+        x0, y0 = self.origin
+        boxes = []
+        for j, i in zip(*np.nonzero(mask)):
+            x, y = x0 + i * self.step, y0 + j * self.step
+            boxes.append(kdb.DBox(x, y, x + self.window, y + self.window))
+        return boxes
+
+
+def fill_rules(tech=None) -> list[FillRule]:
+    """Returns the fill rules of Metal1..TopMetal2 from tech, ``TECH`` by default."""
+    if tech is None:
+        from ihp.tech import TECH as tech
+
+    return [
+        FillRule(
+            metal,
+            tech.topmetal_fill_size,
+            tech.topmetal_fill_spacing,
+            tech.topmetal_fill_clearance,
+        )
+        if metal.startswith("Top")
+        else FillRule(
+            metal,
+            tech.metal_fill_size,
+            tech.metal_fill_spacing,
+            tech.metal_fill_clearance,
+        )
+        for metal in _metals
+    ]
+
+
+def _region(cell: kdb.Cell, names: Sequence[str]) -> kdb.Region:
+    """Returns the flat shapes of cell on the LAYER names."""
+    region = kdb.Region()
+    layout = cell.layout()
+    for name in names:
+        layer = getattr(LAYER, name)
+        li = layout.find_layer(layer.layer, layer.datatype)
+        if li is not None:
+            region.insert(cell.begin_shapes_rec(li))
+    return region
+
+
+def _integral(a: np.ndarray) -> np.ndarray:
+    """Returns the summed-area table of a with a leading row and column of zeros."""
+    s = np.zeros((a.shape[0] + 1, a.shape[1] + 1))
+    s[1:, 1:] = a.cumsum(0).cumsum(1)
+    return s
+
+
+def density_map(
+    component: gf.Component,
+    layer: str,
+    window: float | None = None,
+    step: float | None = None,
+) -> DensityMap:
+    """Returns the density of a metal layer, drawn shapes and filler, in windows over component.
+
+    Filler tiles are expected not to overlap each other or drawn shapes, as
+    placed by :func:`add_fill`.
+
+    Windows start at the lower left corner of component. The last row and
+    column are cut at its boundary and their density is taken over the part
+    inside. A component smaller than a window has one window.
+
+    Args:
+        component: to analyse.
+        layer: LAYER name of the drawn metal, e.g. Metal1drawing.
+        window: window width and height in um. Defaults to ``TECH.metal_density_window``.
+        step: from one window to the next in um, a divisor of window.
+            Defaults to ``TECH.metal_density_step``.
+    """
+    if window is None or step is None:
+        from ihp.tech import TECH
+
+        window = TECH.metal_density_window if window is None else window
+        step = TECH.metal_density_step if step is None else step
+    k = round(window / step)
+    if not math.isclose(k * step, window):
+        raise ValueError(f"window {window} is not a multiple of step {step}")
+
+    cell = component.kdb_cell
+    dbu = cell.layout().dbu
+    bbox = cell.bbox()
+    pixel = round(step / dbu)
+    nx = max(math.ceil(bbox.width() / pixel), k)
+    ny = max(math.ceil(bbox.height() / pixel), k)
+    origin = kdb.Point(bbox.left, bbox.bottom)
+    drawn = _region(cell, [layer]).merged()
+    filler = _region(cell, [layer.replace("drawing", "filler")])  # tiles do not overlap
+    area = sum(
+        np.array(
+            shapes.rasterize(origin, kdb.Vector(pixel, pixel), nx, ny), dtype=float
+        ).reshape(ny, nx)
+        for shapes in (drawn, filler)
+    )
+    inside = np.array(
+        kdb.Region(bbox).rasterize(origin, kdb.Vector(pixel, pixel), nx, ny),
+        dtype=float,
+    ).reshape(ny, nx)
+
+    def window_sums(a: np.ndarray) -> np.ndarray:
+        s = _integral(a)
+        return s[k:, k:] - s[:-k, k:] - s[k:, :-k] + s[:-k, :-k]
+
+    sums, total = window_sums(area), window_sums(inside)
+    density = np.divide(sums, total, out=np.zeros_like(sums), where=total > 0)
+    return DensityMap(
+        layer, (bbox.left * dbu, bbox.bottom * dbu), step, window, density
+    )
+
+
+@gf.cell
+def fill_tile(layer: str = "Metal1filler", size: float = 5.0) -> gf.Component:
+    """Returns a square filler tile with its lower left corner at the origin."""
+    c = gf.Component()
+    layer = getattr(LAYER, layer)
+    c.add_polygon(
+        [(0, 0), (size, 0), (size, size), (0, size)],
+        layer=(layer.layer, layer.datatype),
+    )
+    return c
+
+
+def _rectangles(free: np.ndarray) -> list[tuple[int, int, int, int]]:
+    """Returns rectangles (column, row, columns, rows) that cover the True sites of free.
+
+    Each run of True in a row extends the rectangle of the same run in the row below.
+    """
+    padded = np.zeros((free.shape[0], free.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = free
+    rows, cols = np.nonzero(np.diff(padded, axis=1))
+    starts, ends = cols[::2], cols[1::2]  # a run starts and ends in the same row
+    bounds = np.searchsorted(rows[::2], np.arange(free.shape[0] + 1))
+
+    rectangles = []
+    open_: dict[tuple[int, int], list[int]] = {}  # run -> [column, row, columns, rows]
+    for row in range(free.shape[0]):
+        first, last = bounds[row], bounds[row + 1]
+        runs = set(zip(starts[first:last].tolist(), ends[first:last].tolist()))
+        for run in open_.keys() - runs:
+            rectangles.append(tuple(open_.pop(run)))
+        for start, end in runs:
+            if (start, end) in open_:
+                open_[start, end][3] += 1
+            else:
+                open_[start, end] = [start, row, end - start, 1]
+    rectangles += [tuple(rect) for rect in open_.values()]
+    return sorted(rectangles, key=lambda rect: (rect[1], rect[0]))
+
+
+def add_fill(
+    component: gf.Component,
+    rules: Sequence[FillRule] | None = None,
+    boundary: kdb.DBox | None = None,
+) -> gf.Component:
+    """Returns a new component with component and filler tile arrays on each metal.
+
+    Args:
+        component: to fill.
+        rules: fill rules, one per metal. Defaults to :func:`fill_rules`.
+        boundary: area to fill in um. Defaults to the bounding box of component.
+    """
+    rules = fill_rules() if rules is None else rules
+    cell = component.kdb_cell
+    dbu = cell.layout().dbu
+    area = cell.bbox() if boundary is None else boundary.to_itype(dbu)
+
+    c = gf.Component()
+    c.add_ref(component)
+    for rule in rules:
+        size, pitch = round(rule.size / dbu), round((rule.size + rule.spacing) / dbu)
+        clearance = round(rule.clearance / dbu)
+        blocked = _region(cell, [rule.layer, *rule.nofill]).sized(clearance)
+        blocked += kdb.Region(area.enlarged(pitch, pitch)) - kdb.Region(area)
+        blocked.merge()
+
+        # sites on a global grid, so fill of neighbouring blocks lines up
+        x0 = math.floor(area.left / pitch) * pitch
+        y0 = math.floor(area.bottom / pitch) * pitch
+        nx = math.ceil((area.right - x0) / pitch)
+        ny = math.ceil((area.top - y0) / pitch)
+        if nx <= 0 or ny <= 0:
+            continue
+        overlap = np.array(
+            blocked.rasterize(
+                kdb.Point(x0, y0),
+                kdb.Vector(pitch, pitch),
+                kdb.Vector(size, size),
+                nx,
+                ny,
+            ),
+            dtype=float,
+        ).reshape(ny, nx)
+
+        tile = fill_tile(rule.filler, rule.size)
+        for i, j, columns, rows in _rectangles(overlap == 0):
+            ref = c.add_ref(
+                tile,
+                columns=columns,
+                rows=rows,
+                column_pitch=pitch * dbu,
+                row_pitch=pitch * dbu,
+            )
+            ref.dmove(((x0 + i * pitch) * dbu, (y0 + j * pitch) * dbu))
+    return c
@@ -1,3 +1,4 @@
+# Generated by `python -m ihp.build` from layers.lyp, do not edit.
 from gdsfactory.typings import Layer
 from gdsfactory.technology.layer_map import LayerMap
 
@@ -382,3 +383,5 @@ class LayerMapIHP(LayerMap):
 
 
 LAYER = LayerMapIHP
+LYP_SOURCE = "klayout/tech/layers.lyp"
+LYP_SHA256 = "5d2a8f297dc951d97e1a0a1a4a2604eb756604b8ac443f5a69f31fc623d03974"
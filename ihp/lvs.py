@@ -0,0 +1,395 @@
+"""Layout against netlist check of the connections of a component.
+
+:func:`check` compares the connections of ``Component.get_netlist()`` with the
+connectivity of the metal and via stack of ``ihp.connectivity``. Two ports
+that the netlist connects must be on one net in the layout, or the net is open.
+Ports of different netlist nets must not share a net in the layout, or the
+nets are shorted. Ports that a cell connects inside itself, like both ends of a
+wire, belong to one netlist net.
+
+The layout nets are extracted hierarchically. A cell is extracted once per
+content hash, see :func:`ihp.cells.fixed_library.content_hashes`. Its parents
+reuse that result and only look at the places where instances touch each
+other or the shapes of the parent. :class:`LvsCache` keeps the results, so a
+second check after an edit only extracts the cells that changed and their
+parents.
+
+.. code::
+
+    from ihp import lvs
+
+    report = lvs.check(c)
+    assert report.ok, report
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+from collections.abc import Sequence
+
+import gdsfactory as gf
+import numpy as np
+from gdsfactory.get_netlist import get_instance_name_from_alias
+from kfactory import kdb
+
+from ihp.cells.fixed_library import content_hashes
+from ihp.extract import _boxes, _layer_name, _overlaps, _union_find
+from ihp.layer_map_ihp import LAYER
+
+__all__ = ["LvsCache", "Open", "Report", "Short", "check"]
+
+Connectivity = Sequence[tuple[str, str, str]]
+
+_names = {(layer.layer, layer.datatype): layer.name for layer in LAYER}
+
+
+@dataclasses.dataclass(frozen=True)
+class Open:
+    """A netlist net split over several layout nets.
+
+    ``ports`` holds the "instance,port" names of each part, the ports that are
+    on no shape come last as one part.
+    """
+
+    ports: tuple[tuple[str, ...], ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class Short:
+    """A layout net that joins several netlist nets, with the ports of each."""
+
+    ports: tuple[tuple[str, ...], ...]
+
+
+@dataclasses.dataclass(frozen=True)
+class Report:
+    """Opens and shorts of a component."""
+
+    opens: tuple[Open, ...]
+    shorts: tuple[Short, ...]
+
+    @property
+    def ok(self) -> bool:
+        return not self.opens and not self.shorts
+
+
+def _point(port: gf.Port, dbu: float) -> kdb.Point:
+    return kdb.DPoint(*port.center).to_itype(dbu)
+
+
+def _touching(boxes: np.ndarray, box: kdb.Box) -> np.ndarray:
+    return np.flatnonzero(
+        (boxes[:, 0] <= box.right)
+        & (boxes[:, 2] >= box.left)
+        & (boxes[:, 1] <= box.top)
+        & (boxes[:, 3] >= box.bottom)
+    )
+
+
+def _edges(
+    polygons: Sequence[kdb.Polygon],
+    layer: np.ndarray,
+    node: np.ndarray,
+    pairs: Sequence[tuple[int, int]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the node pairs of polygons that touch, for each pair of layer indexes."""
+    boxes = _boxes(polygons)
+    is_box = np.array([polygon.is_box() for polygon in polygons], dtype=bool)
+    us, vs = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for la, lb in pairs:
+        ia, ib = np.flatnonzero(layer == la), np.flatnonzero(layer == lb)
+        pa, pb = _overlaps(boxes[ia], boxes[ib])
+        pa, pb = ia[pa], ib[pb]
+        keep = node[pa] != node[pb]
+        pa, pb = pa[keep], pb[keep]
+        exact = is_box[pa] & is_box[pb]
+        for k in np.flatnonzero(~exact):
+            exact[k] = polygons[pa[k]].touches(polygons[pb[k]])
+        us.append(node[pa[exact]])
+        vs.append(node[pb[exact]])
+    return np.concatenate(us), np.concatenate(vs)
+
+
+class _CellNets:
+    """Nets of a cell, built from its own shapes and the nets of its children.
+
+    Args:
+        polygons: own shapes, merged per layer.
+        layer: layer index of each polygon.
+        children: nets and transformation of each placed child, array elements one by one.
+        pairs: layer index pairs that connect.
+    """
+
+    def __init__(
+        self,
+        polygons: list[kdb.Polygon],
+        layer: np.ndarray,
+        children: list[tuple[_CellNets, kdb.ICplxTrans]],
+        pairs: Sequence[tuple[int, int]],
+    ) -> None:
+        self.polygons = polygons
+        self.layer = layer
+        self.boxes = _boxes(polygons)
+        self.children = children
+        self.child_boxes = _boxes(
+            [kdb.Polygon(nets.bbox.transformed(t)) for nets, t in children]
+        )
+        self.bbox = kdb.Box()
+        for box in (
+            *(p.bbox() for p in polygons),
+            *(kdb.Box(*b.tolist()) for b in self.child_boxes),
+        ):
+            self.bbox += box
+
+        # nodes: own polygons, then the nets of each child
+        offsets = np.cumsum([len(polygons), *(nets.num_nets for nets, _ in children)])
+        node = np.arange(len(polygons))
+        u, v = _edges(polygons, layer, node, pairs)
+        us, vs = [u], [v]
+        for window in self._windows():
+            index = _touching(self.boxes, window)
+            wp, wl, wn = (
+                [polygons[i] for i in index],
+                layer[index].tolist(),
+                index.tolist(),
+            )
+            for k in _touching(self.child_boxes, window):
+                nets, trans = children[k]
+                cp, cl, cn = nets.query(window.transformed(trans.inverted()))
+                wp += [p.transformed(trans) for p in cp]
+                wl += cl
+                wn += [offsets[k] + n for n in cn]
+            u, v = _edges(
+                wp, np.array(wl, dtype=int), np.array(wn, dtype=np.int64), pairs
+            )
+            us.append(u)
+            vs.append(v)
+
+        net = _union_find(int(offsets[-1]), np.concatenate(us), np.concatenate(vs))
+        self.net = net[: len(polygons)]
+        self.child_net = [
+            net[offsets[k] : offsets[k + 1]] for k in range(len(children))
+        ]
+        self.num_nets = int(net.max()) + 1 if len(net) else 0
+
+    def _windows(self) -> list[kdb.Box]:
+        """Returns boxes where children touch each other or the own shapes."""
+        elements = kdb.Region()
+        for b in self.child_boxes:
+            elements.insert(kdb.Box(*b.tolist()).enlarged(1, 1))
+        if elements.is_empty():
+            return []
+        own = kdb.Region()
+        for polygon in self.polygons:
+            own.insert(polygon)
+        windows = elements.merged(False, 2) + (elements.merged() & own.sized(1))
+        return [polygon.bbox() for polygon in windows.merged().each()]
+
+    def query(self, box: kdb.Box) -> tuple[list[kdb.Polygon], list[int], list[int]]:
+        """Returns the polygons touching box, with their layer indexes and nets, in cell coordinates."""
+        index = _touching(self.boxes, box)
+        polygons = [self.polygons[i] for i in index]
+        layers, nets = self.layer[index].tolist(), self.net[index].tolist()
+        for k in _touching(self.child_boxes, box):
+            child, trans = self.children[k]
+            cp, cl, cn = child.query(box.transformed(trans.inverted()))
+            polygons += [p.transformed(trans) for p in cp]
+            layers += cl
+            nets += self.child_net[k][cn].tolist()
+        return polygons, layers, nets
+
+    def net_at(self, point: kdb.Point, layer: int) -> int | None:
+        """Returns the net of the shape on layer at point, None if there is none."""
+        polygons, layers, nets = self.query(kdb.Box(point, point))
+        for polygon, polygon_layer, net in zip(polygons, layers, nets):
+            if polygon_layer == layer and polygon.inside(point):
+                return net
+        return None
+
+
+class LvsCache:
+    """Extracted nets of each cell, cached by content hash.
+
+    Args:
+        connectivity: (layer, via, layer) triples of LAYER names or aliases.
+            Defaults to ``ihp.connectivity``.
+    """
+
+    def __init__(self, connectivity: Connectivity | None = None) -> None:
+        if connectivity is None:
+            from ihp import connectivity
+        triples = [
+            tuple(_layer_name(name) for name in triple) for triple in connectivity
+        ]
+        self.layers = tuple(
+            dict.fromkeys(name for triple in triples for name in triple)
+        )
+        index = {name: i for i, name in enumerate(self.layers)}
+        self.pairs = sorted(
+            {(index[a], index[a]) for a in self.layers}
+            | {
+                pair
+                for bottom, via, top in triples
+                for pair in ((index[bottom], index[via]), (index[via], index[top]))
+            }
+        )
+        self.hits = 0
+        self.misses = 0
+        self._nets: dict[str, _CellNets] = {}
+        self._ports: dict[tuple[str, str], dict[str, int | None]] = {}
+        self._lock = threading.RLock()
+
+    def _layer_indexes(self, layout: kdb.Layout) -> list[int]:
+        indexes = []
+        for name in self.layers:
+            layer = getattr(LAYER, name)
+            li = layout.find_layer(layer.layer, layer.datatype)
+            if li is not None:
+                indexes.append(li)
+        return indexes
+
+    def _cell_nets(self, cell: kdb.Cell, hashes: dict[int, str]) -> _CellNets:
+        key = hashes[cell.cell_index()]
+        if key in self._nets:
+            self.hits += 1
+            return self._nets[key]
+        self.misses += 1
+
+        layout = cell.layout()
+        polygons: list[kdb.Polygon] = []
+        layer: list[int] = []
+        for i, name in enumerate(self.layers):
+            li = layout.find_layer(
+                getattr(LAYER, name).layer, getattr(LAYER, name).datatype
+            )
+            if li is not None and not cell.shapes(li).is_empty():
+                merged = list(kdb.Region(cell.shapes(li)).merged().each())
+                polygons += merged
+                layer += [i] * len(merged)
+        children = []
+        for inst in cell.each_inst():
+            nets = self._cell_nets(layout.cell(inst.cell_index), hashes)
+            if nets.num_nets:
+                children += [
+                    (nets, trans) for trans in inst.cell_inst.each_cplx_trans()
+                ]
+        nets = _CellNets(polygons, np.array(layer, dtype=int), children, self.pairs)
+        self._nets[key] = nets
+        return nets
+
+    def _port_layer(self, component: gf.Component, port: gf.Port) -> int | None:
+        """Returns the conducting layer index of a port, None for other layers."""
+        info = component.kcl.layout.get_info(port.layer)
+        name = _names.get((info.layer, info.datatype), "")
+        drawing = name.replace("pin", "drawing").replace("text", "drawing")
+        return self.layers.index(drawing) if drawing in self.layers else None
+
+    def _port_nets(
+        self, component: gf.Component, hashes: dict[int, str]
+    ) -> dict[str, int | None]:
+        """Returns the net of each port of component in its own nets, cached per content."""
+        key = (
+            hashes[component.kdb_cell.cell_index()],
+            ",".join(sorted(p.name for p in component.ports)),
+        )
+        if key not in self._ports:
+            nets = self._cell_nets(component.kdb_cell, hashes)
+            ports = {}
+            for port in component.ports:
+                layer = self._port_layer(component, port)
+                ports[port.name] = (
+                    None
+                    if layer is None
+                    else nets.net_at(_point(port, component.kcl.dbu), layer)
+                )
+            self._ports[key] = ports
+        return self._ports[key]
+
+    def check(self, component: gf.Component) -> Report:
+        """Returns the opens and shorts of component."""
+        with self._lock:
+            return self._check(component)
+
+    def _check(self, component: gf.Component) -> Report:
+        cell = component.kdb_cell
+        layout = cell.layout()
+        hashes = content_hashes(layout, cell, self._layer_indexes(layout))
+        top = self._cell_nets(cell, hashes)
+        netlist = component.get_netlist()
+
+        # netlist nets: connections of the netlist and inside each instance
+        names: list[str] = []
+        located: list[int | None] = []  # None for ports on no shape of their instance
+        u, v = [], []
+        for ref in component.insts:
+            child = self._port_nets(ref.cell, hashes)
+            ref_name = get_instance_name_from_alias(ref)
+            elements = (
+                [(ia, ib) for ia in range(ref.na) for ib in range(ref.nb)]
+                if ref.is_regular_array()
+                else [None]
+            )
+            for element in elements:
+                first: dict[int, int] = {}
+                for cell_port in ref.cell.ports:
+                    layer = self._port_layer(component, cell_port)
+                    if layer is None or cell_port.name not in child:
+                        continue
+                    i = len(names)
+                    if element is None:
+                        port = ref.ports[cell_port.name]
+                        names.append(f"{ref_name},{cell_port.name}")
+                    else:
+                        port = ref.ports[cell_port.name, *element]
+                        names.append(
+                            f"{ref_name}<{element[0]}.{element[1]}>,{cell_port.name}"
+                        )
+                    if child[cell_port.name] is None:
+                        located.append(None)
+                    else:
+                        located.append(top.net_at(_point(port, layout.dbu), layer))
+                        u.append(i)
+                        v.append(first.setdefault(child[cell_port.name], i))
+        index = {name: i for i, name in enumerate(names)}
+        for net in netlist["nets"]:
+            if net["p1"] in index and net["p2"] in index:
+                u.append(index[net["p1"]])
+                v.append(index[net["p2"]])
+        expected = _union_find(
+            len(names), np.array(u, dtype=np.int64), np.array(v, dtype=np.int64)
+        )
+
+        opens = []
+        order = np.argsort(expected, kind="stable")
+        for members in np.split(order, np.flatnonzero(np.diff(expected[order])) + 1):
+            parts: dict[int | None, list[str]] = {}
+            for i in members:
+                parts.setdefault(located[i], []).append(names[i])
+            if len(members) > 1 and (len(parts) > 1 or None in parts):
+                on_shapes = [parts[net] for net in parts if net is not None]
+                dangling = [parts[None]] if None in parts else []
+                opens.append(
+                    Open(tuple(tuple(sorted(part)) for part in on_shapes + dangling))
+                )
+
+        shorts = []
+        by_net: dict[int, dict[int, list[str]]] = {}
+        for i, net in enumerate(located):
+            if net is not None:
+                by_net.setdefault(net, {}).setdefault(int(expected[i]), []).append(
+                    names[i]
+                )
+        for groups in by_net.values():
+            if len(groups) > 1:
+                shorts.append(
+                    Short(
+                        tuple(sorted(tuple(sorted(part)) for part in groups.values()))
+                    )
+                )
+        return Report(tuple(opens), tuple(shorts))
+
+
+def check(component: gf.Component, connectivity: Connectivity | None = None) -> Report:
+    """Returns the opens and shorts of component, see :class:`LvsCache` to check again after edits."""
+    return LvsCache(connectivity).check(component)
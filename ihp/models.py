@@ -0,0 +1,200 @@
+"""S-parameter models of the IHP cells for circuit simulation with sax.
+
+The octagonal spiral inductors ``inductor2`` and ``inductor3`` on TopMetal2
+use a scalable single-pi model after Yue and Wong (1998): the spiral
+resistance with skin effect in series with its inductance, the underpass
+overlap capacitance across the ports, and the oxide and substrate shunt at
+each port. The inductance comes from the current sheet approximation for
+octagons of Mohan et al. (1999). ``inductor3`` splits the spiral at its
+center tap into two coupled halves.
+
+Geometry and frequency broadcast against each other. Geometry arrays of
+shape ``(n,)`` and ``f`` of shape ``(m,)`` give S-parameters of shape
+``(n, m)``, so a batch of geometries sweeps all frequencies in one call.
+The models are not fitted to measurements, use them for early estimates.
+
+.. code::
+
+    import numpy as np
+    from ihp import models
+
+    s = models.inductor2(f=np.linspace(1e8, 2e10, 10_000), num_turns=np.array([1, 2, 3]))
+    s["LA", "LB"].shape  # (3, 10000)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+import numpy as np
+
+__all__ = ["get_models", "inductor2", "inductor3"]
+
+mu0 = 4e-7 * np.pi  # H/m
+eps0 = 8.854e-18  # F/um
+
+# TopMetal2 spiral over a TopMetal1 underpass
+_sheet_res = 0.0145  # ohms/square, TECH.topmetal2_sheet_res
+_thickness = 3.0  # um
+_height = 10.0  # um of oxide below TopMetal2
+_underpass_oxide = 2.8  # um between TopMetal1 and TopMetal2
+_eps = 4.1  # TECH.dielectric_eps
+# substrate capacitance and conductance per area, after Yue and Wong
+_c_sub = 1.6e-18  # F/um^2
+_g_sub = 4e-8  # S/um^2
+
+
+def _geometry(f, *params) -> tuple[np.ndarray, ...]:
+    """Returns f and params as arrays that broadcast to params shape + f shape."""
+    f = np.asarray(f, dtype=float)
+    params = [np.asarray(p, dtype=float) for p in params]
+    return (f, *(p.reshape(p.shape + (1,) * f.ndim) for p in params))
+
+
+def _spiral(width, space, distance, num_turns) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the length in um and the inductance in H of an octagonal spiral.
+
+    Args:
+        width: of the turns in um.
+        space: between the turns in um.
+        distance: inner diameter in um.
+        num_turns: number of turns.
+    """
+    d_in = distance
+    d_out = distance + 2 * num_turns * width + 2 * (num_turns - 1) * space
+    # each turn is an octagon through the middle of its track
+    diameters = num_turns * (d_in + width) + (width + space) * num_turns * (
+        num_turns - 1
+    )
+    length = 8 * np.tan(np.pi / 8) * diameters
+    d_avg = (d_in + d_out) / 2
+    fill = (d_out - d_in) / (d_out + d_in)
+    inductance = (
+        mu0
+        * num_turns**2
+        * d_avg
+        * 1e-6
+        * 1.07
+        / 2
+        * (np.log(2.29 / fill) + 0.19 * fill**2)
+    )
+    return length, inductance
+
+
+def _resistance(f, length, width) -> np.ndarray:
+    """Returns the resistance in ohms of a TopMetal2 track with skin effect."""
+    r_dc = _sheet_res * length / width
+    rho = _sheet_res * _thickness * 1e-6  # ohm m
+    delta = np.sqrt(rho / (np.pi * np.maximum(f, 1.0) * mu0)) * 1e6  # um
+    return r_dc * _thickness / (delta * -np.expm1(-_thickness / delta))
+
+
+def _shunt(omega, length, width) -> np.ndarray:
+    """Returns the admittance from one port to ground through oxide and substrate."""
+    area = length * width / 2
+    y_ox = 1j * omega * eps0 * _eps * area / _height
+    y_si = _g_sub * area + 1j * omega * _c_sub * area
+    return y_ox * y_si / (y_ox + y_si)
+
+
+def _s_from_y(y: np.ndarray, z0: float) -> np.ndarray:
+    """Returns the S-matrix (..., n, n) of the admittance matrix y."""
+    eye = np.eye(y.shape[-1])
+    # S = (I - z0 Y)(I + z0 Y)^-1 = ((I + z0 Y)^-T (I - z0 Y)^T)^T
+    a = np.swapaxes(eye + z0 * y, -1, -2)
+    b = np.swapaxes(eye - z0 * y, -1, -2)
+    return np.swapaxes(np.linalg.solve(a, b), -1, -2)
+
+
+def _sdict(s: np.ndarray, ports: tuple[str, ...]) -> dict[tuple[str, str], np.ndarray]:
+    return {
+        (p, q): s[..., i, j] for i, p in enumerate(ports) for j, q in enumerate(ports)
+    }
+
+
+def inductor2(
+    f: float | np.ndarray = 5e9,
+    width: float | np.ndarray = 2.0,
+    space: float | np.ndarray = 2.1,
+    distance: float | np.ndarray = 15.48,
+    num_turns: float | np.ndarray = 1,
+    z0: float = 50.0,
+) -> dict[tuple[str, str], np.ndarray]:
+    """Returns the S-parameters of a two port spiral inductor between LA and LB.
+
+    Args:
+        f: frequency in Hz.
+        width: of the turns in um.
+        space: between the turns in um.
+        distance: inner diameter in um.
+        num_turns: number of turns.
+        z0: reference impedance in ohms.
+    """
+    f, width, space, distance, num_turns = _geometry(
+        f, width, space, distance, num_turns
+    )
+    omega = 2 * np.pi * f
+    length, inductance = _spiral(width, space, distance, num_turns)
+    overlap = num_turns * width**2 * eps0 * _eps / _underpass_oxide
+    y_s = (
+        1 / (_resistance(f, length, width) + 1j * omega * inductance)
+        + 1j * omega * overlap
+    )
+    y_p = _shunt(omega, length, width)
+    y_s, y_p = np.broadcast_arrays(y_s, y_p)
+
+    y = np.empty(y_s.shape + (2, 2), dtype=complex)
+    y[..., 0, 0] = y[..., 1, 1] = y_s + y_p
+    y[..., 0, 1] = y[..., 1, 0] = -y_s
+    return _sdict(_s_from_y(y, z0), ("LA", "LB"))
+
+
+def inductor3(
+    f: float | np.ndarray = 5e9,
+    width: float | np.ndarray = 2.0,
+    space: float | np.ndarray = 2.1,
+    distance: float | np.ndarray = 25.84,
+    num_turns: float | np.ndarray = 1,
+    coupling: float | np.ndarray = 0.5,
+    z0: float = 50.0,
+) -> dict[tuple[str, str], np.ndarray]:
+    """Returns the S-parameters of a center tapped spiral inductor between LA, LB and the tap LC.
+
+    The two halves from LA to LC and from LC to LB have coupling factor
+    coupling, and together the inductance of the whole spiral.
+
+    Args:
+        f: frequency in Hz.
+        width: of the turns in um.
+        space: between the turns in um.
+        distance: inner diameter in um.
+        num_turns: number of turns.
+        coupling: factor between the two halves.
+        z0: reference impedance in ohms.
+    """
+    f, width, space, distance, num_turns, coupling = _geometry(
+        f, width, space, distance, num_turns, coupling
+    )
+    omega = 2 * np.pi * f
+    length, inductance = _spiral(width, space, distance, num_turns)
+    half = inductance / (2 * (1 + coupling))
+    z_h = _resistance(f, length, width) / 2 + 1j * omega * half
+    z_m = 1j * omega * coupling * half
+    det = z_h**2 - z_m**2
+    a, b = z_h / det, -z_m / det  # admittance matrix of the two coupled halves
+    y_c = 1j * omega * num_turns * width**2 * eps0 * _eps / _underpass_oxide
+    y_p = _shunt(omega, length, width)
+    a, b, y_c, y_p = np.broadcast_arrays(a, b, y_c, y_p)
+
+    # nodes LA, LB, LC, half 1 from LA to LC and half 2 from LC to LB
+    y = np.empty(a.shape + (3, 3), dtype=complex)
+    y[..., 0, 0] = y[..., 1, 1] = a + y_c + y_p
+    y[..., 2, 2] = 2 * a - 2 * b
+    y[..., 0, 1] = y[..., 1, 0] = -b - y_c
+    y[..., 0, 2] = y[..., 2, 0] = y[..., 1, 2] = y[..., 2, 1] = b - a
+    return _sdict(_s_from_y(y, z0), ("LA", "LB", "LC"))
+
+
+def get_models() -> dict[str, Callable[..., dict[tuple[str, str], np.ndarray]]]:
+    """Returns the models of the PDK cells by cell name."""
+    return {"inductor2": inductor2, "inductor3": inductor3}
@@ -0,0 +1,239 @@
+"""Resistance and capacitance of metal wires from ``TECH`` and ``LAYER_STACK``.
+
+Wires are cut into rectangular segments. Each segment has a length ``l``
+(its longer side) and a width ``w``. A metal layer has a sheet resistance, a
+height ``h`` above the substrate (``zmin`` of its level) and a thickness
+``t``. With ``e = eps0 * TECH.dielectric_eps``:
+
+- resistance: ``sheet_res * l / w``
+- area capacitance to the substrate: ``e * w / h * l``
+- fringe capacitance to the substrate, after Sakurai and Tamaru (1983):
+  ``e * (0.15 * w / h + 2.80 * (t / h) ** 0.222) * l``
+- coupling to a parallel neighbour on the same layer at spacing ``s``, over
+  the length ``p`` both run side by side:
+  ``e * (0.03 * w / h + 0.83 * t / h - 0.07 * (t / h) ** 0.222) * (s / h) ** -1.34 * p``
+
+:func:`wire_rc` evaluates these on arrays of segments, e.g. for candidate
+routes inside an optimization loop. :func:`estimate` extracts the nets of a
+component with :func:`ihp.extract.extract`, cuts the metal polygons into
+segments and sums the values per net in one NumPy pass. Vias are not counted.
+
+.. code::
+
+    from ihp import parasitics
+
+    for net, rc in parasitics.estimate(c).items():
+        print(net, rc.resistance, rc.capacitance)
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Sequence
+
+import gdsfactory as gf
+import numpy as np
+from kfactory import kdb
+
+from ihp.extract import _overlaps, extract
+
+__all__ = ["Metal", "NetRC", "estimate", "tech_metals", "wire_rc"]
+
+eps0 = 8.854e-3  # fF/um
+
+_metals = {
+    "Metal1drawing": "metal1",
+    "Metal2drawing": "metal2",
+    "Metal3drawing": "metal3",
+    "Metal4drawing": "metal4",
+    "Metal5drawing": "metal5",
+    "TopMetal1drawing": "topmetal1",
+    "TopMetal2drawing": "topmetal2",
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Metal:
+    """Electrical data of a metal layer.
+
+    Args:
+        layer: LAYER name, e.g. Metal1drawing.
+        sheet_res: sheet resistance in ohms/square.
+        height: of the bottom of the metal above the substrate in um.
+        thickness: in um.
+        eps: relative permittivity of the dielectric around it.
+    """
+
+    layer: str
+    sheet_res: float
+    height: float
+    thickness: float
+    eps: float
+
+
+@dataclasses.dataclass(frozen=True)
+class NetRC:
+    """Parasitics of a net, resistance in ohms and capacitances in fF."""
+
+    resistance: float
+    area_cap: float
+    fringe_cap: float
+    coupling_cap: float
+
+    @property
+    def capacitance(self) -> float:
+        return self.area_cap + self.fringe_cap + self.coupling_cap
+
+
+def tech_metals(tech=None, layer_stack=None) -> dict[str, Metal]:
+    """Returns the metals by LAYER name from tech and layer_stack.
+
+    Defaults to ``TECH`` and ``LAYER_STACK``.
+    """
+    if tech is None or layer_stack is None:
+        from ihp import tech as ihp_tech
+
+        tech = ihp_tech.TECH if tech is None else tech
+        layer_stack = ihp_tech.LAYER_STACK if layer_stack is None else layer_stack
+
+    return {
+        layer: Metal(
+            layer,
+            getattr(tech, f"{level}_sheet_res"),
+            layer_stack.layers[level].zmin,
+            layer_stack.layers[level].thickness,
+            tech.dielectric_eps,
+        )
+        for layer, level in _metals.items()
+    }
+
+
+def wire_rc(
+    metal: Metal,
+    length: np.ndarray | float,
+    width: np.ndarray | float,
+    spacing: np.ndarray | float | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the resistance in ohms and capacitance in fF of wire segments.
+
+    Args:
+        metal: of the segments.
+        length: of each segment in um.
+        width: of each segment in um.
+        spacing: to a parallel neighbour on both sides over the whole length, None for none.
+    """
+    length, width = np.asarray(length, dtype=float), np.asarray(width, dtype=float)
+    resistance = metal.sheet_res * length / width
+    area, fringe = _ground_cap(metal, width)
+    capacitance = (area + fringe) * length
+    if spacing is not None:
+        capacitance = (
+            capacitance
+            + 2 * _coupling_cap(metal, width, np.asarray(spacing, dtype=float)) * length
+        )
+    return resistance, capacitance
+
+
+def _ground_cap(metal: Metal, width: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the area and fringe capacitance per um to the substrate."""
+    e, h, t = eps0 * metal.eps, metal.height, metal.thickness
+    return e * width / h, e * (0.15 * width / h + 2.80 * (t / h) ** 0.222)
+
+
+def _coupling_cap(metal: Metal, width: np.ndarray, spacing: np.ndarray) -> np.ndarray:
+    """Returns the coupling capacitance per um to a parallel neighbour."""
+    e, h, t = eps0 * metal.eps, metal.height, metal.thickness
+    return (
+        e
+        * (0.03 * width / h + 0.83 * t / h - 0.07 * (t / h) ** 0.222)
+        * (spacing / h) ** -1.34
+    )
+
+
+def _segments(polygons: Sequence[kdb.Polygon]) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the boxes (n, 4) that polygons decompose into and the polygon index of each."""
+    coords, owner = [], []
+    for i, polygon in enumerate(polygons):
+        if polygon.is_box():
+            parts = [polygon]
+        else:
+            parts = polygon.decompose_trapezoids(kdb.Polygon.TD_htrapezoids)
+        for part in parts:
+            box = part.bbox()
+            coords += (box.left, box.bottom, box.right, box.top)
+            owner.append(i)
+    return np.array(coords, dtype=np.int64).reshape(-1, 4), np.array(
+        owner, dtype=np.int64
+    )
+
+
+def estimate(
+    component: gf.Component,
+    connectivity: Sequence[tuple[str, str, str]] | None = None,
+    metals: dict[str, Metal] | None = None,
+    coupling_distance: float = 2.0,
+) -> dict[int, NetRC]:
+    """Returns the parasitics of each net of component that has metal.
+
+    The resistance of a net is the sum over its segments, a wire length
+    estimate rather than a path resistance. Coupling counts for both nets.
+
+    Args:
+        component: to estimate.
+        connectivity: for the nets. Defaults to ``ihp.connectivity``.
+        metals: by LAYER name. Defaults to :func:`tech_metals`.
+        coupling_distance: largest spacing to a neighbour with coupling in um.
+    """
+    metals = tech_metals() if metals is None else metals
+    nets = extract(component, connectivity)
+    dbu = nets.dbu
+    n = nets.num_nets
+    resistance, area_cap, fringe_cap, coupling_cap = (np.zeros(n) for _ in range(4))
+    has_metal = np.zeros(n, dtype=bool)
+
+    for index, name in enumerate(nets.layers):
+        if name not in metals:
+            continue
+        metal = metals[name]
+        own = np.flatnonzero(nets.layer == index)
+        boxes, owner = _segments([nets.polygons[i] for i in own])
+        if not len(boxes):
+            continue
+        net = nets.net[own[owner]]
+        has_metal[net] = True
+        dx, dy = (boxes[:, 2] - boxes[:, 0]) * dbu, (boxes[:, 3] - boxes[:, 1]) * dbu
+        length, width = np.maximum(dx, dy), np.minimum(dx, dy)
+        area, fringe = _ground_cap(metal, width)
+        np.add.at(resistance, net, metal.sheet_res * length / width)
+        np.add.at(area_cap, net, area * length)
+        np.add.at(fringe_cap, net, fringe * length)
+
+        # neighbours of other nets within coupling_distance, facing each other
+        d = round(coupling_distance / dbu)
+        grown = boxes + np.array([-d, -d, d, d])
+        a, b = _overlaps(grown, boxes)
+        other = net[a] != net[b]
+        a, b = a[other], b[other]
+        ba, bb = boxes[a], boxes[b]
+        gap_x = np.maximum(ba[:, 0], bb[:, 0]) - np.minimum(ba[:, 2], bb[:, 2])
+        gap_y = np.maximum(ba[:, 1], bb[:, 1]) - np.minimum(ba[:, 3], bb[:, 3])
+        side = (gap_x > 0) & (
+            gap_y < 0
+        )  # side by side in x, facing over the run -gap_y
+        above = (gap_y > 0) & (gap_x < 0)
+        spacing = np.where(side, gap_x, gap_y) * dbu
+        run = np.where(side, -gap_y, -gap_x) * dbu
+        keep = (side | above) & (spacing <= coupling_distance)
+        a, spacing, run = a[keep], spacing[keep], run[keep]
+        # each pair comes from both sides, so both nets count the coupling
+        np.add.at(coupling_cap, net[a], _coupling_cap(metal, width[a], spacing) * run)
+
+    return {
+        int(i): NetRC(
+            float(resistance[i]),
+            float(area_cap[i]),
+            float(fringe_cap[i]),
+            float(coupling_cap[i]),
+        )
+        for i in np.flatnonzero(has_metal)
+    }
@@ -0,0 +1,1157 @@
+"""Multi-layer maze routing on a grid over the IHP metal stack.
+
+The routing area is a grid of points with one pitch for all routing layers.
+Each layer has a preferred direction as in the IHP standard cell LEF:
+Metal1, Metal3, Metal5 and TopMetal2 run horizontally, the others vertically.
+A NumPy array holds the occupancy of every grid point on every layer: free,
+blocked by a shape of the component or taken by a routed net. A shape blocks
+the grid points closer to it than its spacing plus half a wire width, found
+with one rasterization per layer.
+
+Each net is an A* search over the grid from one port to the other. A step
+along the preferred direction costs 1, against it ``wrong_way_cost``, and a
+change of layer ``via_cost``. The search stays in a window around the two
+ports that grows when no path is found. Nets route one after the other,
+shortest first, and block the grid for the next ones. Wherever a route
+changes layers a ``via_stack`` from the lower to the upper metal is placed,
+with as many vias as the wires it joins carry current for and fit.
+
+:class:`ObstacleIndex` keeps the boxes of the instances and shapes of a
+component by metal in a grid of bins. The routing functions take it to
+block the grid near their ports, and add their routes to it, so a top level
+with many route calls is scanned once instead of on every call. The maze
+strategy of the PDK keeps one index per component, see
+:meth:`ObstacleIndex.of`.
+
+:func:`route_bundle_current` takes the current of each net. It widens the
+wires of each metal to the electromigration limit ``*_jmax`` of ``TECH``,
+for all nets and metals in one NumPy pass. Metals that would need wires
+wider than ``max_width`` are left out for the net, so its ports must be on
+a metal that is kept.
+
+:func:`route_bundles_maze` routes many bundles, e.g. the fan-out of a pad
+ring, on several processes. Each bundle is routed on its own in the bounding
+box of its pins, and the few whose paths cross those of an earlier bundle
+are routed again after the others.
+
+.. code::
+
+    from ihp import routing
+
+    routes = routing.route_bundle_maze(c, ports1, ports2)
+    routing.route_bundles_maze(c, [(ports1, ports2), (ports3, ports4)], processes=8)
+
+    obstacles = routing.ObstacleIndex.from_component(c)
+    for ports1, ports2 in bundles:
+        routing.route_bundle_maze(c, ports1, ports2, obstacles=obstacles)
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import contextlib
+import dataclasses
+import heapq
+import math
+import os
+import weakref
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any
+
+import gdsfactory as gf
+import numpy as np
+from kfactory import kdb
+
+from ihp.layer_map_ihp import LAYER
+
+if TYPE_CHECKING:
+    from kfactory.routing.generic import ManhattanRoute
+
+__all__ = [
+    "ObstacleIndex",
+    "Route",
+    "RoutingGrid",
+    "RoutingLayer",
+    "current_layers",
+    "em_widths",
+    "route_bundle",
+    "route_bundle_current",
+    "route_bundle_maze",
+    "route_bundles_maze",
+    "routing_grid",
+    "routing_layers",
+]
+
+FREE, BLOCKED = 0, -1
+
+_directions = {
+    "Metal1": "horizontal",
+    "Metal2": "vertical",
+    "Metal3": "horizontal",
+    "Metal4": "vertical",
+    "Metal5": "horizontal",
+    "TopMetal1": "vertical",
+    "TopMetal2": "horizontal",
+}
+_metals = tuple(_directions)
+_indexes: dict[int, ObstacleIndex] = {}  # by id of the cell, see ObstacleIndex.of
+
+
+@dataclasses.dataclass(frozen=True)
+class RoutingLayer:
+    """A metal to route on.
+
+    Args:
+        metal: LAYER name prefix, e.g. Metal2.
+        width: of the wires in um.
+        spacing: from the wires to other shapes in um.
+        direction: preferred direction, horizontal or vertical.
+    """
+
+    metal: str
+    width: float
+    spacing: float
+    direction: str
+
+    @property
+    def layer(self) -> str:
+        return f"{self.metal}drawing"
+
+
+@dataclasses.dataclass
+class RoutingGrid:
+    """Occupancy of the grid points of a routing area.
+
+    Args:
+        layers: routing layers from bottom to top.
+        origin: of grid point (0, 0) in um.
+        pitch: between grid points in um.
+        occupancy: (layers, rows, columns) array of FREE, BLOCKED or a net number from 1.
+    """
+
+    layers: tuple[RoutingLayer, ...]
+    origin: tuple[float, float]
+    pitch: float
+    occupancy: np.ndarray
+
+    def point(self, row: int, column: int) -> tuple[float, float]:
+        """Returns the position of a grid point in um."""
+        x0, y0 = self.origin
+        return round(x0 + column * self.pitch, 6), round(y0 + row * self.pitch, 6)
+
+    def nearest(self, x: float, y: float) -> tuple[int, int]:
+        """Returns the row and column of the grid point nearest to x, y, clipped to the grid."""
+        _, ny, nx = self.occupancy.shape
+        x0, y0 = self.origin
+        row = min(max(round((y - y0) / self.pitch), 0), ny - 1)
+        column = min(max(round((x - x0) / self.pitch), 0), nx - 1)
+        return row, column
+
+
+@dataclasses.dataclass(frozen=True)
+class Route:
+    """A routed net.
+
+    Args:
+        port1: name of the first port.
+        port2: name of the second port.
+        points: (x, y, metal) of the ends, corners and layer changes in um.
+        length: of the wires in um.
+        vias: number of via stacks.
+    """
+
+    port1: str
+    port2: str
+    points: list[tuple[float, float, str]]
+    length: float
+    vias: int
+
+
+class ObstacleIndex:
+    """Bounding boxes of obstacles by metal name in a uniform grid of bins.
+
+    Built once per component with :meth:`from_component` and passed to the
+    routing functions, which query the boxes near their ports instead of
+    scanning the component, and add the boxes of their routes. :meth:`of`
+    keeps one index per component, the maze strategy of the PDK uses it.
+
+    Args:
+        dbu: database unit in um.
+        bin_size: of the grid in um.
+    """
+
+    def __init__(self, dbu: float = 0.001, bin_size: float = 50.0) -> None:
+        self.dbu = dbu
+        self.bin_size = round(bin_size / dbu)
+        self._boxes: dict[str, list[tuple[int, int, int, int]]] = {}
+        self._bins: dict[str, dict[tuple[int, int], list[int]]] = {}
+
+    @classmethod
+    def from_component(
+        cls,
+        component: gf.Component,
+        metals: Sequence[str] = _metals,
+        bin_size: float = 50.0,
+        flatten: bool = True,
+    ) -> ObstacleIndex:
+        """Returns the index of the instances and shapes of component.
+
+        Args:
+            component: to index.
+            metals: LAYER name prefixes to index, e.g. Metal2.
+            bin_size: of the grid in um.
+            flatten: index the boxes of all shapes inside instances. If False,
+                each instance is indexed as its bounding box on each metal,
+                which is faster to build but blocks the free space inside
+                the instance, e.g. the channels between the cells of a block.
+        """
+        cell = component.kdb_cell
+        layout = cell.layout()
+        index = cls(layout.dbu, bin_size)
+        for metal in metals:
+            layer = getattr(LAYER, f"{metal}drawing")
+            li = layout.find_layer(layer.layer, layer.datatype)
+            if li is None:
+                continue
+            if flatten:
+                for it in cell.begin_shapes_rec(li).each():
+                    index.add(metal, it.shape().bbox().transformed(it.trans()))
+                continue
+            for shape in cell.shapes(li).each():
+                index.add(metal, shape.bbox())
+            for inst in cell.each_inst():
+                if not (box := inst.bbox(li)).empty():
+                    index.add(metal, box)
+        return index
+
+    @classmethod
+    def of(cls, component: gf.Component) -> ObstacleIndex:
+        """Returns the index kept for component, built on first use.
+
+        The index lives as long as the cell of component. It only learns
+        about the routes added through the routing functions: call
+        :meth:`forget` after adding other shapes or instances to component.
+        """
+        key = id(component.base)
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = cls.from_component(component)
+            weakref.finalize(component.base, _indexes.pop, key, None)
+        return index
+
+    @staticmethod
+    def forget(component: gf.Component) -> None:
+        """Drops the index kept for component, the next :meth:`of` rebuilds it."""
+        _indexes.pop(id(component.base), None)
+
+    def __len__(self) -> int:
+        return sum(len(boxes) for boxes in self._boxes.values())
+
+    def add(self, metal: str, box: kdb.Box) -> None:
+        """Adds a box in dbu on metal."""
+        self._boxes.setdefault(metal, []).append(
+            (box.left, box.bottom, box.right, box.top)
+        )
+        i = len(self._boxes[metal]) - 1
+        bins = self._bins.setdefault(metal, {})
+        size = self.bin_size
+        for bx in range(box.left // size, box.right // size + 1):
+            for by in range(box.bottom // size, box.top // size + 1):
+                bins.setdefault((bx, by), []).append(i)
+
+    def add_instance(self, instance: gf.ComponentReference) -> None:
+        """Adds the bounding box of instance on each metal."""
+        inst = instance.instance
+        layout = inst.layout()
+        for metal in _metals:
+            layer = getattr(LAYER, f"{metal}drawing")
+            li = layout.find_layer(layer.layer, layer.datatype)
+            if li is not None and not (box := inst.bbox(li)).empty():
+                self.add(metal, box)
+
+    def query(self, metal: str, box: kdb.Box) -> np.ndarray:
+        """Returns the (n, 4) boxes on metal in dbu that overlap or touch box."""
+        bins = self._bins.get(metal, {})
+        size = self.bin_size
+        found: set[int] = set()
+        for bx in range(box.left // size, box.right // size + 1):
+            for by in range(box.bottom // size, box.top // size + 1):
+                found.update(bins.get((bx, by), ()))
+        if not found:
+            return np.zeros((0, 4), dtype=np.int64)
+        boxes = np.array([self._boxes[metal][i] for i in sorted(found)], dtype=np.int64)
+        keep = (boxes[:, 0] <= box.right) & (boxes[:, 2] >= box.left)
+        keep &= (boxes[:, 1] <= box.top) & (boxes[:, 3] >= box.bottom)
+        return boxes[keep]
+
+    def at_ports(self, ports: Sequence[gf.Port]) -> list[kdb.DBox]:
+        """Returns the boxes on any metal in um that hold one of ports."""
+        found = {}
+        for port in ports:
+            x, y = (round(v / self.dbu) for v in port.dcenter)
+            for metal in self._boxes:
+                for box in self.query(metal, kdb.Box(x, y, x, y)).tolist():
+                    found[tuple(box)] = None
+        return [kdb.Box(*box).to_dtype(self.dbu) for box in found]
+
+
+def routing_layers(
+    metals: Sequence[str] = ("Metal2", "Metal3", "Metal4", "Metal5"), tech=None
+) -> list[RoutingLayer]:
+    """Returns routing layers of metals from tech, ``TECH`` by default.
+
+    Wires are as wide as the ``*_routing`` cross-sections: twice the minimum
+    width on Metal1..Metal5 and the minimum width on the top metals.
+    """
+    if tech is None:
+        from ihp.tech import TECH as tech
+
+    layers = []
+    for metal in sorted(metals, key=_metals.index):
+        width = getattr(tech, f"{metal.lower()}_width") * (
+            1 if metal.startswith("Top") else 2
+        )
+        layers.append(
+            RoutingLayer(
+                metal,
+                width,
+                getattr(tech, f"{metal.lower()}_spacing"),
+                _directions[metal],
+            )
+        )
+    return layers
+
+
+def em_widths(
+    currents: np.ndarray | Sequence[float] | float,
+    metals: Sequence[str] = _metals,
+    tech=None,
+) -> np.ndarray:
+    """Returns the (nets, metals) width in um of wires for currents in mA, metals in stack order.
+
+    A wire carries its current within the ``*_jmax`` limit of tech, ``TECH``
+    by default, and is at least as wide as in :func:`routing_layers`. Widths
+    are rounded up to twice the grid, so wire edges stay on the grid.
+    """
+    if tech is None:
+        from ihp.tech import TECH as tech
+
+    layers = routing_layers(metals, tech)
+    jmax = np.array([getattr(tech, f"{layer.metal.lower()}_jmax") for layer in layers])
+    base = np.array([layer.width for layer in layers])
+    currents = np.abs(np.atleast_1d(np.asarray(currents, dtype=float)))
+    step = 2 * tech.grid
+    width = np.maximum(currents[:, None] / jmax, base)
+    return np.ceil(np.round(width / step, 6)) * step
+
+
+def current_layers(
+    currents: np.ndarray | Sequence[float] | float,
+    metals: Sequence[str] = ("Metal2", "Metal3", "Metal4", "Metal5"),
+    max_width: float | None = None,
+    tech=None,
+) -> list[tuple[RoutingLayer, ...]]:
+    """Returns the routing layers of each net with wires wide enough for its current in mA.
+
+    Args:
+        currents: of the nets in mA.
+        metals: to route on.
+        max_width: widest wire in um, a metal that needs a wider one is left out.
+        tech: with the widths, spacings and current limits. Defaults to ``TECH``.
+    """
+    if tech is None:
+        from ihp.tech import TECH as tech
+
+    layers = routing_layers(metals, tech)
+    widths = em_widths(currents, metals, tech)
+    if max_width is not None:
+        widths[widths > max_width + 1e-9] = 0
+    options, inverse = np.unique(widths, axis=0, return_inverse=True)
+    choices = [
+        tuple(
+            dataclasses.replace(layer, width=float(w))
+            for layer, w in zip(layers, row)
+            if w > 0
+        )
+        for row in options.tolist()
+    ]
+    return [choices[k] for k in inverse.ravel()]
+
+
+def _region(cell: kdb.Cell, name: str) -> kdb.Region:
+    """Returns the flat shapes of cell on a LAYER name."""
+    layer = getattr(LAYER, name)
+    li = cell.layout().find_layer(layer.layer, layer.datatype)
+    return kdb.Region(cell.begin_shapes_rec(li)) if li is not None else kdb.Region()
+
+
+def routing_grid(
+    component: gf.Component,
+    layers: Sequence[RoutingLayer],
+    pitch: float | None = None,
+    boundary: kdb.DBox | None = None,
+    obstacles: ObstacleIndex | None = None,
+) -> RoutingGrid:
+    """Returns the grid over boundary with the grid points blocked by the shapes of component.
+
+    Args:
+        component: with the obstacles.
+        layers: to route on, from bottom to top.
+        pitch: between grid points in um. Defaults to the largest width plus spacing of layers.
+        boundary: area to route in um. Defaults to the bounding box of component.
+        obstacles: boxes to block the grid points with instead of the shapes of component.
+    """
+    cell = component.kdb_cell
+    dbu = cell.layout().dbu
+    pitch = (
+        max(layer.width + layer.spacing for layer in layers) if pitch is None else pitch
+    )
+    p = round(pitch / dbu)
+    area = cell.bbox() if boundary is None else boundary.to_itype(dbu)
+
+    # points on a global grid, so ports on multiples of pitch sit on the grid
+    x0 = math.floor(area.left / p) * p
+    y0 = math.floor(area.bottom / p) * p
+    nx = (area.right - x0) // p + 1
+    ny = (area.top - y0) // p + 1
+    occupancy = np.zeros((len(layers), ny, nx), dtype=np.int32)
+    for k, layer in enumerate(layers):
+        d = round((layer.spacing + layer.width / 2) / dbu)
+        if obstacles is not None:
+            boxes = obstacles.query(
+                layer.metal,
+                kdb.Box(x0, y0, x0 + (nx - 1) * p, y0 + (ny - 1) * p).enlarged(d, d),
+            )
+            occupancy[k][_covered(boxes, d, (x0, y0), p, (ny, nx))] = BLOCKED
+            continue
+        # a 2 dbu pixel around each point overlaps the inside of the keepout
+        # if the point is closer than d to a shape
+        keepout = _region(cell, layer.layer).sized(d - 1)
+        covered = np.array(
+            keepout.rasterize(
+                kdb.Point(x0 - 1, y0 - 1), kdb.Vector(p, p), kdb.Vector(2, 2), nx, ny
+            ),
+            dtype=float,
+        ).reshape(ny, nx)
+        occupancy[k][covered > 0] = BLOCKED
+    return RoutingGrid(tuple(layers), (x0 * dbu, y0 * dbu), p * dbu, occupancy)
+
+
+def _covered(
+    boxes: np.ndarray, d: int, origin: tuple[int, int], p: int, shape: tuple[int, int]
+) -> np.ndarray:
+    """Returns a (rows, columns) mask of the grid points closer than d to one of boxes, all in dbu."""
+    covered = np.zeros((shape[0] + 1, shape[1] + 1), dtype=np.int32)
+    if not len(boxes):
+        return covered[:-1, :-1] > 0
+    x0, y0 = origin
+    c0 = np.maximum((boxes[:, 0] - d - x0) // p + 1, 0)
+    r0 = np.maximum((boxes[:, 1] - d - y0) // p + 1, 0)
+    c1 = np.minimum(-((x0 - boxes[:, 2] - d) // p) - 1, shape[1] - 1)
+    r1 = np.minimum(-((y0 - boxes[:, 3] - d) // p) - 1, shape[0] - 1)
+    keep = (c0 <= c1) & (r0 <= r1)
+    c0, r0, c1, r1 = c0[keep], r0[keep], c1[keep] + 1, r1[keep] + 1
+    # corners of each box in a difference array, summed up in both directions
+    np.add.at(covered, (r0, c0), 1)
+    np.add.at(covered, (r0, c1), -1)
+    np.add.at(covered, (r1, c0), -1)
+    np.add.at(covered, (r1, c1), 1)
+    return covered.cumsum(0).cumsum(1)[:-1, :-1] > 0
+
+
+def _metal(port: gf.Port) -> str | None:
+    """Returns the metal of the drawing or pin layer of port, None if it is on another layer."""
+    info = port.layer_info
+    for metal in _metals:
+        for name in (f"{metal}drawing", f"{metal}pin"):
+            layer = getattr(LAYER, name)
+            if (layer.layer, layer.datatype) == (info.layer, info.datatype):
+                return metal
+    return None
+
+
+def _terminal(grid: RoutingGrid, port: gf.Port) -> list[tuple[int, int, int]]:
+    """Returns the grid point of port followed by the points that lead away from its shape.
+
+    The shape the port sits on blocks the points around it, so the points
+    along the port orientation within the keepout are given to the net.
+    """
+    metal = _metal(port)
+    for k in range(len(grid.layers)):
+        layer = grid.layers[k]
+        if layer.metal == metal:
+            break
+    else:
+        raise ValueError(
+            f"port {port.name} on {port.layer_info} is not on a routing layer"
+        )
+
+    row, column = grid.nearest(*port.dcenter)
+    steps = math.ceil((layer.spacing + layer.width / 2) / grid.pitch)
+    dx, dy = {0: (1, 0), 90: (0, 1), 180: (-1, 0), 270: (0, -1)}[
+        round(port.orientation) % 360
+    ]
+    _, ny, nx = grid.occupancy.shape
+    points = [(k, row, column)]
+    for i in range(1, steps + 1):
+        r, c = row + i * dy, column + i * dx
+        if 0 <= r < ny and 0 <= c < nx:
+            points.append((k, r, c))
+    return points
+
+
+def _search(
+    free: np.ndarray,
+    source: tuple[int, int, int],
+    target: tuple[int, int, int],
+    costs: Sequence[tuple[float, float]],
+    via_cost: float,
+) -> list[tuple[int, int, int]] | None:
+    """Returns the cheapest path of (layer, row, column) from source to target over the free points.
+
+    Args:
+        free: (layers, rows, columns) boolean array.
+        source: first point.
+        target: last point.
+        costs: of a step in x and in y on each layer.
+        via_cost: of a step to the next layer.
+    """
+    nl, ny, nx = free.shape
+    plane = ny * nx
+    is_free = free.ravel().tolist()
+    start = (source[0] * ny + source[1]) * nx + source[2]
+    goal = (target[0] * ny + target[1]) * nx + target[2]
+    tl, ty, tx = target
+
+    # on the layer of the target, the wrong way is either taken at its cost
+    # or left and come back to with two vias
+    wx, wy = (cost - 1 for cost in costs[tl])
+
+    def h(i: int) -> float:
+        layer, rest = divmod(i, plane)
+        y, x = divmod(rest, nx)
+        dx, dy = abs(x - tx), abs(y - ty)
+        if layer != tl:
+            return dx + dy + via_cost * abs(layer - tl)
+        return dx + dy + min(wx * dx + wy * dy, 2 * via_cost)
+
+    g = {start: 0.0}
+    parent = {start: -1}
+    # ties go to the point nearest to the target
+    heap = [(h(start), h(start), start)]
+    while heap:
+        f, rest_cost, i = heapq.heappop(heap)
+        cost = f - rest_cost
+        if i == goal:
+            path = []
+            while i != -1:
+                layer, rest = divmod(i, plane)
+                path.append((layer, *divmod(rest, nx)))
+                i = parent[i]
+            return path[::-1]
+        if cost > g[i]:
+            continue
+        layer, rest = divmod(i, plane)
+        y, x = divmod(rest, nx)
+        cx, cy = costs[layer]
+        moves = []
+        if x > 0:
+            moves.append((i - 1, cx))
+        if x < nx - 1:
+            moves.append((i + 1, cx))
+        if y > 0:
+            moves.append((i - nx, cy))
+        if y < ny - 1:
+            moves.append((i + nx, cy))
+        if layer > 0:
+            moves.append((i - plane, via_cost))
+        if layer < nl - 1:
+            moves.append((i + plane, via_cost))
+        for j, step in moves:
+            if not is_free[j]:
+                continue
+            new = cost + step
+            if new < g.get(j, math.inf):
+                g[j] = new
+                parent[j] = i
+                rest_cost = h(j)
+                heapq.heappush(heap, (new + rest_cost, rest_cost, j))
+    return None
+
+
+def _route_net(
+    occupancy: np.ndarray,
+    net: int,
+    source: tuple[int, int, int],
+    target: tuple[int, int, int],
+    costs: Sequence[tuple[float, float]],
+    via_cost: float,
+    margin: int,
+) -> list[tuple[int, int, int]] | None:
+    """Returns a path of net over the points of occupancy that are free or its own.
+
+    The search runs in the bounding box of source and target grown by margin
+    points, and again with twice the margin until it covers the grid.
+    """
+    _, ny, nx = occupancy.shape
+    while True:
+        r0 = max(min(source[1], target[1]) - margin, 0)
+        r1 = min(max(source[1], target[1]) + margin + 1, ny)
+        c0 = max(min(source[2], target[2]) - margin, 0)
+        c1 = min(max(source[2], target[2]) + margin + 1, nx)
+        window = occupancy[:, r0:r1, c0:c1]
+        path = _search(
+            (window == FREE) | (window == net),
+            (source[0], source[1] - r0, source[2] - c0),
+            (target[0], target[1] - r0, target[2] - c0),
+            costs,
+            via_cost,
+        )
+        if path is not None:
+            return [(layer, row + r0, column + c0) for layer, row, column in path]
+        if r0 == 0 and c0 == 0 and r1 == ny and c1 == nx:
+            return None
+        margin *= 2
+
+
+def _corners(path: Sequence[tuple[int, int, int]]) -> list[tuple[int, int, int]]:
+    """Returns the ends of path and the points where it turns or changes layers."""
+    corners = [path[0]]
+    for a, b, c in zip(path, path[1:], path[2:]):
+        if (b[0] - a[0], b[1] - a[1], b[2] - a[2]) != (
+            c[0] - b[0],
+            c[1] - b[1],
+            c[2] - b[2],
+        ):
+            corners.append(b)
+    if len(path) > 1:
+        corners.append(path[-1])
+    return corners
+
+
+def _add_wire(
+    component: gf.Component,
+    layer: RoutingLayer,
+    points: Sequence[tuple[float, float]],
+    obstacles: ObstacleIndex | None = None,
+) -> float:
+    """Adds a wire through Manhattan points to component and obstacles and returns its length."""
+    w = layer.width / 2
+    length = 0.0
+    for (xa, ya), (xb, yb) in zip(points, points[1:]):
+        if (xa, ya) == (xb, yb):
+            continue
+        x0, x1 = sorted((xa, xb))
+        y0, y1 = sorted((ya, yb))
+        component.add_polygon(
+            [(x0 - w, y0 - w), (x1 + w, y0 - w), (x1 + w, y1 + w), (x0 - w, y1 + w)],
+            layer=getattr(LAYER, layer.layer),
+        )
+        if obstacles is not None:
+            obstacles.add(
+                layer.metal,
+                kdb.DBox(x0 - w, y0 - w, x1 + w, y1 + w).to_itype(obstacles.dbu),
+            )
+        length += x1 - x0 + y1 - y0
+    return length
+
+
+def _draw(
+    component: gf.Component,
+    grid: RoutingGrid,
+    path: Sequence[tuple[int, int, int]],
+    port1: gf.Port,
+    port2: gf.Port,
+    via: Callable[..., gf.Component],
+    obstacles: ObstacleIndex | None = None,
+) -> Route:
+    """Adds the wires and vias of path between port1 and port2 to component and obstacles."""
+    corners = _corners(path)
+    xy = [grid.point(row, column) for _, row, column in corners]
+    layers = [grid.layers[k] for k, _, _ in corners]
+    length, vias = 0.0, 0
+
+    # stubs from the ports onto the grid, an L on the layer of the port
+    for port, (x, y), layer in ((port1, xy[0], layers[0]), (port2, xy[-1], layers[-1])):
+        px, py = port.dcenter
+        knee = (x, py) if round(port.orientation) % 180 == 0 else (px, y)
+        length += _add_wire(component, layer, [(px, py), knee, (x, y)], obstacles)
+
+    start = 0
+    while True:
+        end = start + 1
+        while end < len(corners) and corners[end][0] == corners[start][0]:
+            end += 1
+        length += _add_wire(component, layers[start], xy[start:end], obstacles)
+        if end == len(corners):
+            break
+        # one via stack from the layer of this run to the layer of the next
+        # run, across the layers only passed through at this point
+        bottom, top = sorted((corners[start][0], corners[end][0]))
+        ref = component.add_ref(
+            via(
+                bottom_layer=grid.layers[bottom].metal, top_layer=grid.layers[top].metal
+            )
+        )
+        ref.dmove(xy[end])
+        if obstacles is not None:
+            obstacles.add_instance(ref)
+        vias += 1
+        start = end
+    points = [(port1.dcenter[0], port1.dcenter[1], layers[0].metal)]
+    points += [(x, y, layer.metal) for (x, y), layer in zip(xy, layers)]
+    points.append((port2.dcenter[0], port2.dcenter[1], layers[-1].metal))
+    return Route(port1.name, port2.name, points, round(length, 6), vias)
+
+
+def _costs(grid: RoutingGrid, wrong_way_cost: float) -> list[tuple[float, float]]:
+    """Returns the cost of a step in x and in y on each layer of grid."""
+    return [
+        (1.0, wrong_way_cost)
+        if layer.direction == "horizontal"
+        else (wrong_way_cost, 1.0)
+        for layer in grid.layers
+    ]
+
+
+def _reserve(
+    grid: RoutingGrid, bundles: Sequence[tuple[Sequence[gf.Port], Sequence[gf.Port]]]
+) -> list[list[tuple[int, tuple[int, int, int], tuple[int, int, int]]]]:
+    """Returns (net, source, target) of the nets of each bundle, numbered after those of grid.
+
+    The pins of all nets are reserved first, so no net routes over another one's pin.
+    """
+    net = max(int(grid.occupancy.max()), 0)
+    nets = []
+    for ports1, ports2 in bundles:
+        if len(ports1) != len(ports2):
+            raise ValueError(f"{len(ports1)} ports1 but {len(ports2)} ports2")
+        nets.append([])
+        for port1, port2 in zip(ports1, ports2):
+            net += 1
+            source, target = _terminal(grid, port1), _terminal(grid, port2)
+            for point in (*source, *target):
+                grid.occupancy[point] = net
+            nets[-1].append((net, source[0], target[0]))
+    return nets
+
+
+def _route_nets(
+    occupancy: np.ndarray,
+    nets: Sequence[tuple[int, tuple[int, int, int], tuple[int, int, int]]],
+    costs: Sequence[tuple[float, float]],
+    via_cost: float,
+    margin: int,
+) -> dict[int, list[tuple[int, int, int]] | None]:
+    """Routes nets (net, source, target) shortest first and returns their paths, None if there is none.
+
+    Each path blocks occupancy for the next nets.
+    """
+
+    def distance(net: tuple[int, tuple[int, int, int], tuple[int, int, int]]) -> int:
+        _, a, b = net
+        return abs(a[1] - b[1]) + abs(a[2] - b[2])
+
+    paths = {}
+    for net, source, target in sorted(nets, key=distance):
+        path = _route_net(occupancy, net, source, target, costs, via_cost, margin)
+        if path is not None:
+            occupancy[tuple(np.array(path).T)] = net
+        paths[net] = path
+    return paths
+
+
+def _via_stack(
+    layers: Sequence[RoutingLayer] = (), tech=None
+) -> Callable[..., gf.Component]:
+    """Returns the native via stack, centered on the origin, with via arrays sized for the wires of layers.
+
+    A stack carries the current of the narrower of the two wires it joins at
+    their ``*_jmax``, with enough vias for it at the via ``*_jmax`` of tech,
+    ``TECH`` by default. Each array is square and no larger than its metal
+    plates fit in the narrower wire, one via at the least.
+    """
+    from ihp.cells.via_stacks import _via_stack_native, _vias
+
+    if tech is None:
+        from ihp.tech import TECH as tech
+
+    widths = {layer.metal: layer.width for layer in layers}
+
+    def side(via: str, width: float, current: float) -> int:
+        """Returns the columns and rows of the array of via in a wire of width."""
+        rule = via.lower()
+        size = getattr(tech, f"{rule}_size")
+        spacing = getattr(tech, f"{rule}_spacing")
+        enc = max(
+            getattr(tech, f"{rule}_enc_metal"),
+            getattr(tech, f"{rule}_enc_metal5", 0.0),
+        )
+        fits = math.floor((width - 2 * enc + spacing) / (size + spacing) + 1e-9)
+        needed = math.ceil(math.sqrt(current / getattr(tech, f"{rule}_jmax")) - 1e-9)
+        return max(1, min(fits, needed))
+
+    def stack(bottom_layer: str, top_layer: str) -> gf.Component:
+        arrays = dict.fromkeys(_vias, 1)
+        if bottom_layer in widths and top_layer in widths:
+            ends = (bottom_layer, top_layer)
+            width = min(widths[metal] for metal in ends)
+            current = min(
+                widths[metal] * getattr(tech, f"{metal.lower()}_jmax") for metal in ends
+            )
+            start, stop = _metals.index(bottom_layer), _metals.index(top_layer)
+            for via in _vias[start:stop]:
+                arrays[via] = side(via, width, current)
+        # Via1..Via4 share one array size, set by those in the stack
+        levels = _vias[_metals.index(bottom_layer) : _metals.index(top_layer)]
+        vn = min((arrays[via] for via in levels if via.startswith("Via")), default=1)
+        return _via_stack_native(
+            bottom_layer=bottom_layer,
+            top_layer=top_layer,
+            vn_columns=vn,
+            vn_rows=vn,
+            vt1_columns=arrays["TopVia1"],
+            vt1_rows=arrays["TopVia1"],
+            vt2_columns=arrays["TopVia2"],
+            vt2_rows=arrays["TopVia2"],
+        )
+
+    return stack
+
+
+def _grid(
+    component: gf.Component,
+    ports: Sequence[gf.Port],
+    layers: Sequence[RoutingLayer] | None,
+    pitch: float | None,
+    margin: int,
+    obstacles: ObstacleIndex | None = None,
+) -> RoutingGrid:
+    """Returns a grid over component and ports grown by margin grid points.
+
+    With obstacles the grid covers only the ports, grown by four times margin.
+    """
+    layers = routing_layers() if layers is None else layers
+    pitch = (
+        max(layer.width + layer.spacing for layer in layers) if pitch is None else pitch
+    )
+    boundary = kdb.DBox() if obstacles is not None else component.dbbox()
+    for port in ports:
+        boundary += kdb.DPoint(*port.dcenter)
+    grow = (1 if obstacles is None else 4) * margin * pitch
+    return routing_grid(
+        component, layers, pitch, boundary.enlarged(grow, grow), obstacles
+    )
+
+
+def route_bundle_maze(
+    component: gf.Component,
+    ports1: Sequence[gf.Port],
+    ports2: Sequence[gf.Port],
+    layers: Sequence[RoutingLayer] | None = None,
+    pitch: float | None = None,
+    via: Callable[..., gf.Component] | None = None,
+    wrong_way_cost: float = 4.0,
+    via_cost: float = 8.0,
+    margin: int = 20,
+    grid: RoutingGrid | None = None,
+    obstacles: ObstacleIndex | None = None,
+) -> list[Route]:
+    """Routes ports1[i] to ports2[i] in component around its shapes and returns the routes.
+
+    Args:
+        component: to add the routes to.
+        ports1: first port of each net, on a routing layer.
+        ports2: second port of each net, on a routing layer.
+        layers: to route on. Defaults to :func:`routing_layers`.
+        pitch: between grid points in um, see :func:`routing_grid`.
+        via: returns a via stack for bottom_layer and top_layer metal names.
+            Defaults to ``via_stack`` with via arrays sized for the wires.
+        wrong_way_cost: of a step against the preferred direction, a step along it costs 1.
+        via_cost: of a change of layer.
+        margin: grid points around the ports searched first and around component.
+        grid: to route on instead of one from the shapes of component.
+            Its occupancy is updated with the routes.
+        obstacles: index of component to block the grid with instead of its
+            shapes, see :class:`ObstacleIndex`. The routes are added to it.
+    """
+    if grid is None:
+        grid = _grid(component, [*ports1, *ports2], layers, pitch, margin, obstacles)
+    via = _via_stack(grid.layers) if via is None else via
+    (nets,) = _reserve(grid, [(ports1, ports2)])
+    paths = _route_nets(
+        grid.occupancy, nets, _costs(grid, wrong_way_cost), via_cost, margin
+    )
+    for i, (net, _, _) in enumerate(nets):
+        if paths[net] is None:
+            raise ValueError(f"no path from {ports1[i].name} to {ports2[i].name}")
+    return [
+        _draw(component, grid, paths[net], port1, port2, via, obstacles)
+        for (net, _, _), port1, port2 in zip(nets, ports1, ports2)
+    ]
+
+
+def _window(
+    shape: tuple[int, int, int],
+    nets: Sequence[tuple[int, tuple[int, int, int], tuple[int, int, int]]],
+    margin: int,
+) -> tuple[int, int, int, int]:
+    """Returns rows r0:r1 and columns c0:c1 of the bounding box of the pins of nets grown by margin."""
+    rows = [point[1] for _, source, target in nets for point in (source, target)]
+    columns = [point[2] for _, source, target in nets for point in (source, target)]
+    _, ny, nx = shape
+    return (
+        max(min(rows) - margin, 0),
+        min(max(rows) + margin + 1, ny),
+        max(min(columns) - margin, 0),
+        min(max(columns) + margin + 1, nx),
+    )
+
+
+def _route_window(task: tuple) -> dict[int, list[tuple[int, int, int]] | None]:
+    """Routes the nets of one bundle in a window of the occupancy, for a worker process."""
+    occupancy, (r0, _, c0, _), nets, costs, via_cost, margin = task
+    local = [
+        (net, (s[0], s[1] - r0, s[2] - c0), (t[0], t[1] - r0, t[2] - c0))
+        for net, s, t in nets
+    ]
+    paths = _route_nets(occupancy, local, costs, via_cost, margin)
+    return {
+        net: None
+        if path is None
+        else [(layer, row + r0, column + c0) for layer, row, column in path]
+        for net, path in paths.items()
+    }
+
+
+def route_bundles_maze(
+    component: gf.Component,
+    bundles: Sequence[tuple[Sequence[gf.Port], Sequence[gf.Port]]],
+    layers: Sequence[RoutingLayer] | None = None,
+    pitch: float | None = None,
+    via: Callable[..., gf.Component] | None = None,
+    wrong_way_cost: float = 4.0,
+    via_cost: float = 8.0,
+    margin: int = 20,
+    processes: int | None = None,
+    obstacles: ObstacleIndex | None = None,
+) -> list[list[Route]]:
+    """Routes bundles of (ports1, ports2) in component on several processes and returns their routes.
+
+    A bundle routes in the window of its pins grown by margin. First every
+    bundle is routed in a worker on the same grid, then the paths are
+    committed in bundle order. A bundle whose paths overlap the bounding box
+    of paths committed before is checked point by point, and if it crosses
+    them it is routed again. Conflicting bundles with disjoint windows are
+    routed again together on the grid with all committed paths, in rounds
+    until none is left. A bundle with no path in its window is routed last
+    on the whole grid. The routes are the same for any number of processes.
+
+    Args:
+        component: to add the routes to.
+        bundles: (ports1, ports2) of each bundle, see :func:`route_bundle_maze`.
+        layers: to route on. Defaults to :func:`routing_layers`.
+        pitch: between grid points in um, see :func:`routing_grid`.
+        via: returns a via stack for bottom_layer and top_layer metal names.
+            Defaults to ``via_stack`` with via arrays sized for the wires.
+        wrong_way_cost: of a step against the preferred direction, a step along it costs 1.
+        via_cost: of a change of layer.
+        margin: grid points around the pins of a bundle and around component.
+        processes: worker processes. Defaults to the CPU count, 1 routes in this process.
+        obstacles: index of component to block the grid with instead of its
+            shapes, see :class:`ObstacleIndex`. The routes are added to it.
+    """
+    ports = [port for ports1, ports2 in bundles for port in (*ports1, *ports2)]
+    grid = _grid(component, ports, layers, pitch, margin, obstacles)
+    via = _via_stack(grid.layers) if via is None else via
+    nets = _reserve(grid, bundles)
+    costs = _costs(grid, wrong_way_cost)
+    windows = [_window(grid.occupancy.shape, bundle, margin) for bundle in nets]
+    processes = processes or os.cpu_count() or 1
+
+    def overlap(a: Sequence[int], b: Sequence[int]) -> bool:
+        return a[0] < b[1] and b[0] < a[1] and a[2] < b[3] and b[2] < a[3]
+
+    with contextlib.ExitStack() as stack:
+        pool = (
+            stack.enter_context(concurrent.futures.ProcessPoolExecutor(processes))
+            if processes > 1
+            else None
+        )
+
+        def route(
+            indexes: Sequence[int],
+        ) -> list[dict[int, list[tuple[int, int, int]] | None]]:
+            tasks = [
+                (
+                    grid.occupancy[:, r0:r1, c0:c1].copy(),
+                    (r0, r1, c0, c1),
+                    nets[b],
+                    costs,
+                    via_cost,
+                    margin,
+                )
+                for b in indexes
+                for r0, r1, c0, c1 in [windows[b]]
+            ]
+            return (
+                list(pool.map(_route_window, tasks))
+                if pool
+                else [_route_window(task) for task in tasks]
+            )
+
+        paths: dict[int, list[tuple[int, int, int]] | None] = {}
+        committed: list[
+            tuple[int, int, int, int]
+        ] = []  # bounding boxes of committed paths
+        conflicts, failed = [], []
+        for b, result in enumerate(route(range(len(nets)))):
+            if any(path is None for path in result.values()):
+                failed.append(b)
+                continue
+            points = np.concatenate([np.array(path) for path in result.values()])
+            owner = np.repeat(list(result), [len(path) for path in result.values()])
+            (r0, c0), (r1, c1) = points[:, 1:].min(0), points[:, 1:].max(0) + 1
+            if any(overlap((r0, r1, c0, c1), box) for box in committed):
+                taken = grid.occupancy[tuple(points.T)]
+                if ((taken != FREE) & (taken != owner)).any():
+                    conflicts.append(b)
+                    continue
+            grid.occupancy[tuple(points.T)] = owner
+            committed.append((r0, r1, c0, c1))
+            paths.update(result)
+
+        while conflicts:
+            batch: list[int] = []
+            for b in conflicts:
+                if not any(overlap(windows[b], windows[a]) for a in batch):
+                    batch.append(b)
+            conflicts = [b for b in conflicts if b not in batch]
+            for b, result in zip(batch, route(batch)):
+                if any(path is None for path in result.values()):
+                    failed.append(b)
+                    continue
+                for net, path in result.items():
+                    grid.occupancy[tuple(np.array(path).T)] = net
+                paths.update(result)
+
+    for b in sorted(failed):
+        paths.update(_route_nets(grid.occupancy, nets[b], costs, via_cost, margin))
+        for i, (net, _, _) in enumerate(nets[b]):
+            if paths[net] is None:
+                raise ValueError(
+                    f"no path from {bundles[b][0][i].name} to {bundles[b][1][i].name}"
+                )
+
+    return [
+        [
+            _draw(component, grid, paths[net], port1, port2, via, obstacles)
+            for (net, _, _), port1, port2 in zip(bundle, *ports)
+        ]
+        for bundle, ports in zip(nets, bundles)
+    ]
+
+
+def route_bundle_current(
+    component: gf.Component,
+    ports1: Sequence[gf.Port],
+    ports2: Sequence[gf.Port],
+    currents: np.ndarray | Sequence[float],
+    metals: Sequence[str] = ("Metal2", "Metal3", "Metal4", "Metal5"),
+    max_width: float | None = None,
+    tech=None,
+    obstacles: ObstacleIndex | None = None,
+    **kwargs: Any,
+) -> list[Route]:
+    """Routes ports1[i] to ports2[i] with wires wide enough for currents[i] and returns the routes.
+
+    The layers and widths of all nets come from :func:`current_layers` in
+    one pass. Nets with the same layers route together with
+    :func:`route_bundle_maze`, the group with the widest wires first. All
+    groups share one :class:`ObstacleIndex`, so each sees the routes before it.
+
+    Args:
+        component: to add the routes to.
+        ports1: first port of each net, on one of metals.
+        ports2: second port of each net, on one of metals.
+        currents: of the nets in mA.
+        metals: to route on.
+        max_width: widest wire in um, a metal that needs a wider one is not used for the net.
+        tech: with the widths, spacings and current limits. Defaults to ``TECH``.
+        obstacles: index of component. Defaults to one of all its shapes.
+        kwargs: for :func:`route_bundle_maze`.
+    """
+    if not len(ports1) == len(ports2) == len(currents):
+        raise ValueError(
+            f"{len(ports1)} ports1, {len(ports2)} ports2 and {len(currents)} currents"
+        )
+    layers = current_layers(currents, metals, max_width, tech)
+    for port1, port2, options, current in zip(ports1, ports2, layers, currents):
+        if not options:
+            raise ValueError(
+                f"no metal carries {current} mA from {port1.name} within {max_width} um"
+            )
+        for port in (port1, port2):
+            metal = _metal(port)
+            if metal not in metals:
+                raise ValueError(f"port {port.name} is on {metal}, not one of {metals}")
+            if metal not in {layer.metal for layer in options}:
+                raise ValueError(
+                    f"port {port.name} is on {metal}, which needs wires wider "
+                    f"than {max_width} um for {current} mA"
+                )
+    obstacles = (
+        ObstacleIndex.from_component(component) if obstacles is None else obstacles
+    )
+
+    via = kwargs.pop("via", None)
+    groups: dict[tuple[RoutingLayer, ...], list[int]] = {}
+    for i, options in enumerate(layers):
+        groups.setdefault(options, []).append(i)
+    routes: dict[int, Route] = {}
+    for options, nets in sorted(
+        groups.items(), key=lambda item: -max(layer.width for layer in item[0])
+    ):
+        group = route_bundle_maze(
+            component,
+            [ports1[i] for i in nets],
+            [ports2[i] for i in nets],
+            layers=options,
+            via=_via_stack(options, tech) if via is None else via,
+            obstacles=obstacles,
+            **kwargs,
+        )
+        routes.update(zip(nets, group))
+    return [routes[i] for i in range(len(layers))]
+
+
+def route_bundle(
+    component: gf.Component,
+    ports1: Sequence[gf.Port],
+    ports2: Sequence[gf.Port],
+    obstacles: ObstacleIndex | None = None,
+    **kwargs: Any,
+) -> list[ManhattanRoute]:
+    """Returns ``gf.routing.route_bundle`` around the obstacles at the ports.
+
+    The boxes of obstacles that hold a port are passed as ``bboxes``, and the
+    instances of the routes are added to obstacles.
+
+    Args:
+        component: to add the routes to.
+        ports1: start ports.
+        ports2: end ports.
+        obstacles: index of component, see :class:`ObstacleIndex`.
+        kwargs: for ``gf.routing.route_bundle``.
+    """
+    if obstacles is not None:
+        kwargs["bboxes"] = [
+            *(kwargs.get("bboxes") or []),
+            *obstacles.at_ports([*ports1, *ports2]),
+        ]
+    routes = gf.routing.route_bundle(component, ports1, ports2, **kwargs)
+    if obstacles is not None:
+        for route in routes:
+            for instance in route.instances:
+                obstacles.add_instance(instance)
+    return routes
@@ -0,0 +1,146 @@
+"""Pre-parsed snapshots of the IHP technology files.
+
+``sg13g2_tech.json`` (``techParams``) and ``layers.lyp`` (``LAYER_VIEWS``) are
+each parsed once and pickled together with the mtime, size and sha256 of their
+source. Later interpreters load the pickles instead of parsing the sources. A
+source whose mtime or size changed is hashed, and its snapshot is rebuilt when
+the hash differs too.
+
+The two snapshots are separate files, so ``import ihp.tech`` only loads
+``techParams`` and ``LAYER_VIEWS`` is unpickled on first access. They live in
+``PATH.snapshots`` under the user cache, never in the package directory. Call
+:func:`refresh` after updating the PDK under ``/foss/pdks/ihp-sg13g2``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import pickle
+import tempfile
+import threading
+from typing import Any
+
+from ihp.config import PATH
+
+__all__ = ["layer_views", "refresh", "tech_params"]
+
+version = 2
+names = ("tech_params", "layer_views")
+_lock = threading.Lock()
+_snapshots: dict[str, dict[str, Any]] = {}
+
+
+def _source(name: str) -> pathlib.Path:
+    return {"tech_params": PATH.tech_json, "layer_views": PATH.lyp}[name]
+
+
+def _path(name: str) -> pathlib.Path:
+    return PATH.snapshots / f"{name}.pickle"
+
+
+def _stamp(path: pathlib.Path, sha256: bool = True) -> dict[str, Any]:
+    st = path.stat()
+    stamp = {"mtime": st.st_mtime, "size": st.st_size}
+    if sha256:
+        stamp["sha256"] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return stamp
+
+
+def _is_valid(name: str, snapshot: dict[str, Any]) -> bool:
+    """Returns True if the source of snapshot still matches its stamp."""
+    import gdsfactory as gf
+
+    if snapshot.get("version") != (version, gf.__version__):
+        return False
+    stamp = snapshot.get("source")
+    if stamp is None:
+        return False
+    path = _source(name)
+    if not path.exists():
+        return True  # PDK not installed, trust the snapshot
+    current = _stamp(path, sha256=False)
+    if current == {k: stamp[k] for k in current}:
+        return True
+    return _stamp(path)["sha256"] == stamp["sha256"]
+
+
+def _parse(name: str) -> dict[str, Any]:
+    import gdsfactory as gf
+
+    path = _source(name)
+    if name == "tech_params":
+        value = json.loads(path.read_text())["techParams"]
+    else:
+        value = gf.technology.LayerViews(path)
+    return {
+        "version": (version, gf.__version__),
+        "source": _stamp(path),
+        "value": value,
+    }
+
+
+def _read(name: str) -> dict[str, Any] | None:
+    try:
+        with _path(name).open("rb") as f:
+            snapshot = pickle.load(f)
+        return snapshot if _is_valid(name, snapshot) else None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def _write(name: str, snapshot: dict[str, Any]) -> pathlib.Path | None:
+    """Writes snapshot to the user cache, returns None if that is not writable."""
+    path = _path(name)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return path
+    except OSError:
+        pathlib.Path(tmp).unlink(missing_ok=True)
+        return None
+
+
+def _load(name: str) -> Any:
+    with _lock:
+        snapshot = _snapshots.get(name)
+        if snapshot is None:
+            snapshot = _read(name)
+            if snapshot is None:
+                snapshot = _parse(name)
+                _write(name, snapshot)
+            _snapshots[name] = snapshot
+        return snapshot["value"]
+
+
+def refresh() -> pathlib.Path | None:
+    """Parses the technology files again and rewrites the snapshots.
+
+    Returns the snapshot directory, None if it was not writable.
+    """
+    written = True
+    with _lock:
+        for name in names:
+            _snapshots[name] = _parse(name)
+            written = _write(name, _snapshots[name]) is not None and written
+    return PATH.snapshots if written else None
+
+
+def tech_params() -> dict[str, Any]:
+    """Returns the ``techParams`` of ``sg13g2_tech.json``."""
+    return _load("tech_params")
+
+
+def layer_views() -> Any:
+    """Returns the ``LayerViews`` of ``layers.lyp``."""
+    return _load("layer_views")
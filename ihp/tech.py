@@ -5,16 +5,15 @@
 - Cross-sections for routing
 - Technology parameters
 """
-import os
-import json
-
 
 import sys
+from collections.abc import Callable
 from functools import partial
 from typing import Any
 
 import gdsfactory as gf
-#from doroutes.bundles import add_bundle_astar
+
+# from doroutes.bundles import add_bundle_astar
 from gdsfactory import typings
 from gdsfactory.component import Component
 from gdsfactory.cross_section import (
@@ -24,22 +23,21 @@ from gdsfactory.cross_section import (
     port_types_electrical,
     xsection,
 )
-from gdsfactory.technology import LayerLevel, LayerMap, LayerStack
-from gdsfactory.typings import Layer, LayerSpec
+from gdsfactory.technology import LayerLevel, LayerStack
+from gdsfactory.typings import LayerSpec
 from pydantic import BaseModel
-from gdsfactory.technology import lyp_to_dataclass
-from ihp.config import PATH
+
+from ihp import snapshot
+from ihp.build import check_layer_map
+
+# generated from sg13g2.lyp by `python -m ihp.build`
+from ihp.layer_map_ihp import LAYER
 
 nm = 1e-3
 pin_length = 10 * nm
 heater_width = 4
 
-
-ihp_filepath = "/foss/pdks/ihp-sg13g2/libs.tech/klayout/tech/sg13g2.lyp"
-lyp_to_dataclass(ihp_filepath, overwrite=True, output_filepath="ihp/layer_map_ihp.py", map_name="LayerMapIHP")
-
-# import after generation
-from ihp.layer_map_ihp import LAYER
+check_layer_map()
 
 # Add aliases
 LAYER.TEXT = LAYER.TEXTdrawing
@@ -245,18 +243,13 @@ def get_layer_stack(
         )
     )
 
-techParams: dict = {}
+
+techParams: dict = snapshot.tech_params()
 dataBaseUnits: float = 0.001
 
 techName: str = "sg13g2"
 techNameParam: str = "techName"
-jsonTechFile: str = techName + "_tech.json"
 
-techFilePath: str = os.path.join("/foss/pdks/ihp-sg13g2/libs.tech/klayout/python/sg13g2_pycell_lib/", jsonTechFile) #TODO hardcoded path, böse
-
-with open(techFilePath, "r") as tech_file:
-    jsData = json.load(tech_file)
-    techParams = jsData["techParams"]
 
 class TechIHP(BaseModel):
     """IHP PDK Technology parameters."""
@@ -270,6 +263,12 @@ class TechIHP(BaseModel):
     nmos_min_length: float = 0.13
     pmos_min_width: float = 0.15
     pmos_min_length: float = 0.13
+    gate_extension: float = 0.18  # GatPoly endcap over Activ
+    cont_gate_spacing: float = 0.11
+    gate_active_spacing: float = 0.07  # GatPoly to Activ outside the channel
+    psd_enc_active: float = 0.14
+    nwell_enc_active: float = 0.31
+    thickgateox_enc_active: float = 0.27
 
     # Design rules - contacts and vias
     cont_size: float = 0.16
@@ -281,11 +280,21 @@ class TechIHP(BaseModel):
     via1_size: float = 0.19
     via1_spacing: float = 0.22
     via1_enc_metal: float = 0.05
-    
+    via2_size: float = 0.19
+    via2_spacing: float = 0.22
+    via2_enc_metal: float = 0.05
+    via3_size: float = 0.19
+    via3_spacing: float = 0.22
+    via3_enc_metal: float = 0.05
+    via4_size: float = 0.19
+    via4_spacing: float = 0.22
+    via4_enc_metal: float = 0.05
+
     topvia1_size: float = 0.42
     topvia1_spacing: float = 0.42
     topvia1_enc_metal: float = 0.42
-    
+    topvia1_enc_metal5: float = 0.10
+
     topvia2_size: float = 0.9
     topvia2_spacing: float = 1.05
     topvia2_enc_metal: float = 0.5
@@ -306,6 +315,43 @@ class TechIHP(BaseModel):
     topmetal2_width: float = 2.0
     topmetal2_spacing: float = 2.0
 
+    # Metal parasitics
+    metal1_sheet_res: float = 0.135  # ohms/square
+    metal2_sheet_res: float = 0.103
+    metal3_sheet_res: float = 0.103
+    metal4_sheet_res: float = 0.103
+    metal5_sheet_res: float = 0.103
+    topmetal1_sheet_res: float = 0.021
+    topmetal2_sheet_res: float = 0.0145
+    dielectric_eps: float = 4.1  # relative permittivity of the back-end oxide
+
+    # Electromigration - DC current limits per um of wire width
+    metal1_jmax: float = 1.0  # mA/um
+    metal2_jmax: float = 2.0
+    metal3_jmax: float = 2.0
+    metal4_jmax: float = 2.0
+    metal5_jmax: float = 2.0
+    topmetal1_jmax: float = 15.0
+    topmetal2_jmax: float = 16.0
+    via1_jmax: float = 0.4  # mA per via
+    via2_jmax: float = 0.4
+    via3_jmax: float = 0.4
+    via4_jmax: float = 0.4
+    topvia1_jmax: float = 2.0
+    topvia2_jmax: float = 8.0
+
+    # Design rules - metal density and fill (filler tiles are squares)
+    metal_density_window: float = 800.0
+    metal_density_step: float = 400.0
+    metal_min_density: float = 0.35
+    metal_max_density: float = 0.60
+    metal_fill_size: float = 5.0  # Metal1..Metal5
+    metal_fill_spacing: float = 2.0
+    metal_fill_clearance: float = 1.0  # to drawn metal and nofill areas
+    topmetal_fill_size: float = 10.0  # TopMetal1, TopMetal2
+    topmetal_fill_spacing: float = 4.0
+    topmetal_fill_clearance: float = 3.0
+
     # Design rules - resistors
     rsil_min_width: float = 0.4
     rsil_min_length: float = 0.8
@@ -330,9 +376,18 @@ class TechIHP(BaseModel):
 
     techParams: dict = techParams
 
+
 TECH = TechIHP()
 LAYER_STACK = get_layer_stack()
-LAYER_VIEWS = gf.technology.LayerViews(PATH.lyp)
+
+
+def __getattr__(name: str) -> Any:
+    """Loads LAYER_VIEWS from the tech snapshot on first access (PEP 562)."""
+    global LAYER_VIEWS
+    if name == "LAYER_VIEWS":
+        LAYER_VIEWS = snapshot.layer_views()
+        return LAYER_VIEWS
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 ############################
@@ -435,11 +490,26 @@ cross_sections = get_cross_sections(sys.modules[__name__])
 # Routing functions
 ############################
 
-route_bundle = partial(gf.routing.route_bundle, cross_section="strip")
-route_bundle_rib = partial(
-    route_bundle,
-    cross_section="rib",
-)
+
+def _routing(name: str, index: bool = False) -> Callable[..., Any]:
+    """Returns a function that calls ``ihp.routing.<name>``, importing the router on first use.
+
+    With index, and unless given ``obstacles``, the routes query and update
+    the index kept for the component, see ``ihp.routing.ObstacleIndex.of``.
+    """
+
+    def route(component: gf.Component, *args: Any, **kwargs: Any) -> Any:
+        from ihp import routing
+
+        if index and kwargs.get("obstacles") is None:
+            kwargs["obstacles"] = routing.ObstacleIndex.of(component)
+        return getattr(routing, name)(component, *args, **kwargs)
+
+    route.__name__ = route.__qualname__ = name
+    return route
+
+
+route_bundle = partial(_routing("route_bundle"), cross_section="strip")
 route_bundle_metal = partial(
     route_bundle,
     straight="straight_metal",
@@ -476,11 +546,9 @@ route_bundle_metal_corner = partial(
 # )
 
 
-# routing_strategies = dict(
-#     route_bundle=route_bundle,
-#     route_bundle_rib=route_bundle_rib,
-#     route_bundle_metal=route_bundle_metal,
-#     route_bundle_metal_corner=route_bundle_metal_corner,
-#     route_astar=route_astar,
-#     route_astar_metal=route_astar_metal,
-# )
+routing_strategies = dict(
+    route_bundle=route_bundle,
+    route_bundle_metal=route_bundle_metal,
+    route_bundle_metal_corner=route_bundle_metal_corner,
+    route_bundle_maze=_routing("route_bundle_maze", index=True),
+)
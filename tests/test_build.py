@@ -0,0 +1,48 @@
+"""Generated layer map and its staleness check."""
+
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+from ihp import build, layer_map_ihp
+from ihp.config import PATH
+
+
+def _body(text: str) -> list[str]:
+    return [line for line in text.splitlines() if not line.startswith(("#", "LYP_"))]
+
+
+def test_committed_layer_map_matches_lyp(tmp_path) -> None:
+    output = build.write_layer_map(lyp=PATH.lyp, output=tmp_path / "layer_map_ihp.py")
+    assert _body(output.read_text()) == _body(PATH.layer_map.read_text())
+    assert list(tmp_path.iterdir()) == [output]
+
+
+def test_stale_layer_map_warns(tmp_path) -> None:
+    lyp = tmp_path / "layers.lyp"
+    shutil.copy(PATH.lyp, lyp)
+    assert build.check_layer_map(lyp)
+
+    lyp.write_text(
+        lyp.read_text().replace("</layer-properties>", "\n</layer-properties>")
+    )
+    with pytest.warns(UserWarning, match="python -m ihp.build"):
+        assert not build.check_layer_map(lyp)
+
+
+def test_layer_map_records_its_source() -> None:
+    assert len(layer_map_ihp.LYP_SHA256) == 64
+    assert build._recorded_source() == PATH.lyp
+
+
+def test_check_compares_the_recorded_source(tmp_path, monkeypatch) -> None:
+    # an installed PDK with a different .lyp does not make the committed map stale
+    pdk_lyp = tmp_path / "sg13g2.lyp"
+    pdk_lyp.write_text("<layer-properties/>")
+    monkeypatch.setattr(PATH, "pdk_lyp", pdk_lyp)
+    assert build.check_layer_map()
+
+    monkeypatch.setattr(PATH, "module", tmp_path)
+    assert build.check_layer_map()  # the recorded source is missing
@@ -0,0 +1,139 @@
+"""On-disk cache of PyCell generated devices."""
+
+from __future__ import annotations
+
+import os
+from functools import partial
+
+from kfactory import kdb
+
+from ihp.cells.cache import PyCellCache, cache_key
+
+ports = [
+    dict(
+        name="e1",
+        center=(0.0, 0.0),
+        width=0.16,
+        orientation=180.0,
+        layer=(8, 0),
+        port_type="electrical",
+    )
+]
+
+
+def _cell(size: int = 160) -> kdb.Cell:
+    layout = kdb.Layout()
+    cell = layout.create_cell("nmos")
+    cell.shapes(layout.layer(8, 0)).insert(kdb.Box(0, 0, size, size))
+    return cell
+
+
+def test_cache_key_normalizes_parameters() -> None:
+    assert cache_key(PyCellCache, "nmos", {"w": 0.15 * 1e-6, "ng": 1}) == cache_key(
+        PyCellCache, "nmos", {"ng": 1, "w": 1.5e-7}
+    )
+    assert cache_key(PyCellCache, "nmos", {"w": 1.5e-7}) != cache_key(
+        PyCellCache, "nmos", {"w": 1.6e-7}
+    )
+    assert cache_key(PyCellCache, "nmos", {"w": 1.5e-7}) != cache_key(
+        PyCellCache, "pmos", {"w": 1.5e-7}
+    )
+
+
+def test_cache_key_covers_add_ports() -> None:
+    def add_ports(c) -> None:
+        pass
+
+    def keys(*callbacks) -> set[str]:
+        return {cache_key(PyCellCache, "nmos", {"w": 1.5e-7}, fn) for fn in callbacks}
+
+    assert len(keys(None, add_ports, partial(add_ports), print)) == 4
+    assert len(keys(add_ports, add_ports)) == 1
+    before = keys(add_ports)
+    add_ports.version = 2
+    assert keys(add_ports) != before
+
+
+def test_round_trip_and_stats(tmp_path) -> None:
+    cache = PyCellCache(tmp_path, fingerprint="pdk")
+    assert cache.get("a") is None
+
+    cache.put("a", _cell(), ports)
+    layout, cached_ports = cache.get("a")
+
+    assert layout.top_cell().name == "nmos"
+    assert layout.top_cell().bbox() == kdb.Box(0, 0, 160, 160)
+    assert cached_ports[0]["name"] == "e1"
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.writes, stats.entries) == (1, 1, 1, 1)
+    assert stats.size_bytes > 0
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path) -> None:
+    cache = PyCellCache(tmp_path, fingerprint="pdk")
+    for t, key in enumerate("abc"):
+        cache.put(key, _cell(), ports)
+        for suffix in (".oas", ".json"):
+            os.utime(cache.directory / f"{key}{suffix}", (1000 + t, 1000 + t))
+
+    assert cache.get("a") is not None  # a becomes the most recently used entry
+    entry_size = cache.stats().size_bytes // 3
+
+    assert cache.evict(max_bytes=2 * entry_size) == 1
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_prune_drops_other_pdk_installs(tmp_path) -> None:
+    PyCellCache(tmp_path, fingerprint="old").put("a", _cell(), ports)
+    cache = PyCellCache(tmp_path, fingerprint="new")
+    cache.put("a", _cell(), ports)
+
+    assert cache.prune() == 1
+    assert not (tmp_path / "old").exists()
+    assert cache.get("a") is not None
+
+
+class _NoPyCell:
+    """Stands in for a PyCell class that must not be set up on a cache hit."""
+
+    def __init__(self) -> None:
+        raise AssertionError("the PyCell was set up on a cache hit")
+
+
+def test_hit_has_ports_and_skips_the_pycell(tmp_path) -> None:
+    from ihp.cells.cache import use_cache
+    from ihp.cells.utils import _get_pycell, generate_gf_from_ihp
+
+    cache = PyCellCache(tmp_path, fingerprint="pdk")
+    cache.put(cache_key(_NoPyCell, "nmos", {"w": 1.5e-7}), _cell(), ports)
+    with use_cache(cache):
+        c = generate_gf_from_ihp("nmos", {"w": 1.5e-7}, _NoPyCell)
+
+    assert [p.name for p in c.ports] == ["e1"]
+    assert _get_pycell(_NoPyCell).wrapper is None
+
+
+def test_miss_stores_the_ports_added_by_the_cell(tmp_path, monkeypatch) -> None:
+    from functools import partial
+
+    from ihp.cells import resistors, utils
+    from ihp.cells.cache import use_cache
+
+    def add_ports(c) -> None:
+        c.add_port("e1", center=(0, 0), width=0.16, orientation=180, layer=(8, 0))
+
+    monkeypatch.setattr(
+        resistors,
+        "generate_gf_from_ihp",
+        partial(utils.generate_gf_from_ihp, add_ports=add_ports),
+    )
+    cache = PyCellCache(tmp_path, fingerprint="pdk")
+    with use_cache(cache):
+        miss = resistors.rsil.__wrapped__(length=1.23)
+        hit = resistors.rsil.__wrapped__(length=1.23)
+
+    assert cache.stats().hits == 1
+    assert [p.name for p in hit.ports] == [p.name for p in miss.ports] == ["e1"]
@@ -0,0 +1,217 @@
+"""Fast DRC of the TECH rules."""
+
+from __future__ import annotations
+
+import random
+
+import gdsfactory as gf
+import pytest
+from kfactory import kdb
+from klayout import rdb
+
+from ihp import drc
+
+width = drc.Rule("metal1_width", "width", "Metal1drawing", None, 0.14)
+space = drc.Rule("metal1_spacing", "space", "Metal1drawing", None, 0.14)
+size = drc.Rule("via1_size", "size", "Via1drawing", None, 0.19)
+enclosure = drc.Rule(
+    "via1_enc_metal", "enclosure", "Via1drawing", "Metal1drawing", 0.05
+)
+extension = drc.Rule(
+    "gate_extension", "extension", "GatPolydrawing", "Activdrawing", 0.18
+)
+separation = drc.Rule("cont_gate_spacing", "separation", "Contdrawing", "gate", 0.11)
+rules = [width, space, size, enclosure, extension, separation]
+
+
+def _box(c: gf.Component, layer, x0: float, y0: float, x1: float, y1: float) -> None:
+    c.add_polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], layer=layer)
+
+
+def _via(ok: bool = True) -> gf.Component:
+    c = gf.Component()
+    _box(c, (8, 0), 0, 0, 0.29, 0.3)
+    _box(c, (19, 0), 0.05, 0.05, 0.24, 0.24 if ok else 0.25)  # not square
+    return c
+
+
+@pytest.mark.parametrize(
+    "rule,shapes",
+    [
+        (width, [((8, 0), 0, 0, 0.1, 1)]),
+        (space, [((8, 0), 0, 0, 0.2, 1), ((8, 0), 0.3, 0, 0.5, 1)]),
+        (size, [((8, 0), -0.05, -0.05, 0.24, 0.35), ((19, 0), 0, 0, 0.19, 0.3)]),
+        (enclosure, [((8, 0), 0, 0, 0.25, 0.25), ((19, 0), 0.03, 0.03, 0.22, 0.22)]),
+        (extension, [((1, 0), 0, 0, 1, 1), ((5, 0), 0.4, -0.1, 0.53, 1.18)]),
+        (
+            separation,
+            [
+                ((1, 0), 0, 0, 1, 1),
+                ((5, 0), 0.4, -0.2, 0.53, 1.2),
+                ((6, 0), 0.6, 0.4, 0.76, 0.56),
+            ],
+        ),
+    ],
+)
+def test_rule_violations(rule, shapes) -> None:
+    c = gf.Component()
+    for shape in shapes:
+        _box(c, *shape)
+    assert {v.rule for v in drc.check(c, rules)} == {rule}
+
+
+@pytest.mark.parametrize(
+    "metal",
+    [None, (0.5, 0, 1, 0.19), (0.1, -0.05, 0.3, 0.24)],
+    ids=["no_metal", "outside", "partly_outside"],
+)
+def test_uncovered_via(metal) -> None:
+    c = gf.Component()
+    _box(c, (19, 0), 0, 0, 0.19, 0.19)
+    if metal is not None:
+        _box(c, (8, 0), *metal)
+    violations = drc.check(c, [enclosure])
+
+    markers = kdb.Region([v.marker.to_itype(c.kcl.dbu) for v in violations])
+    via = kdb.Region(kdb.Box(0, 0, 190, 190))
+    uncovered = via - kdb.Region(
+        kdb.Box(*(round(x * 1000) for x in metal or (0, 0, 0, 0)))
+    )
+    assert not uncovered.is_empty()
+    assert (uncovered - markers).is_empty()
+
+
+def test_clean_cell() -> None:
+    assert drc.check(_via(), rules) == []
+
+
+def test_deep_matches_flat() -> None:
+    top = gf.Component()
+    top.add_ref(_via(ok=False), columns=20, rows=10, column_pitch=0.5, row_pitch=0.5)
+    top.add_ref(_via()).dmove((-1, 0))
+
+    deep = drc.check(top, rules, deep=True)
+    flat = drc.check(top, rules, deep=False)
+    assert len(deep) == 200
+    assert sorted(str(v.marker) for v in deep) == sorted(str(v.marker) for v in flat)
+
+
+def test_write_rdb(tmp_path) -> None:
+    violations = drc.check(_via(ok=False), rules)
+    path = drc.write_rdb(violations, tmp_path / "via.lyrdb", "via")
+
+    db = rdb.ReportDatabase("")
+    db.load(str(path))
+    assert db.num_items() == len(violations) == 1
+
+
+def test_tech_rules_cover_tech() -> None:
+    from ihp.tech import TECH
+
+    for rule in drc.tech_rules():
+        assert rule.value == getattr(TECH, rule.name)
+
+
+def _leaf(seed: int, n: int = 30) -> gf.Component:
+    rnd = random.Random(seed)
+    c = gf.Component()
+    for _ in range(n):
+        layer = rnd.choice([(8, 0), (19, 0), (10, 0), (1, 0), (5, 0), (6, 0)])
+        x, y = rnd.randrange(0, 400) / 100, rnd.randrange(0, 400) / 100
+        w, h = (
+            rnd.choice([0.1, 0.16, 0.19, 0.3, 1.0]),
+            rnd.choice([0.1, 0.16, 0.19, 0.3, 1.0]),
+        )
+        _box(c, layer, x, y, x + w, y + h)
+    return c
+
+
+def _top(seed: int, edited: bool = False) -> gf.Component:
+    """Returns arrays, rotated and nested instances that touch each other and the top shapes."""
+    leaves = [
+        _leaf(seed * 10 + i + (100 if edited and i == 0 else 0)) for i in range(3)
+    ]
+    top = gf.Component()
+    top.add_ref(leaves[0], columns=5, rows=5, column_pitch=4.05, row_pitch=4.1)
+    top.add_ref(leaves[1]).dmove((25, 3))
+    top.add_ref(leaves[2]).drotate(90).dmove((30, 0))
+    mid = gf.Component()
+    mid.add_ref(leaves[1])
+    mid.add_ref(leaves[2]).dmove((3.9, 0.05))
+    _box(mid, (8, 0), 3.5, 0, 4.2, 0.1)
+    top.add_ref(mid, columns=3, column_pitch=8).dmove((0, -10))
+    _box(top, (8, 0), 3.9, 0, 4.3, 20)
+    return top
+
+
+def _key(violations: list[drc.Violation]) -> list[tuple]:
+    return sorted(
+        (v.rule.name, v.rule.layer, v.rule.other or "", str(v.marker))
+        for v in violations
+    )
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_matches_full_check(seed) -> None:
+    cache = drc.DrcCache(rules)
+    top = _top(seed)
+    assert _key(cache.check(top)) == _key(drc.check(top, rules, deep=False))
+
+    edited = _top(seed, edited=True)
+    assert _key(cache.check(edited)) == _key(drc.check(edited, rules, deep=False))
+
+
+def test_incremental_checks_changed_cells_only() -> None:
+    cache = drc.DrcCache(rules)
+    cache.check(_top(0))
+    misses = cache.misses
+
+    cache.check(_top(0))
+    assert cache.misses == misses  # same geometry, new cells
+
+    cache.check(_top(0, edited=True))
+    assert cache.misses == misses + 3  # the edited leaf, its array and the top
+
+
+def test_incremental_leaves_the_layout_alone() -> None:
+    top = _top(0)
+    layout = top.kdb_cell.layout()
+    cells = layout.cells()
+    drc.DrcCache(rules).check(top)
+    assert layout.cells() == cells
+    assert not any(cell.name.startswith("$drc") for cell in layout.each_cell())
+
+
+def test_incremental_cache_is_capped() -> None:
+    cache = drc.DrcCache(rules, max_entries=4)
+    for seed in range(3):
+        cache.check(_top(seed))
+    assert len(cache._results) == 4
+
+    misses = cache.misses
+    cache.check(_top(2))  # most recent, still cached
+    assert cache.misses == misses
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_tiled_matches_full_check(processes) -> None:
+    top = gf.Component()
+    top.add_ref(_top(0), columns=3, rows=2, column_pitch=35.05, row_pitch=40)
+    for x in range(0, 60, 2):  # a narrow wire of many boxes, longer than a tile
+        _box(top, (8, 0), x, -15, x + 2.5, -14.9)
+    expected = _key(drc.check(top, rules, deep=False))
+    assert (
+        _key(drc.check_tiled(top, rules, tile_size=7.3, processes=processes))
+        == expected
+    )
+
+
+def test_tiles_cover_bbox() -> None:
+    from kfactory import kdb
+
+    bbox = kdb.Box(-10, -5, 90, 40)
+    covered = kdb.Region()
+    for tile in drc.tiled.tiles(bbox, 25):
+        covered.insert(tile)
+    assert (kdb.Region(bbox) - covered).is_empty()
+    assert covered.bbox().right > bbox.right and covered.bbox().top > bbox.top
@@ -0,0 +1,143 @@
+"""Net extraction with union-find."""
+
+from __future__ import annotations
+
+import gdsfactory as gf
+import numpy as np
+import pytest
+from kfactory import kdb
+
+from ihp import extract
+
+connectivity = [
+    ("Metal1drawing", "Via1drawing", "Metal2drawing"),
+    ("Metal2drawing", "Via2drawing", "Metal3drawing"),
+]
+layers = {
+    "Metal1drawing": (8, 0),
+    "Via1drawing": (19, 0),
+    "Metal2drawing": (10, 0),
+    "Via2drawing": (29, 0),
+    "Metal3drawing": (30, 0),
+}
+
+
+def _box(c: gf.Component, layer, x0: float, y0: float, x1: float, y1: float) -> None:
+    c.add_polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], layer=layer)
+
+
+def _random(seed: int, n: int = 400) -> gf.Component:
+    rng = np.random.default_rng(seed)
+    c = gf.Component()
+    for layer in layers.values():
+        for x, y, w, h in zip(
+            *rng.uniform(0, 100, (2, n)), *rng.uniform(0.2, 6, (2, n))
+        ):
+            if rng.random() < 0.2:  # an L shape, not a box
+                c.add_polygon(
+                    [
+                        (x, y),
+                        (x + w, y),
+                        (x + w, y + 0.3),
+                        (x + 0.3, y + 0.3),
+                        (x + 0.3, y + h),
+                        (x, y + h),
+                    ],
+                    layer=layer,
+                )
+            else:
+                _box(c, layer, x, y, x + w, y + h)
+    return c
+
+
+def _klayout_nets(c: gf.Component, nets: extract.Extraction) -> list:
+    """Returns the KLayout net of a point inside each polygon of nets."""
+    layout = c.kcl.layout
+    l2n = kdb.LayoutToNetlist(kdb.RecursiveShapeIterator(layout, c.kdb_cell, []))
+    regions = {
+        name: l2n.make_layer(layout.layer(*layer), name)
+        for name, layer in layers.items()
+    }
+    for region in regions.values():
+        l2n.connect(region)
+    for bottom, via, top in connectivity:
+        l2n.connect(regions[bottom], regions[via])
+        l2n.connect(regions[via], regions[top])
+    l2n.extract_netlist()
+
+    probes = []
+    for polygon, layer in zip(nets.polygons, nets.layer):
+        inside = polygon.decompose_trapezoids()[0].bbox().center()
+        net = l2n.probe_net(regions[nets.layers[layer]], inside)
+        probes.append(net.cluster_id)
+    return probes
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_nets_match_klayout(seed) -> None:
+    c = _random(seed)
+    nets = extract.extract(c, connectivity)
+    probes = _klayout_nets(c, nets)
+    pairs = set(zip(nets.net.tolist(), probes))
+    assert len(pairs) == nets.num_nets == len(set(probes))  # the same partition
+
+
+def test_labels_name_nets() -> None:
+    c = gf.Component()
+    _box(c, (8, 0), 0, 0, 10, 1)
+    _box(c, (8, 0), 20, 0, 30, 1)
+    _box(c, (19, 0), 9, 0.2, 9.5, 0.7)
+    _box(c, (19, 0), 20.2, 0.2, 20.7, 0.7)
+    _box(c, (10, 0), 8, 0, 22, 1)  # bridges both Metal1 wires
+    _box(c, (8, 0), 40, 0, 50, 1)
+    c.add_label("A", position=(1, 0.5), layer=(8, 25))
+    c.add_label("B", position=(29, 0.5), layer=(8, 2))
+    c.add_label("C", position=(45, 0.5), layer=(8, 0))
+    c.add_label("D", position=(60, 0.5), layer=(8, 25))  # on no shape
+
+    nets = extract.extract(c, connectivity)
+    assert nets.num_nets == 2
+    assert nets.pin_nets("A") == nets.pin_nets("B") != nets.pin_nets("C")
+    assert nets.pin_nets("D") == []
+    assert sorted(nets.netlist().values()) == [["A", "B"], ["C"]]
+    shapes = nets.shapes(nets.pin_nets("A")[0])
+    assert {name: len(polygons) for name, polygons in shapes.items()} == {
+        "Metal1drawing": 2,
+        "Via1drawing": 2,
+        "Metal2drawing": 1,
+    }
+    assert len(nets.nets()) == 2
+
+
+def test_overlaps_match_brute_force() -> None:
+    rng = np.random.default_rng(0)
+
+    def boxes(n: int, size: float) -> np.ndarray:
+        xy = rng.integers(0, 10_000, (n, 2))
+        wh = rng.integers(0, size, (n, 2))
+        wh[:3] = 5000  # a few large ones
+        return np.concatenate([xy, xy + wh], axis=1)
+
+    a, b = boxes(500, 100), boxes(700, 300)
+    ia, ib = extract._overlaps(a, b)
+    found = sorted(zip(ia.tolist(), ib.tolist()))
+    expected = [
+        (i, j)
+        for i in range(len(a))
+        for j in range(len(b))
+        if a[i, 0] <= b[j, 2]
+        and b[j, 0] <= a[i, 2]
+        and a[i, 1] <= b[j, 3]
+        and b[j, 1] <= a[i, 3]
+    ]
+    assert found == expected
+
+
+def test_union_find() -> None:
+    u = np.array([0, 2, 5, 6, 3])
+    v = np.array([1, 3, 4, 5, 1])
+    net = extract._union_find(8, u, v)
+    assert len(set(net.tolist())) == 3
+    assert net[0] == net[1] == net[2] == net[3]
+    assert net[4] == net[5] == net[6] != net[0]
+    assert net[7] not in net[:7]
@@ -0,0 +1,101 @@
+"""Metal density maps and fill."""
+
+from __future__ import annotations
+
+import gdsfactory as gf
+import numpy as np
+import pytest
+from kfactory import kdb
+
+from ihp import fill
+
+m1 = fill.FillRule("Metal1", 5.0, 2.0, 1.0)
+tm2 = fill.FillRule("TopMetal2", 10.0, 4.0, 3.0)
+
+
+def _box(c: gf.Component, layer, x0: float, y0: float, x1: float, y1: float) -> None:
+    c.add_polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], layer=layer)
+
+
+def _chip(seed: int = 0, size: float = 400.0) -> gf.Component:
+    rng = np.random.default_rng(seed)
+    c = gf.Component()
+    _box(c, (189, 0), 0, 0, size, size)  # boundary
+    for x, y, w, h in zip(
+        *rng.uniform(0, size, (2, 200)), *rng.uniform(0.2, 30, (2, 200))
+    ):
+        _box(c, (8, 0), x, y, min(x + w, size), min(y + h, size))
+    _box(c, (8, 23), 50, 50, 150, 120)  # Metal1nofill
+    _box(c, (160, 0), 300, 0, 320, 400)  # NoMetFiller
+    return c
+
+
+def _flat(c: gf.Component, layer) -> kdb.Region:
+    return kdb.Region(c.kdb_cell.begin_shapes_rec(c.kcl.layout.layer(*layer)))
+
+
+def test_density_map_matches_window_areas() -> None:
+    c = _chip()
+    m = fill.density_map(c, "Metal1drawing", window=100, step=50)
+    assert m.density.shape == (7, 7)
+    metal = _flat(c, (8, 0)).merged()
+    dbu = c.kcl.dbu
+    for (j, i), density in np.ndenumerate(m.density):
+        window = kdb.DBox(i * 50, j * 50, i * 50 + 100, j * 50 + 100).to_itype(dbu)
+        assert density == pytest.approx(
+            (metal & kdb.Region(window)).area() / window.area()
+        )
+
+
+def test_density_map_rejects_step_that_does_not_divide_window() -> None:
+    with pytest.raises(ValueError, match="multiple"):
+        fill.density_map(_chip(), "Metal1drawing", window=100, step=30)
+
+
+def test_fill_keeps_clearance_and_nofill() -> None:
+    c = _chip()
+    filled = fill.add_fill(c, [m1, tm2])
+    tiles = _flat(filled, (8, 22))
+    assert tiles.count() > 1000
+
+    dbu = c.kcl.dbu
+    clearance = round(m1.clearance / dbu)
+    blocked = _flat(c, (8, 0)) + _flat(c, (8, 23)) + _flat(c, (160, 0))
+    assert tiles.separation_check(blocked, clearance).is_empty()
+    assert (tiles & blocked).is_empty()
+    assert tiles.space_check(round(m1.spacing / dbu)).is_empty()
+    assert (tiles - kdb.Region(c.kdb_cell.bbox())).is_empty()
+    assert _flat(filled, (134, 22)).count() > 0  # empty TopMetal2 is filled too
+
+
+def test_fill_places_arrays_of_one_tile() -> None:
+    c = _chip()
+    filled = fill.add_fill(c, [m1])
+    insts = [
+        inst
+        for inst in filled.kdb_cell.each_inst()
+        if inst.cell_index != c.kdb_cell.cell_index()
+    ]
+    assert {inst.cell.name for inst in insts} == {
+        fill.fill_tile("Metal1filler", 5.0).name
+    }
+    assert len(insts) < _flat(filled, (8, 22)).count() / 5
+
+
+def test_fill_raises_density() -> None:
+    c = _chip()
+    before = fill.density_map(c, "Metal1drawing", window=100, step=50).density
+    after = fill.density_map(
+        fill.add_fill(c, [m1]), "Metal1drawing", window=100, step=50
+    ).density
+    assert (after >= before).all()
+    assert after.mean() > before.mean() + 0.2
+
+
+def test_rectangles_cover_free_sites() -> None:
+    free = np.random.default_rng(1).random((40, 60)) < 0.8
+    covered = np.zeros_like(free)
+    for i, j, columns, rows in fill._rectangles(free):
+        assert not covered[j : j + rows, i : i + columns].any()
+        covered[j : j + rows, i : i + columns] = True
+    assert (covered == free).all()
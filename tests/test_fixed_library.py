@@ -0,0 +1,108 @@
+"""Shared loading of the fixed GDS cells."""
+
+from __future__ import annotations
+
+import shutil
+import warnings
+
+import gdsfactory as gf
+import pytest
+from kfactory import kdb
+
+from ihp.cells.fixed import _scan_ports
+from ihp.cells.fixed_library import FixedLibrary, content_hashes, ports_data
+from ihp.config import PATH
+
+
+def _regions(c: gf.Component) -> dict[tuple[int, int], kdb.Region]:
+    layout = c.kdb_cell.layout()
+    return {
+        (layout.get_info(i).layer, layout.get_info(i).datatype): kdb.Region(
+            c.kdb_cell.begin_shapes_rec(i)
+        )
+        for i in layout.layer_indexes()
+        if not c.kdb_cell.bbox(i).empty()
+    }
+
+
+@pytest.mark.parametrize(
+    "name", ["npn13G2", "colors_and_stipples", "sealring_complete", "inductor2"]
+)
+def test_component_matches_import_gds(name) -> None:
+    library = FixedLibrary()
+    c = library.component(name)
+    ref = gf.import_gds(library.paths()[name])
+
+    regions, ref_regions = _regions(c), _regions(ref)
+    assert regions.keys() == ref_regions.keys()
+    for layer, region in regions.items():
+        assert (region ^ ref_regions[layer]).is_empty(), layer
+
+
+def test_sub_cells_are_loaded_once() -> None:
+    library = FixedLibrary()
+    first = library.component("colors_and_stipples")
+    loaded = library.loaded_cells()
+    cells = gf.kcl.layout.cells()
+
+    second = library.component("colors_and_stipples")
+    assert library.loaded_cells() == loaded == first.kdb_cell.child_cells()
+    assert gf.kcl.layout.cells() == cells + 1  # only the new top cell
+    assert set(first.kdb_cell.each_child_cell()) == set(
+        second.kdb_cell.each_child_cell()
+    )
+
+
+def test_content_hash_ignores_cell_names() -> None:
+    def layout(name: str) -> kdb.Layout:
+        layout = kdb.Layout()
+        top = layout.create_cell("top")
+        via = layout.create_cell(name)
+        via.shapes(layout.layer(19, 0)).insert(kdb.Box(0, 0, 190, 190))
+        top.insert(
+            kdb.CellInstArray(
+                via.cell_index(),
+                kdb.Trans(),
+                kdb.Vector(410, 0),
+                kdb.Vector(0, 410),
+                2,
+                2,
+            )
+        )
+        return layout
+
+    a, b = layout("Via1_a"), layout("Via1_b")
+    assert set(content_hashes(a).values()) == set(content_hashes(b).values())
+
+
+def test_index_reads_every_file() -> None:
+    library = FixedLibrary()
+    assert library.index().keys() == library.paths().keys()
+
+
+def _scanned(library: FixedLibrary, name: str) -> list:
+    c = library.component(name)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        _scan_ports(c)
+    return ports_data(c)
+
+
+@pytest.mark.parametrize("name", ["SVaricap", "diffstbprobe", "iprobe"])
+def test_sidecar_matches_scan(name) -> None:
+    library = FixedLibrary()
+    ports = library.ports(name)
+    assert ports is not None, "run `python -m ihp.build`"
+    assert ports == _scanned(library, name)
+
+
+def test_sidecar_is_ignored_when_gds_changes(tmp_path) -> None:
+    shutil.copy(PATH.gds / "iprobe.gds", tmp_path)
+    library = FixedLibrary(tmp_path)
+    library.write_ports(_scan_ports)
+    assert FixedLibrary(tmp_path).ports("iprobe") == _scanned(library, "iprobe")
+
+    c = library.component("iprobe")
+    c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(8, 0))
+    c.write_gds(tmp_path / "iprobe.gds")
+    assert FixedLibrary(tmp_path).ports("iprobe") is None
@@ -0,0 +1,74 @@
+"""Lazy loading of the cells, the tech objects and the PDK."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import time
+
+from gdsfactory.get_factories import get_cells
+
+import ihp.cells
+
+heavy = ("cni", "pya", "sg13g2_pycell_lib", "gplugins", "ihp.cells.", "ihp.routing")
+
+
+def _run(code: str) -> tuple[float, str]:
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout
+    return time.perf_counter() - t0, out
+
+
+def _loaded(code: str) -> dict:
+    """Returns which heavy modules are loaded after code runs in a fresh interpreter."""
+    _, out = _run(
+        f"import sys, json\n{code}\n"
+        f"print(json.dumps(sorted(m for m in sys.modules if m.startswith({heavy!r}))))"
+    )
+    return json.loads(out.splitlines()[-1])
+
+
+def test_layer_does_not_load_cells() -> None:
+    assert (
+        _loaded(
+            "from ihp import LAYER; import ihp.tech as t; assert 'LAYER_VIEWS' not in vars(t)"
+        )
+        == []
+    )
+
+
+def test_pdk_resolves_cells_on_first_use() -> None:
+    assert _loaded("from ihp import PDK; assert callable(PDK.cells['nmos'])") == []
+    loaded = _loaded("from ihp import PDK; PDK.activate(); PDK.cells['nmos']()")
+    assert "ihp.cells.mos_transistors" in loaded
+    assert "ihp.cells.inductors" not in loaded
+
+
+def test_unknown_name_does_not_load_cells() -> None:
+    code = "import ihp.cells; assert not hasattr(ihp.cells, 'nmoss')"
+    assert _loaded(code) == []
+
+
+def test_import_time_budget() -> None:
+    baseline = min(_run("import gdsfactory")[0] for _ in range(3))
+    elapsed = min(_run("import ihp; ihp.LAYER")[0] for _ in range(3))
+    assert elapsed - baseline < 0.5
+
+
+def test_lazy_cells_match_modules() -> None:
+    modules = [getattr(ihp.cells, name) for name in ihp.cells._modules]
+    expected = {
+        name: cell
+        for name, cell in get_cells(modules).items()
+        if cell.__module__.startswith("ihp.cells.")
+        and cell.__module__ != "ihp.cells.utils"
+    }
+    lazy = ihp.cells.get_lazy_cells()
+
+    assert lazy.keys() == expected.keys()
+    for name, cell in expected.items():
+        assert lazy[name].__module__ == cell.__module__
+        assert getattr(ihp.cells, name) is cell
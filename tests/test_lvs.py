@@ -0,0 +1,136 @@
+"""Layout against netlist check."""
+
+from __future__ import annotations
+
+import gdsfactory as gf
+import numpy as np
+import pytest
+
+from ihp import extract, lvs
+
+connectivity = [("Metal1drawing", "Via1drawing", "Metal2drawing")]
+M1, V1, M2 = (8, 0), (19, 0), (10, 0)
+
+
+def _box(c: gf.Component, layer, x0: float, y0: float, x1: float, y1: float) -> None:
+    c.add_polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], layer=layer)
+
+
+def _wire(length: float = 10, layer=M1, gap: float = 0) -> gf.Component:
+    """Returns a wire with ports e1 and e2 at its ends, its shape stops gap before e2."""
+    c = gf.Component()
+    _box(c, layer, 0, -0.5, length - gap, 0.5)
+    c.add_port(
+        "e1",
+        center=(0, 0),
+        width=1,
+        orientation=180,
+        layer=layer,
+        port_type="electrical",
+    )
+    c.add_port(
+        "e2",
+        center=(length, 0),
+        width=1,
+        orientation=0,
+        layer=layer,
+        port_type="electrical",
+    )
+    return c
+
+
+def _chain(gap: float = 0) -> gf.Component:
+    c = gf.Component()
+    a = c.add_ref(_wire(gap=gap), name="a")
+    b = c.add_ref(_wire(), name="b")
+    b.connect("e1", a.ports["e2"])
+    return c
+
+
+def test_connected_chain_is_clean() -> None:
+    report = lvs.check(_chain(), connectivity)
+    assert report.ok
+    assert report == lvs.Report((), ())
+
+
+def test_wire_that_misses_its_port_is_open() -> None:
+    report = lvs.check(_chain(gap=1), connectivity)
+    assert report.opens == (lvs.Open((("b,e1", "b,e2"), ("a,e2",))),)
+    assert report.shorts == ()
+
+
+def test_crossing_wires_are_shorted() -> None:
+    c = _chain()
+    cross = c.add_ref(_wire(), name="c")
+    cross.drotate(90).dmove((5, -5))
+    report = lvs.check(c, connectivity)
+    assert report.opens == ()
+    assert report.shorts == (
+        lvs.Short((("a,e1", "a,e2", "b,e1", "b,e2"), ("c,e1", "c,e2"))),
+    )
+
+
+@pytest.mark.parametrize("via", [False, True])
+def test_crossing_on_another_metal_is_shorted_through_a_via(via: bool) -> None:
+    c = _chain()
+    cross = c.add_ref(_wire(layer=M2), name="c")
+    cross.drotate(90).dmove((5, -5))
+    if via:
+        _box(c, V1, 4.8, -0.2, 5.2, 0.2)
+    report = lvs.check(c, connectivity)
+    assert len(report.shorts) == int(via)
+
+
+def _leaf(seed: int) -> gf.Component:
+    rng = np.random.default_rng(seed)
+    c = gf.Component()
+    for layer in (M1, V1, M2):
+        for x, y, w, h in zip(
+            *rng.uniform(0, 10, (2, 12)), *rng.uniform(0.3, 3, (2, 12))
+        ):
+            _box(c, layer, x, y, x + w, y + h)
+    return c
+
+
+def _top(seed: int, edited: bool = False) -> gf.Component:
+    leaves = [
+        _leaf(seed * 10 + i + (100 if edited and i == 0 else 0)) for i in range(3)
+    ]
+    top = gf.Component()
+    top.add_ref(leaves[0], columns=4, rows=3, column_pitch=9.5, row_pitch=10.2)
+    top.add_ref(leaves[1]).drotate(90).dmove((45, 0))
+    mid = gf.Component()
+    mid.add_ref(leaves[2])
+    mid.add_ref(leaves[1]).dmove((9.8, 0.5))
+    _box(mid, M2, 0, 9, 25, 9.5)
+    top.add_ref(mid, columns=2, column_pitch=21).dmove((0, 28))
+    _box(top, M1, 5, -2, 6, 40)
+    return top
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_hierarchical_nets_match_flat_extraction(seed) -> None:
+    c = _top(seed)
+    flat = extract.extract(c, connectivity)
+    cache = lvs.LvsCache(connectivity)
+    top = cache._cell_nets(c.kdb_cell, lvs.content_hashes(c.kcl.layout, c.kdb_cell))
+    nets = []
+    for polygon, layer in zip(flat.polygons, flat.layer):
+        inside = polygon.decompose_trapezoids()[0].bbox().center()
+        nets.append(top.net_at(inside, cache.layers.index(flat.layers[layer])))
+    assert None not in nets
+    pairs = set(zip(flat.net.tolist(), nets))
+    assert len(pairs) == flat.num_nets == top.num_nets
+
+
+def test_cache_extracts_changed_cells_only() -> None:
+    cache = lvs.LvsCache(connectivity)
+    cache.check(_chain())
+    misses = cache.misses
+    cache.check(_chain())
+    assert cache.misses == misses
+
+    cache.check(_top(0))
+    misses = cache.misses
+    cache.check(_top(0, edited=True))
+    assert cache.misses == misses + 2  # the edited leaf and the top, mid is unchanged
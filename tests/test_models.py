@@ -0,0 +1,71 @@
+"""Compact models of the inductors."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from ihp import models
+
+f = np.linspace(1e8, 3e10, 10_000)
+
+
+def _matrix(s: dict, ports: tuple[str, ...]) -> np.ndarray:
+    return np.stack([np.stack([s[p, q] for q in ports], -1) for p in ports], -2)
+
+
+def _y(s: np.ndarray, z0: float = 50.0) -> np.ndarray:
+    eye = np.eye(s.shape[-1])
+    return np.linalg.solve(eye + s, eye - s) / z0
+
+
+def test_get_models() -> None:
+    assert set(models.get_models()) == {"inductor2", "inductor3"}
+
+
+@pytest.mark.parametrize("name", ["inductor2", "inductor3"])
+def test_batch(name: str) -> None:
+    turns = np.array([2, 3, 4])
+    s = getattr(models, name)(f=f, width=np.array([2.0, 4.0, 6.0]), num_turns=turns)
+    assert all(value.shape == (3, f.size) for value in s.values())
+
+    single = getattr(models, name)(f=f[:10], width=4.0, num_turns=3)
+    assert s["LA", "LB"][1, :10] == pytest.approx(single["LA", "LB"])
+
+
+@pytest.mark.parametrize(
+    ("name", "ports"), [("inductor2", ("LA", "LB")), ("inductor3", ("LA", "LB", "LC"))]
+)
+def test_reciprocal_and_passive(name: str, ports: tuple[str, ...]) -> None:
+    s = _matrix(getattr(models, name)(f=f, num_turns=np.array([2, 5])), ports)
+    assert np.allclose(s, np.swapaxes(s, -1, -2))
+    assert np.linalg.svd(s, compute_uv=False).max() <= 1 + 1e-9
+
+
+def test_inductor2_low_frequency() -> None:
+    y = _y(_matrix(models.inductor2(f=1e7, num_turns=np.array([1, 3])), ("LA", "LB")))
+    z = -1 / y[..., 0, 1]
+    length, inductance = models._spiral(2.0, 2.1, 15.48, np.array([1, 3]))
+    assert z.imag / (2 * np.pi * 1e7) == pytest.approx(inductance, rel=1e-3)
+    z = (
+        -1
+        / _y(
+            _matrix(models.inductor2(f=1e4, num_turns=np.array([1, 3])), ("LA", "LB"))
+        )[..., 0, 1]
+    )
+    assert z.real == pytest.approx(0.0145 * length / 2.0, rel=1e-2)
+
+
+def test_inductor3_center_tap() -> None:
+    y = _y(
+        _matrix(
+            models.inductor3(f=1e7, coupling=np.array([0.2, 0.7])), ("LA", "LB", "LC")
+        )
+    )
+    # leave the center tap open and take the series impedance between LA and LB
+    y = y[..., :2, :2] - y[..., :2, 2:] @ y[..., 2:, :2] / y[..., 2:, 2:]
+    z = -1 / y[..., 0, 1]
+    _, inductance = models._spiral(2.0, 2.1, 25.84, 1)
+    assert z.imag / (2 * np.pi * 1e7) == pytest.approx(
+        [inductance, inductance], rel=1e-3
+    )
@@ -0,0 +1,138 @@
+"""Native MOS generator against the IHP MOS PyCells."""
+
+from __future__ import annotations
+
+import itertools
+
+import gdsfactory as gf
+import pytest
+from kfactory import kdb
+
+from ihp import PDK, tech
+from ihp.cells import mos_transistors
+from ihp.cells.cache import use_cache
+
+grid = [
+    (device, w, gate_length, ng, guard_ring)
+    for device, (w, gate_length, ng), guard_ring in itertools.product(
+        ("nmos", "pmos", "nmosHV", "pmosHV"),
+        ((1.0, 0.45, 1), (2.0, 0.5, 4), (0.9, 0.45, 3), (16.0, 1.0, 16)),
+        ("none", "psub", "nwell"),
+    )
+] + [("nmos", 0.15, 0.13, 1, "none"), ("pmos", 0.6, 0.13, 4, "none")]
+points = [
+    (0.15, 0.13, 1),
+    (0.6, 0.13, 4),
+    (1.0, 0.45, 1),
+    (2.0, 0.5, 4),
+    (16.0, 1.0, 16),
+]
+
+
+@pytest.fixture(autouse=True)
+def activate_pdk() -> None:
+    PDK.activate()
+
+
+def _channels(c: gf.Component) -> kdb.Region:
+    """Returns the channel region, Activ and GatPoly."""
+    layout = c.kdb_cell.layout()
+
+    def region(layer) -> kdb.Region:
+        return kdb.Region(c.kdb_cell.begin_shapes_rec(layout.layer(*layer)))
+
+    return region(tech.LAYER.Activdrawing) & region(tech.LAYER.GatPolydrawing)
+
+
+def _gates(c: gf.Component) -> kdb.Region:
+    """Returns the channel region moved to start at the origin."""
+    gates = _channels(c)
+    return gates.moved(-gates.bbox().p1)
+
+
+def _regions(c: gf.Component) -> dict[tuple[int, int], kdb.Region]:
+    """Returns the merged shapes per layer, moved so that the channels start at the origin."""
+    layout = c.kdb_cell.layout()
+    offset = -_channels(c).bbox().p1
+    regions = {}
+    for index in layout.layer_indexes():
+        region = kdb.Region(c.kdb_cell.begin_shapes_rec(index)).merged()
+        if not region.is_empty():
+            info = layout.get_info(index)
+            regions[info.layer, info.datatype] = region.moved(offset)
+    return regions
+
+
+def _pycell(device: str, **kwargs) -> gf.Component:
+    with use_cache(None):
+        return getattr(mos_transistors, device).__wrapped__(**kwargs)
+
+
+def _native(device: str, **kwargs) -> gf.Component:
+    return mos_transistors.mos.__wrapped__(device=device, **kwargs)
+
+
+@pytest.mark.parametrize("device,w,gate_length,ng,guard_ring", grid)
+def test_mos_gates_match_pycell(device, w, gate_length, ng, guard_ring) -> None:
+    kwargs = dict(w=w, l=gate_length, ng=ng, guardRingType=guard_ring)
+    ref = _pycell(device, **kwargs)
+    native = _native(device, **kwargs)
+
+    ref_gates, native_gates = _gates(ref), _gates(native)
+    assert native_gates.count() == ref_gates.count() == ng
+    assert (native_gates ^ ref_gates).is_empty()
+
+
+@pytest.mark.parametrize("guard_ring", ["none", "psub", "nwell"])
+@pytest.mark.parametrize("device", ["nmos", "pmos", "nmosHV", "pmosHV"])
+@pytest.mark.parametrize("w,gate_length,ng", points)
+def test_mos_layers_match_pycell(device, w, gate_length, ng, guard_ring) -> None:
+    kwargs = dict(w=w, l=gate_length, ng=ng, guardRingType=guard_ring)
+    ref = _regions(_pycell(device, **kwargs))
+    native = _regions(_native(device, **kwargs))
+
+    for layer in native.keys() | ref.keys():
+        empty = kdb.Region()
+        assert (native.get(layer, empty) ^ ref.get(layer, empty)).is_empty(), layer
+
+
+@pytest.mark.parametrize("w,gate_length,ng", points)
+def test_mos_ports_sit_on_their_layers(w, gate_length, ng) -> None:
+    c = mos_transistors.mos(w=w, l=gate_length, ng=ng)
+    for port in c.ports:
+        shapes = kdb.Region(c.kdb_cell.begin_shapes_rec(port.layer))
+        assert shapes.interacting(kdb.Region(kdb.Box(2, 2).moved(port.trans.disp))), (
+            port.name
+        )
+
+
+def test_mos_size_does_not_grow_with_fingers(tmp_path) -> None:
+    sizes = {}
+    for ng in (8, 256):
+        c = mos_transistors.mos(w=0.5 * ng, l=0.13, ng=ng)
+        assert len(c.insts) == 2
+        gdspath = c.write_gds(tmp_path / f"mos_{ng}.gds", with_metadata=False)
+        sizes[ng] = gdspath.stat().st_size
+    assert sizes[256] < 1.5 * sizes[8]
+
+
+def test_mos_rejects_small_devices() -> None:
+    with pytest.raises(ValueError):
+        mos_transistors.mos(w=0.05, l=0.13)
+
+
+@pytest.mark.parametrize("device", ["nmos", "pmos", "rfnmos"])
+def test_pycell_ports_match_gdsfactory(device) -> None:
+    with use_cache(None):
+        c = getattr(mos_transistors, device).__wrapped__(w=64.0, ng=64)
+    expected = c.dup()
+    expected.ports.clear()
+    for post_process in mos_transistors._add_ports:
+        gf.add_ports.add_ports_from_boxes(expected, **post_process.keywords)
+
+    def ports(c: gf.Component) -> list[tuple]:
+        return [(p.name, p.center, p.width, p.orientation, p.layer) for p in c.ports]
+
+    # the cell added its ports with the NumPy engine
+    assert ports(c) == ports(expected)
+    assert any(p.name.startswith("G_") for p in c.ports)
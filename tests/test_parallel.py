@@ -0,0 +1,115 @@
+"""Concurrent PyCell generation matches a serial run."""
+
+from __future__ import annotations
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import gdsfactory as gf
+import pytest
+from kfactory import kdb
+
+from ihp.cells import batch, generate_many, mos_transistors, resistors
+from ihp.cells.cache import use_cache
+from ihp.cells.utils import pycell_timings, reset_pycell_timings
+
+specs = [
+    (factory, dict(w=finger_width * ng, l=gate_length, ng=ng))
+    for factory in (mos_transistors.nmos, mos_transistors.pmos)
+    for finger_width in (0.15, 0.3, 0.6, 1.2, 2.4)
+    for ng in (1, 2, 3, 4, 6, 8)
+    for gate_length in (0.13, 0.26)
+] + [
+    (factory, dict(length=length, width=width))
+    for factory in (resistors.rsil, resistors.rppd, resistors.rhigh)
+    for length in (0.5, 1, 2, 4, 8)
+    for width in (0.5, 1)
+]
+
+
+def _fingerprint(c: gf.Component) -> str:
+    """Returns a hash of the merged polygons of c on every layer."""
+    layout = c.kdb_cell.layout()
+    h = hashlib.sha256()
+    for index in sorted(layout.layer_indexes(), key=lambda i: str(layout.get_info(i))):
+        region = kdb.Region(c.kdb_cell.begin_shapes_rec(index)).merged()
+        if region.is_empty():
+            continue
+        h.update(str(layout.get_info(index)).encode())
+        for polygon in sorted(str(p) for p in region.each()):
+            h.update(polygon.encode())
+    return h.hexdigest()
+
+
+def _build(spec) -> gf.Component:
+    """Builds spec without the ``@gf.cell`` memoization."""
+    factory, settings = spec
+    return factory.__wrapped__(**settings)
+
+
+@pytest.fixture(scope="module")
+def serial() -> list[str]:
+    with use_cache(None):
+        return [_fingerprint(_build(spec)) for spec in specs]
+
+
+def test_threads_match_serial_run(serial) -> None:
+    with use_cache(None), ThreadPoolExecutor(max_workers=8) as pool:
+        components = list(pool.map(_build, specs))
+    assert [_fingerprint(c) for c in components] == serial
+
+
+def test_processes_match_serial_run(serial, monkeypatch, tmp_path) -> None:
+    monkeypatch.chdir(tmp_path)  # every worker shares this working directory
+    monkeypatch.setenv("IHP_PYCELL_CACHE", "0")
+    with use_cache(None):
+        components = generate_many(specs, workers=4)
+    assert [_fingerprint(c) for c in components] == serial
+    assert list(tmp_path.iterdir()) == []
+
+
+@gf.cell
+def _pair(length: float = 1.0) -> gf.Component:
+    """Two resistors as sub-cells, the rsil one also built on its own."""
+    c = gf.Component()
+    c.add_ref(resistors.rsil(length=length))
+    c.add_ref(resistors.rppd(length=length)).dmovex(20)
+    return c
+
+
+def test_worker_returns_memoized_sub_cells(monkeypatch) -> None:
+    monkeypatch.setenv("IHP_PYCELL_CACHE", "0")
+    with ProcessPoolExecutor(max_workers=1, initializer=batch._init_worker) as pool:
+        alone = pool.submit(batch._produce, resistors.rsil, dict(length=1.9)).result()
+        pair = pool.submit(batch._produce, _pair, dict(length=1.9)).result()
+    assert len(alone) == 1
+    assert len(pair) == 2
+    assert set(alone) < set(pair)
+
+
+def test_processes_build_cells_with_sub_cells(monkeypatch) -> None:
+    monkeypatch.setenv("IHP_PYCELL_CACHE", "0")
+    lengths = (1.7, 2.7, 3.7)
+    specs = [(resistors.rsil, dict(length=x)) for x in lengths]
+    specs += [(_pair, dict(length=x)) for x in lengths]
+
+    reset_pycell_timings()
+    with use_cache(None):
+        components = generate_many(specs, workers=2)
+
+    # every PyCell ran in a worker, the parent only read the layouts back
+    assert all(t.calls == t.cache_hits for t in pycell_timings().values())
+    assert [len(c.insts) for c in components[3:]] == [2, 2, 2]
+
+
+def test_no_pool_without_pycells(monkeypatch) -> None:
+    def no_pool(*args, **kwargs):
+        raise AssertionError("started a pool")
+
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", no_pool)
+    specs = [
+        (gf.components.rectangle, dict(size=(n, n), layer=(8, 0))) for n in (1, 2, 3)
+    ]
+    with use_cache(None):
+        components = generate_many(specs, workers=4)
+    assert [c.dbbox().width() for c in components] == [1, 2, 3]
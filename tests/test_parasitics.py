@@ -0,0 +1,68 @@
+"""Wire parasitics."""
+
+from __future__ import annotations
+
+import gdsfactory as gf
+import numpy as np
+import pytest
+
+from ihp import parasitics
+
+connectivity = [("Metal1drawing", "Via1drawing", "Metal2drawing")]
+m1 = parasitics.Metal("Metal1drawing", 0.135, 1.0, 0.5, 4.1)
+m2 = parasitics.Metal("Metal2drawing", 0.103, 1.8, 0.5, 4.1)
+metals = {m.layer: m for m in (m1, m2)}
+
+
+def _box(c: gf.Component, layer, x0: float, y0: float, x1: float, y1: float) -> None:
+    c.add_polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], layer=layer)
+
+
+def test_wire_rc() -> None:
+    r, c = parasitics.wire_rc(m1, [100.0, 200.0], [1.0, 1.0])
+    assert r == pytest.approx([13.5, 27.0])
+    assert c[1] == pytest.approx(2 * c[0])
+    e = parasitics.eps0 * 4.1
+    assert c[0] == pytest.approx(e * (1.15 + 2.80 * 0.5**0.222) * 100)
+
+    _, coupled = parasitics.wire_rc(m1, 100.0, 1.0, spacing=0.5)
+    _, far = parasitics.wire_rc(m1, 100.0, 1.0, spacing=5.0)
+    assert coupled > far > c[0]
+
+
+def test_estimate_matches_wire_rc() -> None:
+    c = gf.Component()
+    _box(c, (8, 0), 0, 0, 100, 1)  # net on Metal1 ...
+    _box(c, (19, 0), 99.6, 0.3, 99.9, 0.6)
+    _box(c, (10, 0), 99, 0, 100, 50)  # ... and Metal2
+    _box(c, (8, 0), 0, 11, 100, 12)  # alone, beyond the coupling distance
+    rc = parasitics.estimate(c, connectivity, metals)
+    assert len(rc) == 2
+    wire, alone = sorted(rc.values(), key=lambda x: -x.resistance)
+
+    r1, c1 = parasitics.wire_rc(m1, 100.0, 1.0)
+    r2, c2 = parasitics.wire_rc(m2, 50.0, 1.0)
+    assert wire.resistance == pytest.approx(r1 + r2)
+    assert wire.area_cap + wire.fringe_cap == pytest.approx(c1 + c2)
+    assert alone.resistance == pytest.approx(r1)
+    assert alone.coupling_cap == wire.coupling_cap == 0
+
+
+def test_estimate_couples_parallel_wires() -> None:
+    c = gf.Component()
+    _box(c, (8, 0), 0, 0, 100, 1)
+    _box(c, (8, 0), 20, 1.5, 60, 2.5)  # 40 um side by side at 0.5 um
+    _box(c, (8, 0), 0, 10, 1, 60)  # vertical, 10 um away from both
+    rc = parasitics.estimate(c, connectivity, metals)
+    coupling = sorted(x.coupling_cap for x in rc.values())
+    expected = parasitics._coupling_cap(m1, np.array(1.0), np.array(0.5)) * 40
+    assert coupling == pytest.approx([0, expected, expected])
+
+
+def test_l_shaped_wire_is_cut_into_segments() -> None:
+    c = gf.Component()
+    c.add_polygon([(0, 0), (50, 0), (50, 1), (1, 1), (1, 30), (0, 30)], layer=(8, 0))
+    (rc,) = parasitics.estimate(c, connectivity, metals).values()
+    area = parasitics.eps0 * 4.1 / m1.height * (50 + 29)
+    assert rc.area_cap == pytest.approx(area)
+    assert rc.resistance == pytest.approx(0.135 * (50 + 29))
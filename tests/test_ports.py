@@ -0,0 +1,80 @@
+"""NumPy port extraction against gf.add_ports.add_ports_from_boxes."""
+
+from __future__ import annotations
+
+import random
+
+import gdsfactory as gf
+import pytest
+from kfactory import kdb
+
+from ihp.cells.ports import add_ports_from_boxes, box_array
+
+options = [
+    dict(),
+    dict(
+        ports_on_short_side=True,
+        port_type="electrical",
+        port_name_prefix="DS_",
+        auto_rename_ports=False,
+    ),
+    dict(inside=True, skip_square_ports=True),
+    dict(min_pin_area_um2=0.05, pin_extra_width=0.01, xcenter=1.0, ycenter=-1.0),
+]
+
+
+def _component(seed: int) -> gf.Component:
+    """Returns random boxes, duplicates and off-grid arrays on Metal1."""
+    rnd = random.Random(seed)
+    sizes = (150, 151, 160, 300, 1000)
+    c = gf.Component()
+    li = c.kcl.layer(8, 0)
+    for _ in range(200):
+        x, y = rnd.randrange(-5000, 5000), rnd.randrange(-5000, 5000)
+        c.shapes(li).insert(kdb.Box(x, y, x + rnd.choice(sizes), y + rnd.choice(sizes)))
+    c.shapes(li).insert(kdb.Box(0, 0, 150, 150))
+    c.shapes(li).insert(kdb.Box(0, 0, 150, 150))
+
+    finger = gf.Component()
+    finger.shapes(li).insert(kdb.Box(0, 0, 160, 480))
+    finger.shapes(li).insert(kdb.Box(200, 0, 360, 160))
+    c.add_ref(finger, columns=8, rows=2, column_pitch=0.5, row_pitch=1.0).dmove(
+        (1.0005, 2.0)
+    )
+    c.add_ref(finger).drotate(90)
+    return c
+
+
+def _ports(c: gf.Component) -> list[tuple]:
+    return [
+        (p.name, p.center, p.width, p.orientation, p.layer, p.port_type)
+        for p in c.ports
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("kwargs", options)
+def test_ports_match_gdsfactory(seed, kwargs) -> None:
+    expected, c = _component(seed), _component(seed)
+    gf.add_ports.add_ports_from_boxes(expected, pin_layer=(8, 0), **kwargs)
+    add_ports_from_boxes(c, pin_layer=(8, 0), **kwargs)
+    assert _ports(c) == _ports(expected)
+
+
+def test_box_array_matches_get_boxes() -> None:
+    c = _component(0)
+    boxes = [(b.left, b.bottom, b.right, b.top) for b in c.get_boxes((8, 0))]
+    assert [tuple(row) for row in box_array(c, (8, 0))] == boxes
+
+
+def test_empty_layer() -> None:
+    c = _component(0)
+    add_ports_from_boxes(c, pin_layer=(10, 0))
+    assert len(c.ports) == 0
+
+
+def test_duplicate_names_raise() -> None:
+    c = _component(0)
+    add_ports_from_boxes(c, pin_layer=(8, 0), auto_rename_ports=False)
+    with pytest.raises(ValueError, match="already in"):
+        add_ports_from_boxes(c, pin_layer=(8, 0), auto_rename_ports=False)
@@ -0,0 +1,77 @@
+"""In-memory PyCell to Component bridge."""
+
+from __future__ import annotations
+
+import gdsfactory as gf
+from kfactory import kdb
+
+from ihp.cells.utils import _layout_to_component
+
+
+def _pycell_like_layout() -> tuple[kdb.Layout, kdb.Cell]:
+    """Returns a layout with a child cell, a text and a top cell like PyCells produce."""
+    layout = kdb.Layout()
+    layout.dbu = 0.001
+    top = layout.create_cell("device")
+    child = layout.create_cell("device_cont")
+    metal1 = layout.layer(8, 0)
+    label = layout.layer(8, 25)
+
+    child.shapes(metal1).insert(kdb.Box(0, 0, 160, 160))
+    top.insert(
+        kdb.CellInstArray(
+            child.cell_index(),
+            kdb.Trans(),
+            kdb.Vector(340, 0),
+            kdb.Vector(0, 340),
+            3,
+            2,
+        )
+    )
+    top.shapes(metal1).insert(kdb.Box(-100, -100, 1100, -20))
+    top.shapes(label).insert(kdb.Text("D", kdb.Trans(kdb.Vector(50, 50))))
+    return layout, top
+
+
+def _shapes(c: gf.Component, layer: tuple[int, int]) -> tuple[kdb.Region, list[str]]:
+    layout = c.kdb_cell.layout()
+    index = layout.find_layer(*layer)
+    region = kdb.Region(c.kdb_cell.begin_shapes_rec(index))
+    texts = sorted(str(t) for t in kdb.Texts(c.kdb_cell.begin_shapes_rec(index)).each())
+    return region, texts
+
+
+def test_layout_to_component_matches_gds_round_trip(tmp_path) -> None:
+    layout, top = _pycell_like_layout()
+    gdspath = tmp_path / "device.gds"
+    layout.write(str(gdspath))
+
+    ref = gf.read.import_gds(gdspath=gdspath)
+    c = _layout_to_component(top)
+
+    assert c.kdb_cell.child_cells() == ref.kdb_cell.child_cells() == 1
+    for layer in ((8, 0), (8, 25)):
+        region, texts = _shapes(c, layer)
+        ref_region, ref_texts = _shapes(ref, layer)
+        assert (region ^ ref_region).is_empty()
+        assert texts == ref_texts
+
+
+def test_pycell_wrapper_is_built_once() -> None:
+    from ihp.cells import mos_transistors
+    from ihp.cells.cache import use_cache
+    from ihp.cells.utils import _get_pycell, pycell_timings, reset_pycell_timings
+
+    reset_pycell_timings()
+    with use_cache(None):
+        mos_transistors.nmos(w=0.31, ng=1)
+        mos_transistors.nmos(w=0.62, ng=2)
+
+    entry = _get_pycell(mos_transistors.nmosIHP)
+    assert entry is _get_pycell(mos_transistors.nmosIHP)
+    assert entry.param_names == tuple(p.name for p in entry.wrapper.param_decls)
+
+    timings = pycell_timings()["nmos"]
+    assert timings.calls == 2
+    assert timings.cache_hits == 0
+    assert timings.geometry > 0
@@ -0,0 +1,407 @@
+"""Maze routing."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import gdsfactory as gf
+import numpy as np
+import pytest
+from kfactory import kdb
+
+from ihp import extract, routing
+
+connectivity = [("Metal2drawing", "Via2drawing", "Metal3drawing")]
+M2, V2, M3 = (10, 0), (29, 0), (30, 0)
+layers = [
+    routing.RoutingLayer("Metal2", 0.4, 0.2, "vertical"),
+    routing.RoutingLayer("Metal3", 0.4, 0.2, "horizontal"),
+]
+
+
+def _box(c: gf.Component, layer, x0: float, y0: float, x1: float, y1: float) -> None:
+    c.add_polygon([(x0, y0), (x1, y0), (x1, y1), (x0, y1)], layer=layer)
+
+
+@gf.cell
+def _via(bottom_layer: str = "Metal2", top_layer: str = "Metal3") -> gf.Component:
+    c = gf.Component()
+    _box(c, M2, -0.2, -0.2, 0.2, 0.2)
+    _box(c, V2, -0.1, -0.1, 0.1, 0.1)
+    _box(c, M3, -0.2, -0.2, 0.2, 0.2)
+    return c
+
+
+def _pad(c: gf.Component, name: str, x: float, y: float, orientation: float) -> gf.Port:
+    """Adds a 1 um Metal3 pad centered at x, y with a port on the side facing orientation."""
+    _box(c, M3, x - 0.5, y - 0.5, x + 0.5, y + 0.5)
+    dx, dy = {0: (0.5, 0), 90: (0, 0.5), 180: (-0.5, 0), 270: (0, -0.5)}[orientation]
+    return c.add_port(
+        name,
+        center=(x + dx, y + dy),
+        width=1,
+        orientation=orientation,
+        layer=M3,
+        port_type="electrical",
+    )
+
+
+def _net(nets: extract.Extraction, port: gf.Port) -> int:
+    point = kdb.Point(
+        round(port.dcenter[0] / nets.dbu), round(port.dcenter[1] / nets.dbu)
+    )
+    index = nets.layers.index("Metal3drawing")
+    for polygon, layer, net in zip(nets.polygons, nets.layer, nets.net):
+        if layer == index and polygon.inside(point):
+            return int(net)
+    raise AssertionError(f"no net at {port.name}")
+
+
+def _route(c: gf.Component, ports1, ports2) -> list[routing.Route]:
+    return routing.route_bundle_maze(
+        c, ports1, ports2, layers=layers, via=_via, margin=5
+    )
+
+
+def test_straight_route() -> None:
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 12, 0, 180)
+    (route,) = _route(c, [a], [b])
+    assert route.vias == 0
+    assert route.length == pytest.approx(11)
+    assert {metal for _, _, metal in route.points} == {"Metal3"}
+
+
+def test_layer_change_adds_vias() -> None:
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 12, 6, 180)
+    (route,) = _route(c, [a], [b])
+    assert route.vias == 2  # down to the vertical Metal2 and back
+    assert "Metal2" in {metal for _, _, metal in route.points}
+    nets = extract.extract(c, connectivity)
+    assert _net(nets, a) == _net(nets, b)
+
+
+def test_default_via_stack_connects_layers() -> None:
+    from ihp import PDK
+
+    PDK.activate()
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 12, 6, 180)
+    (route,) = routing.route_bundle_maze(c, [a], [b], layers=layers, margin=5)
+    assert route.vias == 2
+    nets = extract.extract(c, connectivity)
+    assert _net(nets, a) == _net(nets, b)
+
+
+def test_route_avoids_obstacles() -> None:
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 12, 0, 180)
+    _box(c, M3, 5, -4, 6, 4)  # wall on both layers
+    _box(c, M2, 5, -4, 6, 4)
+    wall = kdb.Region(kdb.Box(5000, -4000, 6000, 4000))
+    before = c.dup()
+    (route,) = _route(c, [a], [b])
+    assert route.length > 11
+    nets = extract.extract(c, connectivity)
+    assert _net(nets, a) == _net(nets, b)
+    for layer in (M2, M3):
+        li = c.kcl.layout.layer(*layer)
+        added = kdb.Region(c.kdb_cell.begin_shapes_rec(li)) - kdb.Region(
+            before.kdb_cell.begin_shapes_rec(li)
+        )
+        assert (added & wall.sized(199)).is_empty()
+
+
+def test_bundle_has_no_shorts() -> None:
+    c = gf.Component()
+    n = 8
+    ports1 = [_pad(c, f"a{i}", 0, 3 * i, 0) for i in range(n)]
+    ports2 = [
+        _pad(c, f"b{i}", 30, 3 * (n - 1 - i), 180) for i in range(n)
+    ]  # every pair crosses
+    routes = _route(c, ports1, ports2)
+    assert [route.port1 for route in routes] == [f"a{i}" for i in range(n)]
+    nets = extract.extract(c, connectivity)
+    net_of = [_net(nets, port) for port in ports1]
+    assert net_of == [_net(nets, port) for port in ports2]
+    assert len(set(net_of)) == n
+
+
+def test_grid_blocks_shapes() -> None:
+    c = gf.Component()
+    _box(c, M3, 0, 0, 1, 1)
+    grid = routing.routing_grid(c, layers, pitch=0.5, boundary=kdb.DBox(-2, -2, 3, 3))
+    assert grid.origin == (-2, -2)
+    row, column = grid.nearest(0.5, 0.5)
+    assert grid.occupancy[1, row, column] == routing.BLOCKED
+    assert grid.occupancy[0, row, column] == routing.FREE
+    # keepout of spacing 0.2 plus half a width 0.2 around the shape
+    assert grid.occupancy[1, row, column + 2] == routing.FREE  # 0.5 from the shape
+    assert grid.occupancy[1, row, column + 1] == routing.BLOCKED  # on the shape edge
+
+
+def test_no_path_raises() -> None:
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 12, 0, 180)
+    for layer in (M2, M3):
+        _box(c, layer, 8, -4, 9, 4)
+        _box(c, layer, 8, 4, 16, 5)
+        _box(c, layer, 8, -5, 16, -4)
+        _box(c, layer, 15, -4, 16, 4)
+    with pytest.raises(ValueError, match="no path"):
+        _route(c, [a], [b])
+
+
+def _bundles(c: gf.Component) -> list[tuple[list[gf.Port], list[gf.Port]]]:
+    """Adds 6 bundles of 3 nets, the last one crossing the first two."""
+    bundles = []
+    for b in range(5):
+        x = 40 * b
+        ports1 = [_pad(c, f"a{b}_{i}", x, 3 * i, 0) for i in range(3)]
+        ports2 = [_pad(c, f"b{b}_{i}", x + 20, 3 * i + 2, 180) for i in range(3)]
+        bundles.append((ports1, ports2))
+    ports1 = [_pad(c, f"c{i}", 10 + 3 * i, -10, 90) for i in range(3)]
+    ports2 = [_pad(c, f"d{i}", 50 + 3 * i, 20, 270) for i in range(3)]
+    bundles.append((ports1, ports2))
+    return bundles
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_parallel_bundles_match_serial(processes: int) -> None:
+    c = gf.Component()
+    bundles = _bundles(c)
+    routes = routing.route_bundles_maze(
+        c, bundles, layers=layers, via=_via, margin=5, processes=processes
+    )
+    assert [[r.port1 for r in bundle] for bundle in routes] == [
+        [p.name for p in ports1] for ports1, _ in bundles
+    ]
+
+    serial = gf.Component()
+    expected = routing.route_bundles_maze(
+        serial, _bundles(serial), layers=layers, via=_via, margin=5, processes=1
+    )
+    assert routes == expected
+
+    nets = extract.extract(c, connectivity)
+    net_of = [_net(nets, port) for ports1, _ in bundles for port in ports1]
+    assert net_of == [_net(nets, port) for _, ports2 in bundles for port in ports2]
+    assert len(set(net_of)) == len(net_of)
+
+
+def test_index_grid_matches_component_grid() -> None:
+    rng = np.random.default_rng(0)
+    c = gf.Component()
+    for x, y, w, h in rng.uniform([0, 0, 0.1, 0.1], [40, 40, 3, 3], (200, 4)).round(3):
+        _box(c, M2 if x < 20 else M3, x, y, x + w, y + h)
+    boundary = kdb.DBox(-2, -2, 45, 45)
+    expected = routing.routing_grid(c, layers, boundary=boundary)
+    obstacles = routing.ObstacleIndex.from_component(c, bin_size=5)
+    grid = routing.routing_grid(c, layers, boundary=boundary, obstacles=obstacles)
+    assert grid.origin == expected.origin
+    np.testing.assert_array_equal(grid.occupancy, expected.occupancy)
+
+
+def test_index_query_and_instances() -> None:
+    block = gf.Component()
+    _box(block, M2, 0, 0, 1, 1)
+    _box(block, M2, 9, 9, 10, 10)
+    c = gf.Component()
+    c.add_ref(block).dmove((100, 0))
+    _box(c, M3, 0, 0, 2, 2)
+
+    obstacles = routing.ObstacleIndex.from_component(c, bin_size=4, flatten=False)
+    assert len(obstacles) == 2
+    assert obstacles.query("Metal2", kdb.Box(104000, 4000, 105000, 5000)).tolist() == [
+        [100000, 0, 110000, 10000]
+    ]
+    assert len(routing.ObstacleIndex.from_component(c)) == 3
+
+    obstacles.add("Metal3", kdb.Box(50000, 0, 60000, 1000))
+    assert obstacles.query("Metal3", kdb.Box(1000, 0, 55000, 0)).tolist() == [
+        [0, 0, 2000, 2000],
+        [50000, 0, 60000, 1000],
+    ]
+    assert not len(obstacles.query("Metal4", kdb.Box(0, 0, 1000, 1000)))
+
+
+def test_routes_update_index() -> None:
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 20, 0, 180)
+    obstacles = routing.ObstacleIndex.from_component(c)
+    before = len(obstacles)
+    routing.route_bundle_maze(
+        c, [a], [b], layers=layers, via=_via, margin=5, obstacles=obstacles
+    )
+    assert len(obstacles) > before
+
+    # the second net crosses the first one, which it only sees through the index,
+    # and its pads are drawn after the index was built, so they are added by hand
+    d = _pad(c, "d", 10, -10, 90)
+    e = _pad(c, "e", 10, 10, 270)
+    obstacles.add("Metal3", kdb.Box(9500, -10500, 10500, -9500))
+    obstacles.add("Metal3", kdb.Box(9500, 9500, 10500, 10500))
+    routing.route_bundle_maze(
+        c, [d], [e], layers=layers, via=_via, margin=5, obstacles=obstacles
+    )
+    nets = extract.extract(c, connectivity)
+    assert _net(nets, a) == _net(nets, b)
+    assert _net(nets, d) == _net(nets, e)
+    assert _net(nets, a) != _net(nets, d)
+
+
+def test_maze_strategy_keeps_the_component_index() -> None:
+    from ihp import PDK
+    from ihp import tech as ihp_tech
+
+    PDK.activate()
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 20, 0, 180)
+    d = _pad(c, "d", 10, -10, 90)
+    e = _pad(c, "e", 10, 10, 270)
+    obstacles = routing.ObstacleIndex.of(c)
+    assert routing.ObstacleIndex.of(c.kcl[c.cell_index()]) is obstacles
+
+    strategy = ihp_tech.routing_strategies["route_bundle_maze"]
+    before = len(obstacles)
+    strategy(c, [a], [b], layers=layers, via=_via, margin=5)
+    assert len(obstacles) > before
+    # the second net crosses the first one, which it only sees through the index
+    strategy(c, [d], [e], layers=layers, via=_via, margin=5)
+    nets = extract.extract(c, connectivity)
+    assert _net(nets, a) == _net(nets, b)
+    assert _net(nets, d) == _net(nets, e)
+    assert _net(nets, a) != _net(nets, d)
+
+    routing.ObstacleIndex.forget(c)
+    assert routing.ObstacleIndex.of(c) is not obstacles
+
+
+tech = SimpleNamespace(
+    grid=0.005,
+    metal2_width=0.2,
+    metal2_spacing=0.2,
+    metal2_jmax=2.0,
+    metal3_width=0.2,
+    metal3_spacing=0.2,
+    metal3_jmax=2.0,
+    topmetal2_width=2.0,
+    topmetal2_spacing=2.0,
+    topmetal2_jmax=16.0,
+)
+
+
+def test_em_widths() -> None:
+    widths = routing.em_widths([0, 1.234, -3, 40], ("TopMetal2", "Metal2"), tech)
+    np.testing.assert_allclose(widths, [[0.4, 2], [0.62, 2], [1.5, 2], [20, 2.5]])
+
+
+def test_current_layers_leave_out_wide_metals() -> None:
+    low, high, again = routing.current_layers(
+        [0.1, 40, 0.1], ("Metal2", "TopMetal2"), max_width=5, tech=tech
+    )
+    assert [layer.metal for layer in low] == ["Metal2", "TopMetal2"]
+    assert [layer.width for layer in low] == [0.4, 2.0]
+    assert [(layer.metal, layer.width) for layer in high] == [("TopMetal2", 2.5)]
+    assert again == low
+
+
+def test_route_bundle_current_widens_wires() -> None:
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 20, 0, 180)
+    d = _pad(c, "d", 0, 6, 0)
+    e = _pad(c, "e", 20, 6, 180)
+    routes = routing.route_bundle_current(
+        c,
+        [a, d],
+        [b, e],
+        [0.1, 3.0],
+        ("Metal2", "Metal3"),
+        tech=tech,
+        via=_via,
+        margin=5,
+    )
+    assert [route.port1 for route in routes] == ["a", "d"]
+    nets = extract.extract(c, connectivity)
+    assert _net(nets, a) != _net(nets, d)
+
+    def width(port: gf.Port) -> float:
+        """Returns the height of the wires of the net of port halfway between the pads."""
+        wires = kdb.Region(
+            [
+                p.to_itype(nets.dbu)
+                for p in nets.shapes(_net(nets, port))["Metal3drawing"]
+            ]
+        )
+        return (
+            wires & kdb.Region(kdb.Box(9900, -10000, 10100, 20000))
+        ).bbox().height() * nets.dbu
+
+    assert width(a) == pytest.approx(0.4)
+    assert width(d) == pytest.approx(1.5)
+
+
+def test_route_bundle_current_checks_port_metals() -> None:
+    c = gf.Component()
+    a = _pad(c, "a", 0, 0, 0)
+    b = _pad(c, "b", 20, 0, 180)
+    with pytest.raises(ValueError, match="port a is on Metal3, which needs wires"):
+        routing.route_bundle_current(
+            c, [a], [b], [40], ("Metal3", "TopMetal2"), max_width=5, tech=tech
+        )
+    with pytest.raises(ValueError, match="port a is on Metal3, not one of"):
+        routing.route_bundle_current(c, [a], [b], [0.1], ("Metal2",), tech=tech)
+
+
+@pytest.mark.parametrize("width, vias", [(0.4, 1), (1.5, 9)])
+def test_via_arrays_fit_the_wires(width: float, vias: int) -> None:
+    from ihp import PDK
+
+    PDK.activate()
+    wires = [
+        routing.RoutingLayer("Metal2", width, 0.2, "vertical"),
+        routing.RoutingLayer("Metal3", width, 0.2, "horizontal"),
+    ]
+    c = routing._via_stack(wires)(bottom_layer="Metal2", top_layer="Metal3")
+    layout = c.kdb_cell.layout()
+    for layer, count in ((V2, vias), (M2, 1), (M3, 1)):
+        region = kdb.Region(c.kdb_cell.begin_shapes_rec(layout.find_layer(*layer)))
+        assert region.merged().count() == count
+    assert c.dbbox().width() <= width + 1e-9
+    assert c.dbbox().height() <= width + 1e-9
+
+
+def test_every_routing_strategy_routes() -> None:
+    from ihp import PDK
+    from ihp import tech as ihp_tech
+
+    PDK.activate()
+    for name, strategy in ihp_tech.routing_strategies.items():
+        c = gf.Component()
+        if name == "route_bundle_maze":
+            ports = [_pad(c, "a", 0, 0, 0), _pad(c, "b", 30, 10, 180)]
+        else:  # the metal_routing and strip cross-sections are on TopMetal2
+            ports = [
+                c.add_port(
+                    port,
+                    center=(x, y),
+                    width=2,
+                    orientation=orientation,
+                    layer=ihp_tech.LAYER.TopMetal2drawing,
+                    port_type="electrical",
+                )
+                for port, x, y, orientation in (("a", 0, 0, 0), ("b", 100, 50, 180))
+            ]
+        routes = strategy(c, ports[:1], ports[1:])
+        assert len(routes) == 1, name
+        # only the maze router reads the index, the others do not build it
+        assert (id(c.base) in routing._indexes) == (name == "route_bundle_maze")
@@ -0,0 +1,69 @@
+"""Pickled snapshots of techParams and LAYER_VIEWS."""
+
+from __future__ import annotations
+
+import json
+import shutil
+
+import pytest
+
+from ihp import snapshot
+from ihp.config import PATH
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    tech_json = tmp_path / "sg13g2_tech.json"
+    tech_json.write_text(json.dumps({"techParams": {"CDFVersion": "1"}}))
+    lyp = tmp_path / "layers.lyp"
+    shutil.copy(PATH.lyp, lyp)
+
+    monkeypatch.setattr(PATH, "tech_json", tech_json)
+    monkeypatch.setattr(PATH, "lyp", lyp)
+    monkeypatch.setattr(PATH, "snapshots", tmp_path / "cache" / "snapshots")
+    monkeypatch.setattr(snapshot, "_snapshots", {})
+    return tech_json, lyp
+
+
+def _reload() -> dict:
+    snapshot._snapshots.clear()
+    return snapshot.tech_params()
+
+
+def test_snapshot_is_written_and_reused(sources) -> None:
+    assert snapshot.tech_params() == {"CDFVersion": "1"}
+    path = PATH.snapshots / "tech_params.pickle"
+    assert path.exists()
+
+    mtime = path.stat().st_mtime_ns
+    assert _reload() == {"CDFVersion": "1"}
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_tech_params_do_not_load_layer_views(sources) -> None:
+    snapshot.tech_params()
+    assert "layer_views" not in snapshot._snapshots
+    assert not (PATH.snapshots / "layer_views.pickle").exists()
+
+    assert len(snapshot.layer_views().layer_views) > 0
+    assert (PATH.snapshots / "layer_views.pickle").exists()
+
+
+def test_changed_source_invalidates_snapshot(sources) -> None:
+    tech_json, _ = sources
+    snapshot.tech_params()
+
+    tech_json.write_text(json.dumps({"techParams": {"CDFVersion": "2"}}))
+    assert _reload() == {"CDFVersion": "2"}
+
+
+def test_read_only_cache_still_loads(sources, monkeypatch) -> None:
+    monkeypatch.setattr(PATH, "snapshots", PATH.lyp / "not_a_directory")
+    assert snapshot.refresh() is None
+    assert _reload() == {"CDFVersion": "1"}
+
+
+def test_nothing_is_written_into_the_package(sources) -> None:
+    before = sorted(PATH.module.iterdir())
+    assert snapshot.refresh() == PATH.snapshots
+    assert sorted(PATH.module.iterdir()) == before
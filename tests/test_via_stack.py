@@ -0,0 +1,79 @@
+"""Native via_stack against the IHP via_stack PyCell, placement included."""
+
+from __future__ import annotations
+
+import gdsfactory as gf
+import pytest
+from kfactory import kdb
+
+from ihp import PDK, tech
+from ihp.cells.cache import use_cache
+from ihp.cells.via_stacks import _via_stack_native, via_stack
+
+params = [
+    dict(),
+    dict(bottom_layer="Activ", top_layer="Metal1", vn_columns=1, vn_rows=3),
+    dict(bottom_layer="GatPoly", top_layer="Metal2", vn_columns=4, vn_rows=1),
+    dict(bottom_layer="Metal1", top_layer="Metal5", vn_columns=3, vn_rows=3),
+    dict(bottom_layer="Metal4", top_layer="TopMetal1", vt1_columns=2, vt1_rows=2),
+    dict(bottom_layer="Metal5", top_layer="TopMetal2", vt1_columns=3, vt2_columns=2),
+    dict(
+        bottom_layer="Activ", top_layer="TopMetal2", vn_columns=5, vn_rows=2, vt2_rows=2
+    ),
+]
+
+
+@pytest.fixture(autouse=True)
+def activate_pdk() -> None:
+    PDK.activate()
+
+
+def _regions(c: gf.Component) -> dict[tuple[int, int], kdb.Region]:
+    """Returns the merged shapes per layer where c places them."""
+    layout = c.kdb_cell.layout()
+    regions = {}
+    for index in layout.layer_indexes():
+        region = kdb.Region(c.kdb_cell.begin_shapes_rec(index)).merged()
+        if not region.is_empty():
+            info = layout.get_info(index)
+            regions[info.layer, info.datatype] = region
+    return regions
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    params,
+    ids=lambda kwargs: "_".join(map(str, kwargs.values())) or "default",
+)
+def test_via_stack_matches_pycell(kwargs) -> None:
+    with use_cache(None):
+        ref = _regions(via_stack.__wrapped__(**kwargs))
+    native = _regions(_via_stack_native.__wrapped__(**kwargs))
+
+    assert native.keys() == ref.keys()
+    for layer, region in native.items():
+        assert (region ^ ref[layer]).is_empty(), layer
+
+
+def test_vias_are_arrayed_references() -> None:
+    c = _via_stack_native(
+        bottom_layer="Metal1", top_layer="Metal3", vn_columns=8, vn_rows=8
+    )
+    assert len(c.insts) == 2
+    assert all((inst.na, inst.nb) == (8, 8) for inst in c.insts)
+
+
+def test_via_stack_rejects_inverted_layers() -> None:
+    with pytest.raises(ValueError):
+        _via_stack_native(bottom_layer="Metal3", top_layer="Metal1")
+
+
+@pytest.mark.parametrize("layer", ["Metal1", "Metal3", "TopMetal2"])
+def test_via_stack_on_one_layer_is_a_metal_pad(layer) -> None:
+    c = _via_stack_native(
+        bottom_layer=layer, top_layer=layer, vn_columns=2, vn_rows=1, vt2_columns=2
+    )
+    layer_info = getattr(tech.LAYER, f"{layer}drawing")
+    assert not c.insts
+    assert list(_regions(c)) == [(layer_info.layer, layer_info.datatype)]
+    assert c.dxsize > c.dysize